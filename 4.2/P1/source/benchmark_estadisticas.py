@@ -0,0 +1,362 @@
+"""
+benchmark_estadisticas.py
+
+Suite reproducible de benchmarks para computeStatistics.py: genera datos
+con generar_datos.py, mide por fase (lectura, tokenizacion, conversion,
+ordenamiento/seleccion de la mediana y estadisticas) el tiempo y el pico
+de memoria residente (RSS) de calcular_estadisticas_exactas con cada
+backend (python y numpy) y guarda los resultados en JSON para comparar
+entre commits.
+
+P1 - TC4017 - Pruebas de software y aseguramiento de la calidad
+Carlos Isaac Sagrero Campos - A01796826
+
+Uso:
+  python benchmark_estadisticas.py [--tamanos 1000,10000,100000]
+                                   [--distribuciones uniforme,duplicados]
+                                   [--backends python,numpy]
+                                   [--datos DIR] [--salida resultados.json]
+                                   [--comparar base.json]
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import computeStatistics
+import generar_datos
+
+
+DEFAULT_TAMANOS = "1000,10000,100000"
+# Backend de las corridas anteriores a la dimension de backend.
+BACKEND_BASE = computeStatistics.BACKEND_PYTHON
+DIRECTORIO_RESULTADOS = "../results/benchmarks"
+# Una fase se marca como regresion si tarda mas de este factor vs la base.
+UMBRAL_REGRESION = 1.10
+FASES_LECTURA = (
+    computeStatistics.FASE_LECTURA,
+    computeStatistics.FASE_TOKENIZACION,
+    computeStatistics.FASE_CONVERSION,
+)
+
+
+def reiniciar_pico_rss():
+    """
+    Reinicia el pico de RSS del proceso (Linux: /proc/self/clear_refs)
+    para medir el pico de cada fase por separado. En otros sistemas el
+    pico es acumulado desde el inicio del proceso.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as archivo:
+            archivo.write("5")
+    except OSError:
+        pass
+
+
+def leer_pico_rss_kb():
+    """Pico de RSS en KB (VmHWM en Linux, ru_maxrss en otros Unix)."""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as archivo:
+            for linea in archivo:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class MedidorMemoria(computeStatistics.MedidorFases):
+    """
+    MedidorFases que ademas guarda el pico de RSS de cada fase: el pico se
+    reinicia al entrar y se lee al salir (fuera del tiempo medido). Una
+    fase que se repite, por ejemplo una vez por bloque, guarda el mayor.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rss_pico_kb = {}
+
+    @contextlib.contextmanager
+    def fase(self, nombre):
+        reiniciar_pico_rss()
+        try:
+            with super().fase(nombre):
+                yield
+        finally:
+            pico = leer_pico_rss_kb()
+            anterior = self.rss_pico_kb.get(nombre)
+            if anterior is not None and pico is not None:
+                pico = max(pico, anterior)
+            self.rss_pico_kb[nombre] = pico
+
+
+def medir_archivo(ruta, backend=BACKEND_BASE):
+    """
+    Mide las fases de calcular_estadisticas_exactas (el camino del reporte
+    del modo exacto, con el lector por defecto) sobre un archivo con el
+    backend indicado; los limites de las fases son los de MedidorFases en
+    computeStatistics. Se ejecuta en un subproceso por archivo para que la
+    memoria de uno no afecte al otro.
+    """
+    medidor = MedidorMemoria()
+    _, total_validos, errores, total_valores = (
+        computeStatistics.calcular_estadisticas_exactas(
+            ruta, computeStatistics.LECTOR_MMAP, backend, medidor
+        )
+    )
+    fases = {
+        fase: {
+            "segundos": segundos,
+            "rss_pico_kb": medidor.rss_pico_kb.get(fase),
+        }
+        for fase, segundos in medidor.segundos.items()
+    }
+
+    return {
+        "valores_totales": total_valores,
+        "valores_validos": total_validos,
+        "errores": len(errores),
+        "tamano_bytes": os.path.getsize(ruta),
+        "fases": fases,
+    }
+
+
+def medir_en_subproceso(ruta, backend):
+    """Ejecuta medir_archivo en un interprete nuevo y lee su JSON."""
+    salida = subprocess.run(
+        [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--medir",
+            ruta,
+            "--medir-backend",
+            backend,
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(salida.stdout)
+
+
+def obtener_commit():
+    """Commit actual del repositorio o None si no se puede obtener."""
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.stdout.strip()
+
+
+def max_rss(primero, segundo):
+    """Mayor de dos picos de RSS en KB; None si no se midieron."""
+    if primero is None or segundo is None:
+        return primero if segundo is None else segundo
+    return max(primero, segundo)
+
+
+def juntar_fases_lectura(fases):
+    """
+    Fases con lectura, tokenizacion y conversion sumadas en "lectura",
+    como las median las corridas anteriores a la division de la lectura.
+    """
+    juntas = {}
+    for fase, medida in fases.items():
+        if fase in FASES_LECTURA:
+            fase = computeStatistics.FASE_LECTURA
+        if fase in juntas:
+            juntas[fase] = {
+                "segundos": juntas[fase]["segundos"] + medida["segundos"],
+                "rss_pico_kb": max_rss(
+                    juntas[fase]["rss_pico_kb"], medida["rss_pico_kb"]
+                ),
+            }
+        else:
+            juntas[fase] = medida
+    return juntas
+
+
+def comparar_con_base(resultados, ruta_base):
+    """
+    Imprime la razon tiempo_actual / tiempo_base por fase y marca como
+    REGRESION las que pasan UMBRAL_REGRESION. Si la base no separa la
+    tokenizacion, las tres fases de lectura se comparan juntas.
+    """
+    with open(ruta_base, "r", encoding="utf-8") as archivo:
+        base = json.load(archivo)
+
+    # Las corridas sin "backend" son anteriores a esa dimension: python.
+    indice = {
+        (r["distribucion"], r["n"], r.get("backend", BACKEND_BASE)): r["fases"]
+        for r in base["resultados"]
+    }
+    print("")
+    print(f"=== Comparacion contra {ruta_base} (commit {base.get('commit')}) ===")
+    for resultado in resultados:
+        clave = (
+            resultado["distribucion"],
+            resultado["n"],
+            resultado["backend"],
+        )
+        if clave not in indice:
+            continue
+        fases = resultado["fases"]
+        if computeStatistics.FASE_TOKENIZACION not in indice[clave]:
+            fases = juntar_fases_lectura(fases)
+        for fase, medida in fases.items():
+            anterior = indice[clave].get(fase)
+            if not anterior or anterior["segundos"] <= 0:
+                continue
+            razon = medida["segundos"] / anterior["segundos"]
+            marca = "  REGRESION" if razon > UMBRAL_REGRESION else ""
+            print(
+                f"{clave[0]:<11} {clave[1]:>11} {clave[2]:<7} {fase:<13} "
+                f"{razon:6.2f}x{marca}"
+            )
+
+
+def imprimir_resultado(resultado):
+    """Imprime una fila por fase de un archivo medido."""
+    for fase, medida in resultado["fases"].items():
+        rss = medida["rss_pico_kb"]
+        rss_texto = f"{rss / 1024:10.1f} MB" if rss is not None else "N/A"
+        print(
+            f"{resultado['distribucion']:<11} {resultado['n']:>11} "
+            f"{resultado['backend']:<7} "
+            f"{fase:<13} {medida['segundos']:10.4f} s  {rss_texto}"
+        )
+
+
+def construir_parser_argumentos():
+    """Define los argumentos aceptados por la linea de comandos."""
+    parser = argparse.ArgumentParser(
+        prog="benchmark_estadisticas.py",
+        description="Benchmarks por fase de computeStatistics.py.",
+    )
+    parser.add_argument(
+        "--tamanos",
+        default=DEFAULT_TAMANOS,
+        help="numeros de valores separados por coma (ej. 1000,100000000)",
+    )
+    parser.add_argument(
+        "--distribuciones",
+        default=",".join(generar_datos.DISTRIBUCIONES),
+        help="distribuciones separadas por coma",
+    )
+    parser.add_argument(
+        "--backends",
+        default=",".join(backends_disponibles()),
+        help="backends separados por coma (por defecto los instalados)",
+    )
+    parser.add_argument(
+        "--datos",
+        default=None,
+        help="directorio para conservar y reutilizar los datos generados",
+    )
+    parser.add_argument("--salida", default=None, help="archivo JSON de salida")
+    parser.add_argument(
+        "--comparar", default=None, help="JSON de una corrida anterior"
+    )
+    parser.add_argument("--medir", default=None, help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--medir-backend", default=BACKEND_BASE, help=argparse.SUPPRESS
+    )
+    return parser
+
+
+def backends_disponibles():
+    """python siempre; numpy solo si esta instalado."""
+    if computeStatistics.np is None:
+        return [computeStatistics.BACKEND_PYTHON]
+    return [computeStatistics.BACKEND_PYTHON, computeStatistics.BACKEND_NUMPY]
+
+
+def main():
+    """Genera los datos, mide cada combinacion y guarda el JSON."""
+    parser = construir_parser_argumentos()
+    argumentos = parser.parse_args()
+
+    if argumentos.medir is not None:
+        print(
+            json.dumps(
+                medir_archivo(argumentos.medir, argumentos.medir_backend)
+            )
+        )
+        return
+
+    tamanos = [int(float(t)) for t in argumentos.tamanos.split(",")]
+    distribuciones = argumentos.distribuciones.split(",")
+    backends = argumentos.backends.split(",")
+    for backend in backends:
+        if backend not in backends_disponibles():
+            parser.error(
+                f"backend '{backend}' no disponible; opciones: "
+                f"{', '.join(backends_disponibles())}"
+            )
+    directorio = argumentos.datos or tempfile.mkdtemp(prefix="bench_stats_")
+    os.makedirs(directorio, exist_ok=True)
+
+    resultados = []
+    try:
+        for distribucion in distribuciones:
+            for total in tamanos:
+                ruta = os.path.join(directorio, f"{distribucion}_{total}.txt")
+                if not os.path.exists(ruta):
+                    generar_datos.generar_archivo(distribucion, total, ruta)
+                for backend in backends:
+                    resultado = medir_en_subproceso(ruta, backend)
+                    resultado["distribucion"] = distribucion
+                    resultado["n"] = total
+                    resultado["backend"] = backend
+                    imprimir_resultado(resultado)
+                    resultados.append(resultado)
+    finally:
+        if argumentos.datos is None:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    ahora = datetime.datetime.now()
+    salida = argumentos.salida
+    if salida is None:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        salida = os.path.join(
+            DIRECTORIO_RESULTADOS,
+            f"benchmark_{ahora.strftime('%Y%m%d_%H%M%S')}.json",
+        )
+
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(
+            {
+                "commit": obtener_commit(),
+                "fecha": ahora.isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "resultados": resultados,
+            },
+            archivo,
+            indent=2,
+        )
+    print(f"Resultados guardados en: {salida}")
+
+    if argumentos.comparar is not None:
+        comparar_con_base(resultados, argumentos.comparar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+benchmark_tokenizador.py
+
+Compara el tokenizador original (caracter por caracter) contra el
+tokenizador por bloques de computeStatistics.py.
+
+P1 - TC4017 - Pruebas de software y aseguramiento de la calidad
+Carlos Isaac Sagrero Campos - A01796826
+
+Uso:
+  python benchmark_tokenizador.py [numero_de_lineas] [repeticiones]
+
+Cada tokenizador se mide varias veces y se reporta la mediana, porque
+una sola corrida varia bastante entre ejecuciones.
+"""
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import computeStatistics
+
+
+DEFAULT_LINEAS = 200_000
+DEFAULT_REPETICIONES = 5
+VALORES_POR_LINEA = 5
+SEMILLA = 4017
+
+
+def separar_tokens_por_caracter(linea_limpia):
+    """Tokenizador original: arma cada token caracter por caracter."""
+    valores = []
+    actual = ""
+
+    for caracter in linea_limpia:
+        if caracter == "," or caracter.isspace():
+            if actual:
+                valores.append(actual)
+                actual = ""
+        else:
+            actual += caracter
+
+    if actual:
+        valores.append(actual)
+
+    return valores
+
+
+def generar_lineas(numero_lineas):
+    """Genera lineas con valores separados por comas y espacios."""
+    aleatorio = random.Random(SEMILLA)
+    lineas = []
+    for _ in range(numero_lineas):
+        valores = [
+            f"{aleatorio.uniform(-1000.0, 1000.0):.4f}"
+            for _ in range(VALORES_POR_LINEA)
+        ]
+        lineas.append(", ".join(valores[:3]) + "  " + " ".join(valores[3:]))
+    return lineas
+
+
+def medir(funcion, *argumentos):
+    """Regresa (segundos, resultado) de una llamada."""
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return time.perf_counter() - inicio, resultado
+
+
+def medir_mediana(repeticiones, funcion, *argumentos):
+    """Regresa (mediana de segundos, resultado) de varias llamadas."""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        segundos, resultado = medir(funcion, *argumentos)
+        tiempos.append(segundos)
+    return statistics.median(tiempos), resultado
+
+
+def describir_maquina():
+    """Describe el interprete y la maquina donde se mide."""
+    procesador = platform.processor() or platform.machine()
+    return (
+        f"Python {platform.python_version()}  {platform.system()} "
+        f"{procesador}  CPUs: {os.cpu_count()}"
+    )
+
+
+def tokenizar_todo(tokenizador, lineas):
+    """Tokeniza todas las lineas y regresa el numero de tokens."""
+    total = 0
+    for linea in lineas:
+        total += len(tokenizador(linea.strip()))
+    return total
+
+
+def imprimir_resultado(nombre, segundos, tokens, megabytes):
+    """Imprime tiempo y throughput de una medicion."""
+    print(
+        f"{nombre:<28} {segundos:9.4f} s  "
+        f"{tokens / segundos:14,.0f} tokens/s  "
+        f"{megabytes / segundos:8.2f} MB/s"
+    )
+
+
+def main():
+    """Ejecuta las mediciones e imprime la comparacion."""
+    numero_lineas = DEFAULT_LINEAS
+    repeticiones = DEFAULT_REPETICIONES
+    if len(sys.argv) > 1:
+        numero_lineas = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        repeticiones = max(1, int(sys.argv[2]))
+
+    lineas = generar_lineas(numero_lineas)
+    contenido = "\n".join(lineas) + "\n"
+    megabytes = len(contenido.encode("utf-8")) / (1024 * 1024)
+    print(describir_maquina())
+    print(
+        f"Lineas: {numero_lineas}  Tamano: {megabytes:.2f} MB  "
+        f"Repeticiones: {repeticiones} (mediana)"
+    )
+    print("")
+
+    t_caracter, tokens = medir_mediana(
+        repeticiones, tokenizar_todo, separar_tokens_por_caracter, lineas
+    )
+    imprimir_resultado("tokenizador por caracter", t_caracter, tokens, megabytes)
+
+    t_bloque, tokens = medir_mediana(
+        repeticiones, tokenizar_todo, computeStatistics.separar_tokens, lineas
+    )
+    imprimir_resultado("tokenizador por bloque", t_bloque, tokens, megabytes)
+    print(f"Aceleracion del tokenizador: {t_caracter / t_bloque:.1f}x")
+    print("")
+
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".txt", delete=False, encoding="utf-8"
+    ) as temporal:
+        temporal.write(contenido)
+        ruta = temporal.name
+
+    try:
+        t_lectura, resultado = medir(
+            computeStatistics.leer_numeros_desde_archivo, ruta
+        )
+        imprimir_resultado(
+            "leer_numeros_desde_archivo", t_lectura, resultado[2], megabytes
+        )
+    finally:
+        os.remove(ruta)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,320 +6,5626 @@ P2 - TC4017 - Pruebas de software y aseguramiento de la calidad
 Carlos Isaac Sagrero Campos - A01796826
 
 """
-# pylint: disable=invalid-name
+# pylint: disable=invalid-name,too-many-lines
+import argparse
+import ast
+import bisect
+import bz2
+import collections
+import contextlib
+import cProfile
+import glob
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import lzma
+import mmap
+import operator
+import os
+import queue
+import stat
 import sys
+import tempfile
+import threading
 import time
+import tracemalloc
 import math
+import random
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 # Req 2: Archivo de salida con nombre fijo StatisticsResults.txt
 NOMBRE_ARCHIVO_SALIDA = "../results/StatisticsResults.txt"
 
+# Req 2: Modo --lote: un resultado por archivo y un resumen combinado.
+DEFAULT_DIRECTORIO_LOTE = "../results/lote"
+NOMBRE_RESUMEN_LOTE = "StatisticsSummary.txt"
+
+# Req 7: Nombres de las fases medidas con --metricas.
+FASE_LECTURA = "lectura"
+FASE_TOKENIZACION = "tokenizacion"
+FASE_CONVERSION = "conversion"
+FASE_ORDENAMIENTO = "ordenamiento"
+FASE_ESTADISTICAS = "estadisticas"
+FASE_REPORTE = "reporte"
+FASE_BOOTSTRAP = "bootstrap"
+FASE_OTROS = "otros"
+TOP_TRACEMALLOC = 10
+
+# Req 6: Modos de calcular_estadisticas() (uso como libreria).
+MODO_EXACTO = "exacto"
+MODO_STREAMING = "streaming"
+MODO_APROXIMADO = "aproximado"
+MODOS_API = (MODO_EXACTO, MODO_STREAMING, MODO_APROXIMADO)
+
+# Req 6: Ventanas (--ventana): deslizante (ultimos N valores) o fija
+# (bloques consecutivos de N valores sin traslape).
+VENTANA_DESLIZANTE = "deslizante"
+VENTANA_FIJA = "fija"
+DEFAULT_SALIDA_VENTANAS = "../results/StatisticsWindows.csv"
+# Los monticulos se reconstruyen cuando las entradas borradas (perezosas)
+# superan a las vigentes; asi el tamano queda acotado en O(N).
+MINIMO_COMPACTAR_MONTICULOS = 64
+
+# Req 6: Ordenamiento externo (--ordenar-salida). Cada corrida ordenada
+# ocupa ~48 bytes por valor mientras se ordena (array de 8 bytes mas la
+# lista temporal de floats de sorted()); el tope de memoria se divide
+# entre ese costo para obtener el tamano de corrida.
+FORMATO_TEXTO = "texto"
+FORMATO_BINARIO = "binario"
+DEFAULT_MEMORIA_ORDENAMIENTO_MB = 256
+BYTES_POR_VALOR_CORRIDA = 48
+MINIMO_VALORES_CORRIDA = 1024
+FAN_IN_MAXIMO = 64
+VALORES_POR_ESCRITURA = 1 << 16
+
+# Req 6: Tamano (en caracteres) de cada bloque leido del archivo.
+TAMANO_BLOQUE_LECTURA = 1 << 20
+
+# Modo --moda-aproximada: contadores del resumen Space-Saving.
+DEFAULT_CAPACIDAD_FRECUENTES = 1000
+
+# Req 6: Lectores disponibles; mmap analiza bytes crudos sin decodificar.
+LECTOR_MMAP = "mmap"
+LECTOR_TEXTO = "texto"
+# Req 6: Entradas binarias: float64 little-endian crudo o arreglo .npy.
+LECTOR_BINARIO = "binario"
+LECTOR_NPY = "npy"
+LECTORES_BINARIOS = (LECTOR_BINARIO, LECTOR_NPY)
+MAGIA_NPY = b"\x93NUMPY"
+BYTES_FLOAT64 = 8
+VALORES_POR_BLOQUE_BINARIO = 1 << 16
+# Req 1: Entradas comprimidas, detectadas por sus bytes iniciales (no por
+# la extension) y descomprimidas por bloques de TAMANO_BLOQUE_LECTURA.
+# bzip2 incluye la firma del primer bloque para no confundirse con un
+# archivo de texto que empiece con "BZh".
+MAGIAS_COMPRESION = (
+    (b"\x1f\x8b\x08", "gzip"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+MAGIA_BZIP2 = b"BZh"
+FIRMA_BLOQUE_BZIP2 = b"1AY&SY"
+BYTES_MAGIA_COMPRESION = 10
+ABRIR_COMPRIMIDO = {"gzip": gzip.open, "bzip2": bz2.open, "xz": lzma.open}
+# Errores de datos corruptos o truncados que no son OSError.
+ERRORES_DESCOMPRESION = (EOFError, zlib.error, lzma.LZMAError)
+# Bloques descomprimidos que el hilo de --descomprimir-en-hilo puede
+# adelantar al tokenizador (memoria acotada a ~4 MiB).
+BLOQUES_EN_COLA = 4
+# Comas y separadores ASCII que str.isspace() acepta y bytes.split() no.
+TABLA_SEPARADORES_BYTES = bytes.maketrans(b",\x1c\x1d\x1e\x1f", b"     ")
+
+# Backend del calculo exacto en memoria (NumPy es opcional).
+BACKEND_AUTO = "auto"
+BACKEND_PYTHON = "python"
+BACKEND_NUMPY = "numpy"
+# Valores por bloque de las sumas secuenciales del backend NumPy; acota el
+# arreglo temporal de np.cumsum sin importar el tamano de la entrada.
+VALORES_POR_BLOQUE_SUMA = 1 << 16
+
+# Version del formato JSON de EstadoEstadistico (--guardar-estado).
+VERSION_ESTADO = 1
+
+# Modo --incremental: bytes usados para la huella del archivo ya procesado.
+TAMANO_MUESTRA_HUELLA = 1 << 16
+
+# Req 7: Cache de resultados (--cache). La llave es el sha256 del contenido
+# del archivo mas las opciones que cambian el resultado; cada entrada es
+# un JSON y se desalojan las de uso mas antiguo (mtime) al pasar el tope.
+VERSION_CACHE = 2
+DEFAULT_CACHE_MAX_MB = 64
+EXTENSION_CACHE = ".json"
+OPCIONES_LLAVE_CACHE = (
+    "pares",
+    "streaming",
+    "lector",
+    "backend",
+    "approx",
+    "error_rango",
+    "moda_aproximada",
+    "confirmar_moda",
+    "workers",
+    "extendidas",
+    "cuantiles",
+    "histograma",
+    "histograma_log",
+    "muestra_errores",
+    "bootstrap",
+    "confianza",
+    "semilla_bootstrap",
+)
+# Opciones que escriben otros archivos o miden la corrida: no usan cache.
+OPCIONES_SIN_CACHE = (
+    "metricas",
+    "metricas_json",
+    "cprofile",
+    "tracemalloc",
+    "guardar_estado",
+    "incremental",
+    "combinar_estados",
+    "ordenar_salida",
+    "ventana",
+    "archivo_errores",
+)
+# Req 7: Errores que incluyen la ruta del archivo; en el cache la ruta se
+# guarda como MARCA_RUTA_CACHE y cada acierto pone la de su corrida.
+PREFIJOS_ERROR_CON_RUTA = (
+    "No se encontro el archivo: ",
+    "Sin permisos para leer el archivo: ",
+    "Error al leer el archivo '",
+)
+MARCA_RUTA_CACHE = "\x00ruta\x00"
+PREFIJO_ARCHIVO_ENTRADA = "Archivo de entrada: "
+PREFIJO_TIEMPO = "Tiempo transcurrido (segundos): "
+# Inicio de los mensajes de formatear_error_token (--workers los renumera).
+PREFIJO_ERROR_LINEA = "Error en linea "
+
+# Modo --approx: sketch KLL con semilla fija para reportes reproducibles.
+DEFAULT_ERROR_RANGO = 0.01
+DEFAULT_K_KLL = 200
+SEMILLA_KLL = 4017
+CUANTILES_APROXIMADOS = (
+    ("p50", 0.5),
+    ("p90", 0.9),
+    ("p99", 0.99),
+    ("p99.9", 0.999),
+)
+
+
+# Req 3: Errores. El reporte muestra solo los primeros
+# LIMITE_MUESTRA_ERRORES mensajes; el total y el conteo por tipo se
+# llevan completos y --archivo-errores recibe todos los mensajes.
+LIMITE_MUESTRA_ERRORES = 100
+# (texto del mensaje, tipo); gana la primera coincidencia.
+TIPOS_ERROR = (
+    ("NaN no permitido", "nan"),
+    ("Inf no permitido", "inf"),
+    ("No se encontro el archivo", "archivo_no_encontrado"),
+    ("Sin permisos", "sin_permisos"),
+    ("No se pudo cargar el estado", "estado_invalido"),
+    ("bytes sobrantes", "binario_incompleto"),
+    ("columnas (x, y)", "columnas_incorrectas"),
+    ("Error al leer el archivo", "lectura"),
+    ("invalido (", "valor_no_numerico"),
+)
+TIPO_ERROR_OTRO = "otro"
+
+# Req 2: Modo --pares: dos columnas (x, y) por linea.
+COLUMNAS_PARES = 2
+
+# Req 2: Estadisticas extendidas (--extendidas, --cuantiles, --histograma).
+DEFAULT_CUANTILES = (0.25, 0.75)
+
+# Req 2: Intervalos de confianza por remuestreo (--bootstrap). Las
+# remuestras se reparten en tareas de tamano fijo, cada una con su propia
+# semilla: el resultado no depende del numero de procesos.
+DEFAULT_CONFIANZA = 0.95
+SEMILLA_BOOTSTRAP = 4017
+REMUESTRAS_POR_TAREA = 16
+ESTADISTICAS_BOOTSTRAP = (
+    ("media", "Mean (media)"),
+    ("mediana", "Median (mediana)"),
+    ("desviacion_estandar", "Standard deviation (desviacion estandar)"),
+)
+# Valores que usan las tareas de --bootstrap en el proceso actual; los
+# fija iniciar_proceso_bootstrap una vez por proceso.
+VALORES_BOOTSTRAP = {}
+
+
+class MedidorFases:
+    """
+    Req 7: Acumula el tiempo de cada fase de la ejecucion (lectura,
+    tokenizacion, conversion, ordenamiento, estadisticas, reporte) para
+    las opciones --metricas y --metricas-json.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.segundos = {}
+
+    @contextlib.contextmanager
+    def fase(self, nombre):
+        """Contexto que suma a `nombre` el tiempo transcurrido dentro."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.segundos[nombre] = (
+                self.segundos.get(nombre, 0.0) + time.perf_counter() - inicio
+            )
+
+    def repartir(self, segundos, pesos):
+        """
+        Suma `segundos` medidos fuera de las fases (por ejemplo esperando a
+        otros procesos) a las fases de `pesos` {fase: segundos medidos
+        alla}, en proporcion a cada peso.
+        """
+        total = sum(pesos.values())
+        if total <= 0:
+            return
+        for nombre, peso in pesos.items():
+            self.segundos[nombre] = (
+                self.segundos.get(nombre, 0.0) + segundos * peso / total
+            )
+
+    def resumen(self, total_valores, total_errores):
+        """
+        Diccionario con segundos por fase, el tiempo no asignado a ninguna
+        fase ("otros") y tokens/errores por segundo de lectura.
+        """
+        total = time.perf_counter() - self.inicio
+        fases = dict(self.segundos)
+        fases[FASE_OTROS] = max(0.0, total - sum(self.segundos.values()))
+
+        segundos_lectura = 0.0
+        for nombre in (FASE_LECTURA, FASE_TOKENIZACION, FASE_CONVERSION):
+            segundos_lectura += self.segundos.get(nombre, 0.0)
+
+        por_segundo = {"tokens": None, "errores": None}
+        if segundos_lectura > 0:
+            por_segundo["tokens"] = total_valores / segundos_lectura
+            por_segundo["errores"] = total_errores / segundos_lectura
+
+        return {
+            "total_segundos": total,
+            "fases": fases,
+            "tokens": total_valores,
+            "errores": total_errores,
+            "tokens_por_segundo": por_segundo["tokens"],
+            "errores_por_segundo": por_segundo["errores"],
+        }
+
+
+def medir_fase(medidor, nombre):
+    """Req 7: medidor.fase(nombre), o un contexto vacio sin medidor."""
+    if medidor is None:
+        return contextlib.nullcontext()
+    return medidor.fase(nombre)
+
+
+def iterar_con_fase(elementos, medidor, nombre):
+    """
+    Req 7: Entrega los elementos de un iterable y suma a la fase `nombre`
+    solo el tiempo de producir cada uno (no el del consumidor).
+    """
+    if medidor is None:
+        yield from elementos
+        return
+
+    iterador = iter(elementos)
+    while True:
+        with medidor.fase(nombre):
+            elemento = next(iterador, None)
+        if elemento is None:
+            return
+        yield elemento
+
+
+def clasificar_error(mensaje):
+    """Req 3: Tipo de un mensaje de error segun TIPOS_ERROR."""
+    for texto, tipo in TIPOS_ERROR:
+        if texto in mensaje:
+            return tipo
+    return TIPO_ERROR_OTRO
+
+
+class ColectorErrores:
+    """
+    Req 3 y Req 6: Sustituye a la lista de mensajes de error con memoria
+    acotada. Cuenta todos los errores (total y por tipo), guarda solo los
+    primeros `limite_muestra` para el reporte y, si tiene `destino` (un
+    archivo de texto abierto), escribe cada mensaje en cuanto ocurre.
+    Acepta append, extend, len e iteracion (sobre la muestra) como una
+    lista, asi el resto del codigo no cambia.
+    """
+
+    def __init__(self, limite_muestra=LIMITE_MUESTRA_ERRORES, destino=None):
+        self.limite_muestra = limite_muestra
+        self.destino = destino
+        self.muestra = []
+        self.total = 0
+        self.por_tipo = {}
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        return iter(self.muestra)
+
+    def append(self, mensaje):
+        """Registra un mensaje de error."""
+        self.total += 1
+        tipo = clasificar_error(mensaje)
+        self.por_tipo[tipo] = self.por_tipo.get(tipo, 0) + 1
+        if len(self.muestra) < self.limite_muestra:
+            self.muestra.append(mensaje)
+        if self.destino is not None:
+            self.destino.write(mensaje + "\n")
+
+    def extend(self, mensajes):
+        """Registra varios mensajes en orden."""
+        for mensaje in mensajes:
+            self.append(mensaje)
+
+    def combinar(self, otro):
+        """
+        Suma los conteos de otro colector y completa la muestra con la
+        suya. No reescribe sus mensajes en `destino` (ya se escribieron o
+        solo queda la muestra).
+        """
+        self.total += otro.total
+        for tipo, conteo in otro.por_tipo.items():
+            self.por_tipo[tipo] = self.por_tipo.get(tipo, 0) + conteo
+        espacio = self.limite_muestra - len(self.muestra)
+        if espacio > 0:
+            self.muestra.extend(otro.muestra[:espacio])
+
+    def omitidos(self):
+        """Errores contados que no estan en la muestra."""
+        return self.total - len(self.muestra)
+
+    def a_diccionario(self):
+        """Representacion serializable (JSON) del colector."""
+        return {"muestra": list(self.muestra), "por_tipo": dict(self.por_tipo)}
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """
+        Reconstruye un colector guardado con a_diccionario. Acepta tambien
+        la lista de mensajes de los estados anteriores al colector.
+        """
+        colector = cls()
+        if isinstance(datos, list):
+            colector.extend(str(mensaje) for mensaje in datos)
+            return colector
+        colector.muestra = [str(mensaje) for mensaje in datos["muestra"]]
+        colector.por_tipo = {
+            str(tipo): int(conteo)
+            for tipo, conteo in datos["por_tipo"].items()
+        }
+        colector.total = sum(colector.por_tipo.values())
+        return colector
+
+
+def separar_tokens(linea):
+    """
+    Separa tokens por comas o espacios con operaciones en bloque:
+    las comas se vuelven espacios y str.split() corta en cualquier
+    espacio en blanco (mismo criterio que str.isspace()).
+    """
+    return linea.replace(",", " ").split()
+
+
+def iterar_bloques_texto(archivo, tamano_bloque=TAMANO_BLOQUE_LECTURA):
+    """
+    Req 6: Lee el archivo de texto en bloques grandes cortados en el ultimo
+    salto de linea; la linea incompleta de cada bloque se une con el
+    siguiente. Cada bloque termina en "\n", salvo el ultimo.
+    """
+    pendiente = ""
+
+    while True:
+        bloque = archivo.read(tamano_bloque)
+        if not bloque:
+            break
+
+        bloque = pendiente + bloque
+        corte = bloque.rfind("\n") + 1
+        pendiente = bloque[corte:]
+        if corte:
+            yield bloque[:corte]
+
+    if pendiente:
+        yield pendiente
+
+
+def convertir_a_float_seguro(valor_str):
+    """Convierte a float y rechaza NaN e Inf."""
+    valor = float(valor_str)
+
+    # NaN check (NaN != NaN siempre es True)
+    #Como me diste lata con el pylint
+    if math.isnan(valor):
+        raise ValueError("NaN no permitido")
+
+    if math.isinf(valor):
+        raise ValueError("Inf no permitido")
+
+    return valor
+
+
+def formatear_error_token(numero_linea, valor_str, exc):
+    """Req 3: Mensaje de error de un token invalido con su numero de linea."""
+    return (
+        f"{PREFIJO_ERROR_LINEA}{numero_linea}: valor "
+        f"'{valor_str}' invalido ({exc})"
+    )
+
+
+def iterar_bloques_mmap(mapa, inicio=0, tamano=None):
+    """
+    Req 6: Corta el archivo mapeado (o solo sus bytes [inicio, tamano))
+    en bloques de lineas completas (cada bloque termina en "\n", salvo el
+    ultimo) con saltos normalizados como en el modo texto.
+    """
+    if tamano is None:
+        tamano = len(mapa)
+
+    while inicio < tamano:
+        fin = min(inicio + TAMANO_BLOQUE_LECTURA, tamano)
+        if fin < tamano:
+            corte = mapa.rfind(b"\n", inicio, fin) + 1
+            if corte == 0 or corte <= inicio:
+                # Linea mas larga que el bloque: se extiende hasta su fin.
+                corte = mapa.find(b"\n", fin, tamano) + 1 or tamano
+            fin = corte
+
+        bloque = mapa[inicio:fin]
+        inicio = fin
+        if b"\r" in bloque:
+            bloque = bloque.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        yield bloque
+
+
+def detectar_compresion(ruta_archivo):
+    """
+    Req 1: Regresa "gzip", "bzip2", "xz" o None segun los bytes iniciales
+    del archivo. Las entradas que no son archivos regulares (tuberias) no
+    se revisan para no consumir sus primeros bytes.
+    """
+    with open(ruta_archivo, "rb") as archivo:
+        if not stat.S_ISREG(os.fstat(archivo.fileno()).st_mode):
+            return None
+        inicio = archivo.read(BYTES_MAGIA_COMPRESION)
+
+    for magia, compresion in MAGIAS_COMPRESION:
+        if inicio.startswith(magia):
+            return compresion
+    if (
+        inicio.startswith(MAGIA_BZIP2)
+        and inicio[3:4].isdigit()
+        and inicio[4:] == FIRMA_BLOQUE_BZIP2
+    ):
+        return "bzip2"
+    return None
+
+
+def abrir_entrada(ruta_archivo, compresion):
+    """Req 1: Abre el archivo en binario, descomprimiendo si hace falta."""
+    if compresion is None:
+        return open(ruta_archivo, "rb")
+    return ABRIR_COMPRIMIDO[compresion](ruta_archivo, "rb")
+
+
+def iterar_bloques_descomprimidos(ruta_archivo, compresion):
+    """
+    Req 6: Descomprime el archivo por bloques de TAMANO_BLOQUE_LECTURA
+    bytes sin guardarlo completo en memoria ni en disco.
+    """
+    with abrir_entrada(ruta_archivo, compresion) as archivo:
+        while True:
+            bloque = archivo.read(TAMANO_BLOQUE_LECTURA)
+            if not bloque:
+                return
+            yield bloque
+
+
+def iterar_bloques_en_hilo(bloques):
+    """
+    Req 6: Consume el generador `bloques` en un hilo en segundo plano y
+    entrega sus elementos por una cola acotada a BLOQUES_EN_COLA. zlib,
+    bz2 y lzma liberan el GIL al descomprimir, asi la descompresion se
+    traslapa con la tokenizacion. Una excepcion del hilo se vuelve a
+    lanzar aqui; si el consumidor se detiene antes, el hilo termina y el
+    generador se cierra.
+    """
+    cola = queue.Queue(BLOQUES_EN_COLA)
+    detener = threading.Event()
+
+    def encolar(elemento):
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producir():
+        try:
+            for bloque in bloques:
+                if not encolar((bloque, None)):
+                    return
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            encolar((None, exc))
+            return
+        encolar((None, None))
+
+    hilo = threading.Thread(
+        target=producir, name="descompresion", daemon=True
+    )
+    hilo.start()
+    try:
+        while True:
+            bloque, exc = cola.get()
+            if bloque is None:
+                if exc is not None:
+                    raise exc
+                return
+            yield bloque
+    finally:
+        detener.set()
+        hilo.join()
+        bloques.close()
+
+
+def abrir_bloques_descomprimidos(ruta_archivo, compresion, en_hilo=False):
+    """
+    Req 6: Bloques de bytes descomprimidos, producidos en este hilo o
+    (en_hilo) en uno en segundo plano.
+    """
+    bloques = iterar_bloques_descomprimidos(ruta_archivo, compresion)
+    if en_hilo:
+        return iterar_bloques_en_hilo(bloques)
+    return bloques
+
+
+def iterar_bloques_lineas(bloques):
+    """
+    Req 6: Igual que iterar_bloques_mmap pero sobre un flujo de bloques de
+    bytes (entrada comprimida): cada bloque termina en una linea completa
+    y los saltos quedan normalizados. Una linea que cruza varios bloques
+    se junta una sola vez, cuando llega su salto.
+    """
+    pendientes = []
+    for bloque in bloques:
+        corte = bloque.rfind(b"\n") + 1
+        if corte == 0:
+            pendientes.append(bloque)
+            continue
+        pendientes.append(bloque[:corte])
+        yield unir_bloque_lineas(pendientes)
+        pendientes = [bloque[corte:]] if corte < len(bloque) else []
+
+    if pendientes:
+        yield unir_bloque_lineas(pendientes)
+
+
+def unir_bloque_lineas(partes):
+    """Req 6: Une las partes de un bloque y normaliza \\r\\n y \\r."""
+    bloque = b"".join(partes)
+    if b"\r" in bloque:
+        bloque = bloque.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return bloque
+
+
+def traducir_bloque(bloque):
+    """
+    Req 6: Prepara un bloque de lineas para separarlo en bloque: si es ASCII
+    se quedan los bytes con comas (y separadores que str.split() acepta y
+    bytes.split() no) convertidos en espacios; si no, se decodifica a str y
+    las comas se vuelven espacios. Un bloque ya decodificado (lector de
+    texto) solo cambia las comas.
+    """
+    if isinstance(bloque, str):
+        return bloque.replace(",", " ")
+    if bloque.isascii():
+        return bloque.translate(TABLA_SEPARADORES_BYTES)
+    return bloque.decode("utf-8").replace(",", " ")
+
+
+def separar_lineas(traducido):
+    """Req 6: Lineas de un bloque traducido (sin la pieza vacia final)."""
+    salto = b"\n" if isinstance(traducido, bytes) else "\n"
+    lineas = traducido.split(salto)
+    if not lineas[-1]:
+        lineas.pop()
+    return lineas
+
+
+def iterar_numeros_en_lineas(lineas, linea_base, errores, conteo):
+    """
+    Req 3 y Req 6: Convierte los tokens de cada linea (bytes o str) y
+    registra los invalidos con su numero de linea (linea_base + posicion).
+    """
+    return iterar_numeros_en_tokens(
+        (linea.split() for linea in lineas), linea_base, errores, conteo
+    )
+
+
+def iterar_numeros_en_tokens(tokens_por_linea, linea_base, errores, conteo):
+    """
+    Req 3 y Req 6: Convierte los tokens ya separados de cada linea. Los
+    tokens en bytes se convierten directo; solo un token invalido se
+    decodifica para generar el mismo mensaje que el lector de texto.
+    """
+    es_finito = math.isfinite
+    numero_linea = linea_base
+
+    for tokens in tokens_por_linea:
+        numero_linea += 1
+        conteo["total_valores"] += len(tokens)
+        for valor_token in tokens:
+            try:
+                valor = float(valor_token)
+            except ValueError:
+                valor = None
+            if valor is not None and es_finito(valor):
+                yield valor
+                continue
+
+            # Camino lento: mismo mensaje que el lector de texto.
+            if isinstance(valor_token, bytes):
+                valor_token = valor_token.decode("ascii")
+            try:
+                convertir_a_float_seguro(valor_token)
+            except ValueError as exc:
+                errores.append(
+                    formatear_error_token(numero_linea, valor_token, exc)
+                )
+
+
+def convertir_bloque_rapido(tokens):
+    """
+    Req 6: Camino rapido para bloques limpios: convierte todos los tokens
+    con list(map(float)) (sin un ciclo de Python por token) y descarta
+    NaN/Inf con una sola suma. Regresa None si algun token no es un numero
+    finito (o si solo se desborda la suma). La lista se pasa despues a
+    array('d'): es mas rapido que llenar el arreglo desde el iterador.
+    """
+    try:
+        valores = list(map(float, tokens))
+    except ValueError:
+        return None
+    if not math.isfinite(sum(valores)):
+        return None
+    return array("d", valores)
+
+
+def contar_lineas(traducido):
+    """Req 6: Numero de lineas que separar_lineas regresaria."""
+    salto = b"\n" if isinstance(traducido, bytes) else "\n"
+    lineas = traducido.count(salto)
+    if traducido and not traducido.endswith(salto):
+        lineas += 1
+    return lineas
+
+
+def convertir_bloque_lineas(traducido, tokens, linea_base, errores, conteo):
+    """
+    Req 3 y Req 6: Convierte los `tokens` de un bloque de lineas ya
+    traducido y regresa (array('d') de valores validos, lineas del
+    bloque). Primero intenta convertir_bloque_rapido; si falla, el bloque
+    se repite linea por linea y token por token con el camino de siempre
+    para reportar cada error con su numero de linea.
+    """
+    valores = convertir_bloque_rapido(tokens)
+    if valores is not None:
+        conteo["total_valores"] += len(tokens)
+        return valores, contar_lineas(traducido)
+
+    lineas = separar_lineas(traducido)
+    valores = array(
+        "d", iterar_numeros_en_lineas(lineas, linea_base, errores, conteo)
+    )
+    return valores, len(lineas)
+
+
+def iterar_arreglos_en_bloques(
+    bloques, errores, conteo, medidor=None, convertir=convertir_bloque_lineas
+):
+    """
+    Req 6: Convierte bloques de lineas completas en bytes (del mmap o de
+    una entrada comprimida) o en str (lector de texto) en un array('d')
+    por bloque, llevando la
+    cuenta de lineas para los errores en conteo["lineas"] (si ya trae un
+    valor, la numeracion continua desde ahi). convertir: funcion con la
+    firma de convertir_bloque_lineas (convertir_bloque_numpy entrega
+    arreglos de NumPy).
+    """
+    if medidor is not None:
+        yield from iterar_arreglos_bloques_medido(
+            bloques, errores, conteo, medidor, convertir
+        )
+        return
+
+    numero_linea = conteo.get("lineas", 0)
+    for bloque in bloques:
+        traducido = traducir_bloque(bloque)
+        valores, lineas = convertir(
+            traducido, traducido.split(), numero_linea, errores, conteo
+        )
+        numero_linea += lineas
+        conteo["lineas"] = numero_linea
+        yield valores
+
+
+def iterar_arreglos_bloques_medido(
+    bloques, errores, conteo, medidor, convertir=convertir_bloque_lineas
+):
+    """
+    Req 7: Variante de iterar_arreglos_en_bloques para --metricas: mide
+    por separado lectura, tokenizacion y conversion de cada bloque.
+    """
+    numero_linea = conteo.get("lineas", 0)
+
+    while True:
+        with medidor.fase(FASE_LECTURA):
+            bloque = next(bloques, None)
+        if bloque is None:
+            return
+
+        with medidor.fase(FASE_TOKENIZACION):
+            traducido = traducir_bloque(bloque)
+            tokens = traducido.split()
+
+        with medidor.fase(FASE_CONVERSION):
+            valores, lineas = convertir(
+                traducido, tokens, numero_linea, errores, conteo
+            )
+        numero_linea += lineas
+        conteo["lineas"] = numero_linea
+        yield valores
+
+
+def iterar_arreglos_texto(
+    ruta_archivo,
+    errores,
+    conteo,
+    medidor=None,
+    convertir=convertir_bloque_lineas,
+):
+    """
+    Req 6: Lector de texto: decodifica UTF-8 por bloques de lineas y
+    entrega un array('d') por bloque (ver iterar_arreglos_en_bloques).
+    """
+    with open(ruta_archivo, "r", encoding="utf-8") as archivo:
+        yield from iterar_arreglos_en_bloques(
+            iterar_bloques_texto(archivo), errores, conteo, medidor, convertir
+        )
+
+
+def iterar_arreglos_mmap(
+    ruta_archivo,
+    errores,
+    conteo,
+    medidor=None,
+    convertir=convertir_bloque_lineas,
+):
+    """
+    Req 6: Lector por mmap: busca delimitadores sobre los bytes crudos y
+    convierte los tokens desde sus bytes, sin decodificar el archivo ni
+    crear un str por linea. Un bloque con bytes no ASCII se decodifica y
+    pasa por el tokenizador de texto para conservar el mismo criterio de
+    separacion. Los mensajes de error son los mismos.
+    """
+    with open(ruta_archivo, "rb") as archivo:
+        informacion = os.fstat(archivo.fileno())
+        if not stat.S_ISREG(informacion.st_mode):
+            yield from iterar_arreglos_texto(
+                ruta_archivo, errores, conteo, medidor, convertir
+            )
+            return
+        if informacion.st_size == 0:
+            return
+
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            yield from iterar_arreglos_en_bloques(
+                iterar_bloques_mmap(mapa), errores, conteo, medidor, convertir
+            )
+
+
+def iterar_arreglos_en_rango(
+    ruta_archivo, rango, errores, conteo, medidor=None
+):
+    """
+    Req 6: Lector de --workers: mapea el archivo y convierte solo los
+    bytes del rango (inicio, fin), alineado a lineas, con el mismo
+    tokenizador y la misma conversion por bloques que
+    iterar_arreglos_mmap. Los errores numeran las lineas a partir de
+    conteo["lineas"] (0 si no trae valor).
+    Req 3: Lanza UnicodeDecodeError si el rango no es UTF-8 valido.
+    Req 7: medidor: ver iterar_arreglos_en_bloques.
+    """
+    inicio, fin = rango
+    if fin <= inicio:
+        return
+    with open(ruta_archivo, "rb") as archivo, mmap.mmap(
+        archivo.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapa:
+        yield from iterar_arreglos_en_bloques(
+            iterar_bloques_mmap(mapa, inicio, fin), errores, conteo, medidor
+        )
+
+
+def leer_encabezado_npy(mapa):
+    """
+    Req 6: Valida el encabezado de un .npy y regresa (desplazamiento de
+    los datos, orden de bytes). Solo acepta float64 ('<f8' o '>f8');
+    la forma del arreglo no importa porque se leen todos los valores.
+    """
+    if mapa[:len(MAGIA_NPY)] != MAGIA_NPY:
+        raise ValueError("no es un archivo .npy")
+
+    version = mapa[len(MAGIA_NPY)]
+    if version == 1:
+        bytes_longitud = 2
+    elif version in (2, 3):
+        bytes_longitud = 4
+    else:
+        raise ValueError(f"version .npy {version} no soportada")
+
+    inicio = len(MAGIA_NPY) + 2
+    longitud = int.from_bytes(
+        mapa[inicio:inicio + bytes_longitud], "little"
+    )
+    desplazamiento = inicio + bytes_longitud + longitud
+    try:
+        encabezado = ast.literal_eval(
+            bytes(mapa[inicio + bytes_longitud:desplazamiento]).decode(
+                "latin1"
+            )
+        )
+        descriptor = encabezado["descr"]
+    except (ValueError, SyntaxError, TypeError, KeyError) as exc:
+        raise ValueError("encabezado .npy invalido") from exc
+
+    if descriptor not in ("<f8", ">f8"):
+        raise ValueError(
+            f"tipo {descriptor!r} no soportado (se requiere float64)"
+        )
+    orden = "little" if descriptor == "<f8" else "big"
+    return desplazamiento, orden
+
+
+def filtrar_bloque_binario(bloque, indice_base, errores):
+    """
+    Req 3: Regresa el bloque sin los NaN/Inf y registra cada uno con su
+    posicion (indice base 1 dentro del archivo).
+    """
+    # Si la suma es finita ningun valor es NaN/Inf; si no, se revisa uno
+    # por uno (tambien cuando solo se desborda la suma).
+    if math.isfinite(sum(bloque)):
+        return bloque
+
+    validos = array("d")
+    for posicion, valor in enumerate(bloque, start=indice_base + 1):
+        try:
+            validos.append(convertir_a_float_seguro(valor))
+        except ValueError as exc:
+            errores.append(
+                f"Error en posicion {posicion}: valor '{valor}' "
+                f"invalido ({exc})"
+            )
+    return validos
+
+
+def iterar_bloques_vista(vista, orden, indice_base, errores):
+    """
+    Req 6: Parte la vista de bytes en bloques de float64. Con el orden de
+    bytes de la maquina cada bloque es un memoryview sin copia; con el
+    orden contrario se copia a un array('d') y se invierten los bytes.
+    """
+    tamano_bloque = VALORES_POR_BLOQUE_BINARIO * BYTES_FLOAT64
+    for inicio in range(0, len(vista), tamano_bloque):
+        with vista[inicio:inicio + tamano_bloque] as crudo:
+            if orden == sys.byteorder:
+                with crudo.cast("d") as bloque:
+                    yield filtrar_bloque_binario(
+                        bloque, indice_base, errores
+                    )
+                    indice_base += len(bloque)
+            else:
+                bloque = array("d", crudo.tobytes())
+                bloque.byteswap()
+                yield filtrar_bloque_binario(bloque, indice_base, errores)
+                indice_base += len(bloque)
+
+
+def reportar_bytes_sobrantes(errores, sobrantes):
+    """Req 3: Error de un archivo binario que no termina en un float64."""
+    errores.append(
+        f"Error en archivo binario: {sobrantes} bytes "
+        "sobrantes al final (no forman un float64)"
+    )
+
+
+def iterar_bloques_binarios_comprimidos(crudos, errores, conteo, lector):
+    """
+    Req 6: Variante de iterar_bloques_binarios para entradas comprimidas:
+    convierte cada bloque descomprimido a un array('d') y guarda para el
+    siguiente los bytes que no completan un float64. El encabezado .npy
+    se lee del primer bloque.
+    """
+    pendiente = b""
+    orden = "little"
+    indice_base = 0
+    leer_encabezado = lector == LECTOR_NPY
+
+    for crudo in crudos:
+        datos = pendiente + crudo if pendiente else crudo
+        if leer_encabezado:
+            desplazamiento, orden = leer_encabezado_npy(datos)
+            datos = datos[desplazamiento:]
+            leer_encabezado = False
+        util = len(datos) - len(datos) % BYTES_FLOAT64
+        pendiente = datos[util:]
+
+        bloque = array("d")
+        bloque.frombytes(datos[:util])
+        if orden != sys.byteorder:
+            bloque.byteswap()
+        conteo["total_valores"] += len(bloque)
+        yield filtrar_bloque_binario(bloque, indice_base, errores)
+        indice_base += len(bloque)
+
+    if pendiente:
+        reportar_bytes_sobrantes(errores, len(pendiente))
+
+
+def iterar_bloques_binarios(
+    ruta_archivo, errores, conteo, lector, en_hilo=False
+):
+    """
+    Req 1 y Req 6: Lee float64 crudos (LECTOR_BINARIO, little-endian) o un
+    .npy (LECTOR_NPY) por mmap y entrega bloques de valores finitos sin
+    pasar por texto. Los bloques pueden ser vistas del mmap: el consumidor
+    debe copiarlos o recorrerlos antes de pedir el siguiente.
+    conteo["total_valores"] cuenta todos los valores (incluidos NaN/Inf).
+    Una entrada gzip/bzip2/xz se descomprime por bloques (en un hilo en
+    segundo plano si en_hilo).
+    """
+    try:
+        compresion = detectar_compresion(ruta_archivo)
+        if compresion is not None:
+            yield from iterar_bloques_binarios_comprimidos(
+                abrir_bloques_descomprimidos(
+                    ruta_archivo, compresion, en_hilo
+                ),
+                errores,
+                conteo,
+                lector,
+            )
+            return
+
+        with open(ruta_archivo, "rb") as archivo:
+            if os.fstat(archivo.fileno()).st_size == 0:
+                return
+            with mmap.mmap(
+                archivo.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapa, memoryview(mapa) as vista:
+                desplazamiento, orden = 0, "little"
+                if lector == LECTOR_NPY:
+                    desplazamiento, orden = leer_encabezado_npy(mapa)
+
+                sobrantes = (len(vista) - desplazamiento) % BYTES_FLOAT64
+                fin = len(vista) - sobrantes
+                conteo["total_valores"] += (
+                    (fin - desplazamiento) // BYTES_FLOAT64
+                )
+                with vista[desplazamiento:fin] as datos:
+                    yield from iterar_bloques_vista(datos, orden, 0, errores)
+                if sobrantes:
+                    reportar_bytes_sobrantes(errores, sobrantes)
+    except FileNotFoundError:
+        errores.append(f"No se encontro el archivo: {ruta_archivo}")
+    except PermissionError:
+        errores.append(f"Sin permisos para leer el archivo: {ruta_archivo}")
+    except (OSError, ValueError) + ERRORES_DESCOMPRESION as exc:
+        errores.append(f"Error al leer el archivo '{ruta_archivo}': {exc}")
+
+
+def iterar_numeros_desde_archivo(  # pylint: disable=too-many-arguments
+    ruta_archivo, errores, conteo, lector=None, medidor=None, *, en_hilo=False
+):
+    """
+    Req 6: Generador; entrega cada numero valido sin guardarlo en memoria.
+    Mismos parametros que iterar_arreglos_desde_archivo.
+    """
+    for bloque in iterar_arreglos_desde_archivo(
+        ruta_archivo, errores, conteo, lector, medidor, en_hilo=en_hilo
+    ):
+        yield from bloque
+
+
+def iterar_arreglos_desde_archivo(  # pylint: disable=too-many-arguments
+    ruta_archivo,
+    errores,
+    conteo,
+    lector=None,
+    medidor=None,
+    *,
+    en_hilo=False,
+    convertir=convertir_bloque_lineas,
+):
+    """
+    Req 1: Lee el archivo recibido como parametro.
+    Req 3: Detecta tokens invalidos, los agrega a errores y continua.
+    Req 6: Entrega los numeros validos por bloques (array('d') o vistas
+    de float64) sin guardar el archivo en memoria; cada bloque debe
+    consumirse antes de pedir el siguiente.
+    conteo["total_valores"] acumula los tokens leidos (validos + invalidos).
+    lector: LECTOR_MMAP (bytes crudos, por defecto), LECTOR_TEXTO o uno
+    de LECTORES_BINARIOS (float64 crudo o .npy).
+    medidor: MedidorFases opcional; los lectores de texto separan
+    lectura, tokenizacion y conversion y los binarios miden todo como
+    lectura. El tiempo del consumidor entre bloques no se mide aqui.
+    Un archivo gzip/bzip2/xz (detectado por sus bytes iniciales) se
+    descomprime por bloques directo al tokenizador de bytes, con
+    cualquier lector de texto; en_hilo descomprime en segundo plano.
+    convertir: conversion de cada bloque de texto (ver
+    iterar_arreglos_en_bloques).
+    """
+    if lector is None:
+        lector = LECTOR_MMAP
 
-def separar_tokens(linea_limpia):
-    """Separa tokens por comas o espacios sin usar split ni regex."""
-    valores = []
-    actual = ""
+    if lector in LECTORES_BINARIOS:
+        # Los bloques binarios no separan fases; todo cuenta como lectura.
+        yield from iterar_con_fase(
+            iterar_bloques_binarios(
+                ruta_archivo, errores, conteo, lector, en_hilo
+            ),
+            medidor,
+            FASE_LECTURA,
+        )
+        return
 
-    for caracter in linea_limpia:
-        if caracter == "," or caracter.isspace():
-            if actual:
-                valores.append(actual)
-                actual = ""
+    try:
+        compresion = detectar_compresion(ruta_archivo)
+        if compresion is not None:
+            yield from iterar_arreglos_en_bloques(
+                iterar_bloques_lineas(
+                    abrir_bloques_descomprimidos(
+                        ruta_archivo, compresion, en_hilo
+                    )
+                ),
+                errores,
+                conteo,
+                medidor,
+                convertir,
+            )
+        elif lector == LECTOR_MMAP:
+            yield from iterar_arreglos_mmap(
+                ruta_archivo, errores, conteo, medidor, convertir
+            )
         else:
-            actual += caracter
+            yield from iterar_arreglos_texto(
+                ruta_archivo, errores, conteo, medidor, convertir
+            )
+
+    except FileNotFoundError:
+        errores.append(f"No se encontro el archivo: {ruta_archivo}")
+    except PermissionError:
+        errores.append(f"Sin permisos para leer el archivo: {ruta_archivo}")
+    except (OSError, UnicodeDecodeError) + ERRORES_DESCOMPRESION as exc:
+        errores.append(f"Error al leer el archivo '{ruta_archivo}': {exc}")
+
+
+def leer_numeros_desde_archivo(
+    ruta_archivo, lector=None, medidor=None, errores=None, *, en_hilo=False
+):
+    """
+    Req 1: Lee el archivo recibido como parametro.
+    Req 3: Detecta tokens invalidos, reporta errores y continua.
+    Req 6: Lee muchos elementos de forma secuencial (streaming por lineas)
+    y los guarda en un array('d') contiguo (8 bytes por valor, sin un
+    objeto float por elemento). Cada bloque se copia completo al arreglo.
+    errores: ColectorErrores a usar (uno nuevo si es None). en_hilo: ver
+    iterar_arreglos_desde_archivo.
+    """
+    if errores is None:
+        errores = ColectorErrores()
+    conteo = {"total_valores": 0}
+    numeros = array("d")
+
+    if lector in LECTORES_BINARIOS:
+        # Los bloques binarios no separan fases; todo cuenta como lectura.
+        with medir_fase(medidor, FASE_LECTURA):
+            for bloque in iterar_bloques_binarios(
+                ruta_archivo, errores, conteo, lector, en_hilo
+            ):
+                numeros.frombytes(memoryview(bloque).cast("B"))
+        return numeros, errores, conteo["total_valores"]
+
+    for bloque in iterar_arreglos_desde_archivo(
+        ruta_archivo, errores, conteo, lector, medidor, en_hilo=en_hilo
+    ):
+        numeros.extend(bloque)
+
+    return numeros, errores, conteo["total_valores"]
+
+
+def convertir_par(tokens, posicion, errores):
+    """
+    Req 3: Convierte los tokens de un par (x, y) o regresa None y registra
+    un solo error: numero de columnas incorrecto o el primer valor
+    invalido. posicion: "linea N" o "posicion N".
+    """
+    if len(tokens) != COLUMNAS_PARES:
+        errores.append(
+            f"Error en {posicion}: se esperaban {COLUMNAS_PARES} columnas "
+            f"(x, y) y hay {len(tokens)}"
+        )
+        return None
+
+    par = []
+    for token in tokens:
+        try:
+            par.append(convertir_a_float_seguro(token))
+        except (TypeError, ValueError):
+            if isinstance(token, bytes):
+                token = token.decode("ascii")
+            try:
+                convertir_a_float_seguro(token)
+            except (TypeError, ValueError) as exc:
+                errores.append(
+                    f"Error en {posicion}: valor '{token}' invalido ({exc})"
+                )
+            return None
+    return par[0], par[1]
+
+
+def iterar_pares_desde_archivo(ruta_archivo, errores, conteo, en_hilo=False):
+    """
+    Req 1 y Req 6: Generador de pares (x, y), uno por linea separados por
+    coma o espacios, leidos por bloques (tambien de entradas comprimidas)
+    sin guardarlos. Las lineas vacias se ignoran; cada linea con datos
+    suma uno a conteo["total_valores"] y, si no es un par valido, genera
+    un solo error con su numero de linea.
+    """
+    for pares in iterar_bloques_pares(ruta_archivo, errores, conteo, en_hilo):
+        yield from pares
+
+
+def iterar_bloques_pares(
+    ruta_archivo, errores, conteo, en_hilo=False, medidor=None
+):
+    """
+    Req 6: Cuerpo de iterar_pares_desde_archivo: entrega la lista de pares
+    validos de cada bloque de lineas.
+    Req 7: Con medidor, separa lectura, tokenizacion y conversion de cada
+    bloque como iterar_arreglos_bloques_medido.
+    """
+    try:
+        compresion = detectar_compresion(ruta_archivo)
+        numero_linea = 0
+        for bloque in iterar_con_fase(
+            iterar_bloques_lineas(
+                abrir_bloques_descomprimidos(
+                    ruta_archivo, compresion, en_hilo
+                )
+            ),
+            medidor,
+            FASE_LECTURA,
+        ):
+            with medir_fase(medidor, FASE_TOKENIZACION):
+                tokens_por_linea = [
+                    linea.split()
+                    for linea in separar_lineas(traducir_bloque(bloque))
+                ]
+
+            with medir_fase(medidor, FASE_CONVERSION):
+                pares = []
+                for tokens in tokens_por_linea:
+                    numero_linea += 1
+                    if not tokens:
+                        continue
+                    conteo["total_valores"] += 1
+                    par = convertir_par(
+                        tokens, f"linea {numero_linea}", errores
+                    )
+                    if par is not None:
+                        pares.append(par)
+            yield pares
+    except FileNotFoundError:
+        errores.append(f"No se encontro el archivo: {ruta_archivo}")
+    except PermissionError:
+        errores.append(f"Sin permisos para leer el archivo: {ruta_archivo}")
+    except (OSError, UnicodeDecodeError) + ERRORES_DESCOMPRESION as exc:
+        errores.append(f"Error al leer el archivo '{ruta_archivo}': {exc}")
+
+
+def iterar_pares_desde_iterable(pares, errores, conteo):
+    """
+    Req 3 y Req 6: Igual que iterar_numeros_desde_iterable pero cada
+    elemento debe ser un par (x, y) de numeros, str o bytes, o una linea
+    de texto "x,y".
+    """
+    for posicion, elemento in enumerate(pares, start=1):
+        conteo["total_valores"] += 1
+        if isinstance(elemento, str):
+            tokens = separar_tokens(elemento)
+        elif isinstance(elemento, bytes):
+            tokens = elemento.translate(TABLA_SEPARADORES_BYTES).split()
+        else:
+            try:
+                tokens = tuple(elemento)
+            except TypeError:
+                tokens = (elemento,)
+        par = convertir_par(tokens, f"posicion {posicion}", errores)
+        if par is not None:
+            yield par
+
+
+class AcumuladorWelford:
+    """
+    Req 6: Acumula conteo, media y M2 en una sola pasada con memoria O(1)
+    (algoritmo de Welford). Varianza poblacional = M2 / n.
+    """
+
+    __slots__ = ("conteo", "media", "m2", "minimo", "maximo")
+
+    def __init__(self):
+        self.conteo = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = None
+        self.maximo = None
+
+    def agregar(self, valor):
+        """Incorpora un valor actualizando media, M2, minimo y maximo."""
+        if self.conteo == 0:
+            self.minimo = valor
+            self.maximo = valor
+        elif valor < self.minimo:
+            self.minimo = valor
+        elif valor > self.maximo:
+            self.maximo = valor
+
+        self.conteo += 1
+        delta = valor - self.media
+        self.media += delta / self.conteo
+        self.m2 += delta * (valor - self.media)
+
+    def combinar(self, otro):
+        """Fusiona otro acumulador (formula de Chan et al.)."""
+        if otro.conteo == 0:
+            return
+        if self.conteo == 0:
+            self.conteo = otro.conteo
+            self.media = otro.media
+            self.m2 = otro.m2
+            self.minimo = otro.minimo
+            self.maximo = otro.maximo
+            return
+
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+
+        total = self.conteo + otro.conteo
+        delta = otro.media - self.media
+        self.media += delta * otro.conteo / total
+        self.m2 += otro.m2 + delta * delta * self.conteo * otro.conteo / total
+        self.conteo = total
+
+    def a_diccionario(self):
+        """Representacion serializable (JSON) del acumulador."""
+        return {
+            "conteo": self.conteo,
+            "media": self.media,
+            "m2": self.m2,
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+        }
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """Reconstruye un acumulador guardado con a_diccionario."""
+        acumulador = cls()
+        acumulador.conteo = int(datos["conteo"])
+        acumulador.media = float(datos["media"])
+        acumulador.m2 = float(datos["m2"])
+        acumulador.minimo = datos["minimo"]
+        acumulador.maximo = datos["maximo"]
+        return acumulador
+
+    def obtener_media(self):
+        """Media acumulada o None si no hay valores."""
+        if self.conteo == 0:
+            return None
+        return self.media
+
+    def obtener_varianza(self):
+        """Varianza poblacional acumulada o None si no hay valores."""
+        if self.conteo == 0:
+            return None
+        return self.m2 / self.conteo
+
+
+class AcumuladorBivariado:
+    """
+    Req 6: Acumula en una sola pasada media y M2 de cada columna (un
+    AcumuladorWelford por columna) y el co-momento
+    C = suma((x - media_x) * (y - media_y)) con la actualizacion estable
+    C += (x - media_x_anterior) * (y - media_y_nueva).
+    Covarianza poblacional = C / n, igual que la varianza.
+    """
+
+    __slots__ = ("x", "y", "comomento")
+
+    def __init__(self):
+        self.x = AcumuladorWelford()
+        self.y = AcumuladorWelford()
+        self.comomento = 0.0
+
+    def agregar(self, valor_x, valor_y):
+        """Incorpora un par actualizando ambas columnas y el co-momento."""
+        delta_x = valor_x - self.x.media
+        self.x.agregar(valor_x)
+        self.y.agregar(valor_y)
+        self.comomento += delta_x * (valor_y - self.y.media)
+
+    def calcular_resultados(self):
+        """
+        Req 2: Medias, varianzas, desviaciones estandar, covarianza,
+        correlacion de Pearson y recta de minimos cuadrados y = a + b*x.
+        Lo que no aplica (sin pares, o una columna constante) es None.
+        """
+        conteo = self.x.conteo
+        resultados = {
+            "conteo": conteo,
+            "covarianza": None,
+            "correlacion": None,
+            "pendiente": None,
+            "intercepto": None,
+            "r_cuadrada": None,
+        }
+        for nombre, columna in (("x", self.x), ("y", self.y)):
+            varianza = columna.obtener_varianza()
+            resultados[f"media_{nombre}"] = columna.obtener_media()
+            resultados[f"varianza_{nombre}"] = varianza
+            resultados[f"desviacion_{nombre}"] = calcular_raiz_cuadrada(
+                varianza
+            )
+            resultados[f"minimo_{nombre}"] = columna.minimo
+            resultados[f"maximo_{nombre}"] = columna.maximo
+        if conteo == 0:
+            return resultados
+
+        resultados["covarianza"] = self.comomento / conteo
+        if self.x.m2 > 0:
+            resultados["pendiente"] = self.comomento / self.x.m2
+            resultados["intercepto"] = (
+                self.y.media - resultados["pendiente"] * self.x.media
+            )
+        if resultados["desviacion_x"] and resultados["desviacion_y"]:
+            correlacion = resultados["covarianza"] / (
+                resultados["desviacion_x"] * resultados["desviacion_y"]
+            )
+            # El redondeo puede dejarla apenas fuera de [-1, 1].
+            correlacion = max(-1.0, min(1.0, correlacion))
+            resultados["correlacion"] = correlacion
+            resultados["r_cuadrada"] = correlacion * correlacion
+        return resultados
+
+
+class SketchKLL:
+    """
+    Req 6: Resumen de cuantiles KLL (Karnin, Lang y Liberty) con memoria
+    acotada. Guarda O(k) valores en compactadores por nivel; un valor en el
+    nivel h representa 2**h valores originales. Se puede fusionar con otro
+    sketch del mismo k.
+    """
+
+    def __init__(self, k=DEFAULT_K_KLL, semilla=SEMILLA_KLL):
+        self.k = k
+        self.conteo = 0
+        self.compactadores = [[]]
+        self.tamano = 0
+        self.tamano_maximo = 0
+        self._aleatorio = random.Random(semilla)
+        self._actualizar_tamano_maximo()
+
+    def _capacidad(self, nivel):
+        """Capacidad del nivel; decrece geometricamente hacia abajo."""
+        profundidad = len(self.compactadores) - nivel - 1
+        return 2 + int(self.k * (2.0 / 3.0) ** profundidad)
+
+    def _actualizar_tamano_maximo(self):
+        self.tamano_maximo = 0
+        for nivel in range(len(self.compactadores)):
+            self.tamano_maximo += self._capacidad(nivel)
+
+    def agregar(self, valor):
+        """Incorpora un valor; compacta cuando se llena."""
+        self.compactadores[0].append(valor)
+        self.conteo += 1
+        self.tamano += 1
+        if self.tamano >= self.tamano_maximo:
+            self._comprimir()
+
+    def combinar(self, otro):
+        """Fusiona otro sketch nivel por nivel y vuelve a compactar."""
+        while len(self.compactadores) < len(otro.compactadores):
+            self.compactadores.append([])
+        self._actualizar_tamano_maximo()
+
+        for nivel, compactador in enumerate(otro.compactadores):
+            self.compactadores[nivel].extend(compactador)
+        self.conteo += otro.conteo
+        self.tamano = sum(len(c) for c in self.compactadores)
+
+        while self.tamano >= self.tamano_maximo:
+            self._comprimir()
+
+    def _comprimir(self):
+        """Compacta el primer nivel lleno: ordena y sube uno de cada dos."""
+        for nivel, compactador in enumerate(self.compactadores):
+            if len(compactador) < self._capacidad(nivel):
+                continue
+
+            if nivel + 1 == len(self.compactadores):
+                self.compactadores.append([])
+                self._actualizar_tamano_maximo()
+
+            compactador.sort()
+            # Con longitud impar el ultimo valor se queda en este nivel.
+            sobrante = compactador.pop() if len(compactador) % 2 else None
+            inicio = self._aleatorio.randint(0, 1)
+            self.compactadores[nivel + 1].extend(compactador[inicio::2])
+            compactador.clear()
+            if sobrante is not None:
+                compactador.append(sobrante)
+
+            self.tamano = sum(len(c) for c in self.compactadores)
+            return
+
+    def a_diccionario(self):
+        """Representacion serializable (JSON) del sketch."""
+        return {
+            "k": self.k,
+            "conteo": self.conteo,
+            "compactadores": [list(c) for c in self.compactadores],
+        }
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """Reconstruye un sketch guardado con a_diccionario."""
+        sketch = cls(k=int(datos["k"]))
+        sketch.conteo = int(datos["conteo"])
+        sketch.compactadores = [
+            [float(valor) for valor in compactador]
+            for compactador in datos["compactadores"]
+        ]
+        sketch.tamano = sum(len(c) for c in sketch.compactadores)
+        sketch._actualizar_tamano_maximo()
+        return sketch
+
+    def cuantiles(self, probabilidades):
+        """
+        Regresa el valor aproximado para cada probabilidad en [0, 1], en el
+        mismo orden, o None por cada una si el sketch esta vacio.
+        """
+        if self.conteo == 0:
+            return [None for _ in probabilidades]
+
+        ponderados = []
+        for nivel, compactador in enumerate(self.compactadores):
+            peso = 1 << nivel
+            for valor in compactador:
+                ponderados.append((valor, peso))
+        ponderados.sort()
+
+        peso_total = 0
+        for _, peso in ponderados:
+            peso_total += peso
+
+        resultados = []
+        for probabilidad in probabilidades:
+            objetivo = probabilidad * peso_total
+            acumulado = 0
+            elegido = ponderados[-1][0]
+            for valor, peso in ponderados:
+                acumulado += peso
+                if acumulado >= objetivo:
+                    elegido = valor
+                    break
+            resultados.append(elegido)
+
+        return resultados
+
+
+def k_para_error_rango(error_rango):
+    """
+    Req 6: Traduce el error de rango deseado (fraccion de n) al parametro k
+    del sketch KLL; el error normalizado es aproximadamente 2.3 / k.
+    """
+    return max(8, int(math.ceil(2.3 / error_rango)))
+
+
+class ContadorFrecuentes:
+    """
+    Req 6: Valores mas frecuentes con memoria acotada (Space-Saving de
+    Metwally et al.). Guarda a lo mas `capacidad` contadores [conteo, error]:
+    la frecuencia real de un valor esta en [conteo - error, conteo] y el
+    error nunca pasa de n / capacidad. Un monticulo con actualizacion
+    perezosa encuentra el contador minimo a reemplazar en O(log k).
+    """
+
+    def __init__(self, capacidad=DEFAULT_CAPACIDAD_FRECUENTES):
+        self.capacidad = capacidad
+        self.conteo = 0
+        self.contadores = {}
+        self._monticulo = []
+
+    def agregar(self, valor):
+        """Cuenta un valor; si no hay lugar reemplaza al contador minimo."""
+        self.conteo += 1
+        contador = self.contadores.get(valor)
+        if contador is not None:
+            contador[0] += 1
+            return
+
+        if len(self.contadores) < self.capacidad:
+            self.contadores[valor] = [1, 0]
+            heapq.heappush(self._monticulo, (1, valor))
+            return
+
+        minimo, desplazado = self._extraer_minimo()
+        del self.contadores[desplazado]
+        self.contadores[valor] = [minimo + 1, minimo]
+        heapq.heappush(self._monticulo, (minimo + 1, valor))
+
+    def _extraer_minimo(self):
+        """
+        Saca del monticulo el contador con menor conteo. Las entradas con
+        conteo viejo (el valor crecio despues) se vuelven a insertar.
+        """
+        while True:
+            conteo, valor = heapq.heappop(self._monticulo)
+            actual = self.contadores[valor][0]
+            if actual == conteo:
+                return conteo, valor
+            heapq.heappush(self._monticulo, (actual, valor))
+
+    def _reconstruir_monticulo(self):
+        self._monticulo = [
+            (contador[0], valor) for valor, contador in self.contadores.items()
+        ]
+        heapq.heapify(self._monticulo)
+
+    def minimo_si_lleno(self):
+        """Conteo minimo si el resumen esta lleno (cota para ausentes)."""
+        if len(self.contadores) < self.capacidad:
+            return 0
+        return min(contador[0] for contador in self.contadores.values())
+
+    def combinar(self, otro):
+        """
+        Fusiona otro resumen (Agarwal et al.): un valor ausente en un
+        resumen lleno pudo tener hasta su conteo minimo, que se suma como
+        conteo y error. Se conservan los `capacidad` mayores.
+        """
+        minimo_propio = self.minimo_si_lleno()
+        minimo_otro = otro.minimo_si_lleno()
+
+        combinados = {}
+        for valor in set(self.contadores) | set(otro.contadores):
+            propio = self.contadores.get(valor, [minimo_propio, minimo_propio])
+            ajeno = otro.contadores.get(valor, [minimo_otro, minimo_otro])
+            combinados[valor] = [propio[0] + ajeno[0], propio[1] + ajeno[1]]
+
+        mayores = sorted(
+            combinados.items(), key=lambda par: par[1][0], reverse=True
+        )
+        self.contadores = dict(mayores[: self.capacidad])
+        self.conteo += otro.conteo
+        self._reconstruir_monticulo()
+
+    def candidatos(self):
+        """
+        Valores que pueden ser la moda: su conteo (cota superior) alcanza
+        la mayor cota inferior. Regresa [(valor, minimo, maximo)] ordenados
+        de mayor a menor conteo.
+        """
+        if not self.contadores:
+            return []
+
+        mejor_inferior = max(c[0] - c[1] for c in self.contadores.values())
+        resultado = [
+            (valor, contador[0] - contador[1], contador[0])
+            for valor, contador in self.contadores.items()
+            if contador[0] >= mejor_inferior
+        ]
+        resultado.sort(key=lambda candidato: (-candidato[2], candidato[0]))
+        return resultado
+
+    def a_diccionario(self):
+        """Representacion serializable (JSON) del resumen."""
+        return {
+            "capacidad": self.capacidad,
+            "conteo": self.conteo,
+            "contadores": [
+                [valor, contador[0], contador[1]]
+                for valor, contador in self.contadores.items()
+            ],
+        }
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """Reconstruye un resumen guardado con a_diccionario."""
+        resumen = cls(capacidad=int(datos["capacidad"]))
+        resumen.conteo = int(datos["conteo"])
+        resumen.contadores = {
+            float(valor): [int(conteo), int(error)]
+            for valor, conteo, error in datos["contadores"]
+        }
+        resumen._reconstruir_monticulo()
+        return resumen
+
+
+def contar_candidatos_en_archivo(
+    ruta_archivo, candidatos, lector=None, en_hilo=False
+):
+    """
+    Req 6: Segunda pasada de --confirmar-moda: cuenta de forma exacta solo
+    los valores candidatos. Los errores ya se reportaron en la primera.
+    """
+    conteos = {valor: 0 for valor in candidatos}
+    for valor in iterar_numeros_desde_archivo(
+        ruta_archivo,
+        ColectorErrores(0),
+        {"total_valores": 0},
+        lector,
+        en_hilo=en_hilo,
+    ):
+        if valor in conteos:
+            conteos[valor] += 1
+    return conteos
+
+
+class HistogramaLog:
+    """
+    Req 2 y Req 6: Histograma logaritmico de una sola pasada: no necesita
+    conocer minimo y maximo de antemano. Cada valor x > 0 cae en el
+    intervalo k = floor(log10(x) * divisiones), es decir
+    [10^(k/d), 10^((k+1)/d)); los negativos usan |x| y el cero tiene su
+    propio intervalo. Se puede combinar y serializar como los demas
+    componentes del estado.
+    """
+
+    def __init__(self, divisiones=1):
+        self.divisiones = divisiones
+        self.conteos = {}
+
+    def agregar(self, valor, frecuencia=1):
+        """Cuenta un valor (o `frecuencia` copias de el)."""
+        if valor == 0:
+            clave = (0, 0)
+        else:
+            signo = 1 if valor > 0 else -1
+            clave = (
+                signo,
+                math.floor(math.log10(abs(valor)) * self.divisiones),
+            )
+        self.conteos[clave] = self.conteos.get(clave, 0) + frecuencia
+
+    def combinar(self, otro):
+        """Suma los conteos de otro histograma con las mismas divisiones."""
+        for clave, conteo in otro.conteos.items():
+            self.conteos[clave] = self.conteos.get(clave, 0) + conteo
+
+    def intervalos(self):
+        """Lista (limite_inferior, limite_superior, conteo) en orden."""
+        def limite(exponente):
+            return 10.0 ** (exponente / self.divisiones)
+
+        def orden(clave):
+            signo, exponente = clave
+            return (signo, exponente * signo)
+
+        resultado = []
+        for clave in sorted(self.conteos, key=orden):
+            signo, exponente = clave
+            if signo == 0:
+                inferior, superior = 0.0, 0.0
+            elif signo > 0:
+                inferior, superior = limite(exponente), limite(exponente + 1)
+            else:
+                inferior, superior = -limite(exponente + 1), -limite(exponente)
+            resultado.append((inferior, superior, self.conteos[clave]))
+        return resultado
+
+    def a_diccionario(self):
+        """Representacion serializable (JSON) del histograma."""
+        return {
+            "divisiones": self.divisiones,
+            "conteos": [
+                [signo, exponente, conteo]
+                for (signo, exponente), conteo in self.conteos.items()
+            ],
+        }
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """Reconstruye un histograma guardado con a_diccionario."""
+        histograma = cls(divisiones=int(datos["divisiones"]))
+        histograma.conteos = {
+            (int(signo), int(exponente)): int(conteo)
+            for signo, exponente, conteo in datos["conteos"]
+        }
+        return histograma
+
+
+class EstadoEstadistico:  # pylint: disable=too-many-instance-attributes
+    """
+    Req 6: Estado combinable y serializable de una o varias fuentes:
+    acumulador de Welford (conteo, media, M2, min, max), tabla de
+    frecuencias para moda/mediana exactas (opcional), sketch KLL para
+    cuantiles aproximados (opcional), resumen Space-Saving de valores
+    frecuentes (opcional), histograma logaritmico (opcional), totales y
+    errores. Varios estados (por ejemplo de distintos shards) se combinan
+    sin releer los datos.
+    """
+
+    def __init__(
+        self,
+        con_moda=False,
+        error_rango=None,
+        capacidad_frecuentes=None,
+        divisiones_log=None,
+    ):
+        self.fuentes = []
+        self.acumulador = AcumuladorWelford()
+        self.conteos = {} if con_moda else None
+        self.error_rango = error_rango
+        self.sketch = None
+        if error_rango is not None:
+            self.sketch = SketchKLL(k=k_para_error_rango(error_rango))
+        self.frecuentes = None
+        if capacidad_frecuentes is not None:
+            self.frecuentes = ContadorFrecuentes(capacidad_frecuentes)
+        self.histograma_log = None
+        if divisiones_log is not None:
+            self.histograma_log = HistogramaLog(divisiones_log)
+        self.total_valores = 0
+        self.errores = ColectorErrores()
+
+    def agregar(self, valor):
+        """Incorpora un valor valido a todos los componentes del estado."""
+        self.acumulador.agregar(valor)
+        if self.conteos is not None:
+            self.conteos[valor] = self.conteos.get(valor, 0) + 1
+        if self.sketch is not None:
+            self.sketch.agregar(valor)
+        if self.frecuentes is not None:
+            self.frecuentes.agregar(valor)
+        if self.histograma_log is not None:
+            self.histograma_log.agregar(valor)
+
+    def agregar_bloque(self, valores):
+        """Incorpora en orden los valores de un bloque (array('d') o vista)."""
+        agregar = self.agregar
+        for valor in valores:
+            agregar(valor)
+
+    def combinar(self, otro):
+        """
+        Fusiona otro estado. Un componente que falta en cualquiera de los
+        dos se descarta, porque ya no describiria todos los datos.
+        """
+        self.fuentes.extend(otro.fuentes)
+        self.acumulador.combinar(otro.acumulador)
+        self.total_valores += otro.total_valores
+        self.errores.combinar(otro.errores)
+
+        if self.conteos is not None and otro.conteos is not None:
+            for valor, frecuencia in otro.conteos.items():
+                self.conteos[valor] = self.conteos.get(valor, 0) + frecuencia
+        else:
+            self.conteos = None
+
+        if self.sketch is not None and otro.sketch is not None:
+            self.sketch.combinar(otro.sketch)
+        else:
+            self.sketch = None
+            self.error_rango = None
+
+        if self.frecuentes is not None and otro.frecuentes is not None:
+            self.frecuentes.combinar(otro.frecuentes)
+        else:
+            self.frecuentes = None
+
+        if (
+            self.histograma_log is not None
+            and otro.histograma_log is not None
+            and self.histograma_log.divisiones
+            == otro.histograma_log.divisiones
+        ):
+            self.histograma_log.combinar(otro.histograma_log)
+        else:
+            self.histograma_log = None
+
+    def a_diccionario(self):
+        """Representacion serializable (JSON) del estado."""
+        conteos = None
+        if self.conteos is not None:
+            conteos = [[valor, f] for valor, f in self.conteos.items()]
+
+        return {
+            "version": VERSION_ESTADO,
+            "fuentes": list(self.fuentes),
+            "total_valores": self.total_valores,
+            "errores": self.errores.a_diccionario(),
+            "acumulador": self.acumulador.a_diccionario(),
+            "conteos": conteos,
+            "error_rango": self.error_rango,
+            "sketch": None if self.sketch is None else self.sketch.a_diccionario(),
+            "frecuentes": (
+                None
+                if self.frecuentes is None
+                else self.frecuentes.a_diccionario()
+            ),
+            "histograma_log": (
+                None
+                if self.histograma_log is None
+                else self.histograma_log.a_diccionario()
+            ),
+        }
+
+    @classmethod
+    def desde_diccionario(cls, datos):
+        """
+        Reconstruye un estado guardado con a_diccionario.
+        Req 3: Lanza ValueError si el contenido no es un estado valido.
+        """
+        try:
+            if datos["version"] != VERSION_ESTADO:
+                raise ValueError(f"version no soportada: {datos['version']}")
+
+            estado = cls()
+            estado.fuentes = [str(fuente) for fuente in datos["fuentes"]]
+            estado.total_valores = int(datos["total_valores"])
+            estado.errores = ColectorErrores.desde_diccionario(
+                datos["errores"]
+            )
+            estado.acumulador = AcumuladorWelford.desde_diccionario(
+                datos["acumulador"]
+            )
+            if datos["conteos"] is not None:
+                estado.conteos = {
+                    float(valor): int(frecuencia)
+                    for valor, frecuencia in datos["conteos"]
+                }
+            if datos["sketch"] is not None:
+                estado.error_rango = float(datos["error_rango"])
+                estado.sketch = SketchKLL.desde_diccionario(datos["sketch"])
+            if datos["frecuentes"] is not None:
+                estado.frecuentes = ContadorFrecuentes.desde_diccionario(
+                    datos["frecuentes"]
+                )
+            # Los estados guardados antes del histograma no traen la llave.
+            if datos.get("histograma_log") is not None:
+                estado.histograma_log = HistogramaLog.desde_diccionario(
+                    datos["histograma_log"]
+                )
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f"estado incompleto o invalido ({exc})") from exc
+
+        return estado
+
+    def calcular_stats(self):
+        """
+        Req 2: Estadisticas disponibles con el estado. Mediana y moda son
+        exactas con la tabla de frecuencias; sin ella la mediana sale del
+        sketch (aproximada) o queda como N/A y la moda del resumen
+        Space-Saving (aproximada) o queda como N/A.
+        """
+        stats = {}
+        stats["media"] = self.acumulador.obtener_media()
+        stats["mediana"] = None
+        stats["modas"] = None
+        stats["varianza"] = self.acumulador.obtener_varianza()
+
+        if self.conteos is not None:
+            stats["mediana"] = calcular_mediana_desde_conteos(self.conteos)
+            stats["modas"] = calcular_moda_desde_conteos(self.conteos)
+        elif self.sketch is not None:
+            asignar_cuantiles_aproximados(stats, self.sketch, self.error_rango)
+
+        if self.conteos is None and self.frecuentes is not None:
+            asignar_modas_frecuentes(stats, self.frecuentes, None)
+
+        return stats
+
+
+def acumular_estado_desde_archivo(  # pylint: disable=too-many-arguments
+    ruta_archivo,
+    configuracion,
+    lector=None,
+    medidor=None,
+    errores=None,
+    *,
+    en_hilo=False,
+):
+    """
+    Req 6: Alimenta un EstadoEstadistico directo desde el lector por
+    bloques en una sola pasada (modos --streaming, --approx y
+    --guardar-estado).
+    Req 7: Con medidor, el lector mide sus fases y agregar cada bloque al
+    estado cuenta como estadisticas.
+    """
+    estado = EstadoEstadistico(**configuracion)
+    estado.fuentes.append(ruta_archivo)
+    if errores is not None:
+        estado.errores = errores
+    conteo = {"total_valores": 0}
+
+    for bloque in iterar_arreglos_desde_archivo(
+        ruta_archivo, estado.errores, conteo, lector, medidor, en_hilo=en_hilo
+    ):
+        with medir_fase(medidor, FASE_ESTADISTICAS):
+            estado.agregar_bloque(bloque)
+
+    estado.total_valores = conteo["total_valores"]
+    return estado
+
+
+def guardar_estado(ruta_estado, estado):
+    """
+    Req 6: Guarda el estado en JSON para combinarlo despues.
+    """
+    with open(ruta_estado, "w", encoding="utf-8") as archivo:
+        json.dump(estado.a_diccionario(), archivo)
+
+
+def cargar_estado(ruta_estado):
+    """
+    Req 6: Carga un estado guardado con guardar_estado.
+    Req 3: Lanza OSError o ValueError si no se puede leer o es invalido.
+    """
+    with open(ruta_estado, "r", encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    return EstadoEstadistico.desde_diccionario(datos)
+
+
+def combinar_estados_guardados(rutas_estados):
+    """
+    Req 6: Carga y combina varios estados guardados (--combinar-estados).
+    Req 3: Un estado que no se puede cargar se reporta y se omite.
+    """
+    total = None
+    problemas = []
+
+    for ruta_estado in rutas_estados:
+        try:
+            estado = cargar_estado(ruta_estado)
+        except (OSError, ValueError) as exc:
+            problemas.append(
+                f"No se pudo cargar el estado '{ruta_estado}': {exc}"
+            )
+            continue
+
+        if total is None:
+            total = estado
+        else:
+            total.combinar(estado)
+
+    if total is None:
+        total = EstadoEstadistico()
+    total.errores.extend(problemas)
+    return total
+
+
+def ordenar_lista(numeros):
+    """
+    Req 2: Ordenamiento necesario para mediana (algoritmo basico).
+    Req 6: Merge sort O(n log n) adecuado para cientos/miles de elementos.
+    """
+    n = len(numeros)
+    if n <= 1:
+        return numeros[:]
+
+    mitad = n // 2
+    izquierda = ordenar_lista(numeros[:mitad])
+    derecha = ordenar_lista(numeros[mitad:])
+
+    return fusionar_listas(izquierda, derecha)
+
+
+def fusionar_listas(izquierda, derecha):
+    """
+    Req 2: Parte del algoritmo basico merge sort (sin librerias).
+    Req 6: Fusion lineal O(n) para mantener eficiencia.
+    """
+    resultado = []
+    i = 0
+    j = 0
+
+    while i < len(izquierda) and j < len(derecha):
+        if izquierda[i] <= derecha[j]:
+            resultado.append(izquierda[i])
+            i += 1
+        else:
+            resultado.append(derecha[j])
+            j += 1
+
+    while i < len(izquierda):
+        resultado.append(izquierda[i])
+        i += 1
+
+    while j < len(derecha):
+        resultado.append(derecha[j])
+        j += 1
+
+    return resultado
+
+
+def como_vista(numeros):
+    """
+    Req 6: Regresa un memoryview sobre el buffer de un array('d') para
+    recorrerlo sin copias; cualquier otra secuencia se regresa tal cual.
+    """
+    if isinstance(numeros, array):
+        return memoryview(numeros)
+    return numeros
+
+
+def calcular_media(numeros):
+    """
+    Req 2: Calcula la media con algoritmo basico (suma / n), sin librerias.
+    Req 6: O(n) para soportar muchos elementos.
+    """
+    num = len(numeros)
+    if num == 0:
+        return None
+
+    suma = 0.0
+    for valor in como_vista(numeros):
+        suma += valor
+    return suma / num
+
+
+def ordenar_por_insercion(valores, inicio, fin):
+    """
+    Req 2: Insercion in-place sobre valores[inicio:fin] (rangos pequenos).
+    """
+    for i in range(inicio + 1, fin):
+        actual = valores[i]
+        j = i - 1
+        while j >= inicio and valores[j] > actual:
+            valores[j + 1] = valores[j]
+            j -= 1
+        valores[j + 1] = actual
+
+
+def particionar_tres_vias(valores, inicio, fin, pivote):
+    """
+    Req 2: Particion in-place de valores[inicio:fin] en <, == y > pivote.
+    Regresa (menor, mayor): el bloque igual al pivote es [menor, mayor).
+    Req 6: Tres vias para no degradarse con muchos valores repetidos.
+    """
+    menor = inicio
+    i = inicio
+    mayor = fin
+
+    while i < mayor:
+        valor = valores[i]
+        if valor < pivote:
+            valores[i] = valores[menor]
+            valores[menor] = valor
+            menor += 1
+            i += 1
+        elif valor > pivote:
+            mayor -= 1
+            valores[i] = valores[mayor]
+            valores[mayor] = valor
+        else:
+            i += 1
+
+    return menor, mayor
+
+
+def mediana_de_tres(valores, inicio, fin):
+    """Req 2: Pivote = mediana del primero, el central y el ultimo."""
+    primero = valores[inicio]
+    central = valores[(inicio + fin) // 2]
+    ultimo = valores[fin - 1]
+
+    if primero > central:
+        primero, central = central, primero
+    if central > ultimo:
+        central = max(primero, ultimo)
+    return central
+
+
+def mediana_de_medianas(valores, inicio, fin):
+    """
+    Req 6: Pivote con garantia O(n) (grupos de 5) para el respaldo de
+    introselect cuando la mediana de tres se comporta mal.
+    """
+    medianas = []
+    for grupo in range(inicio, fin, 5):
+        fin_grupo = grupo + 5 if grupo + 5 < fin else fin
+        ordenar_por_insercion(valores, grupo, fin_grupo)
+        medianas.append(valores[(grupo + fin_grupo - 1) // 2])
+
+    return seleccionar_k_esimo(medianas, len(medianas) // 2)
+
+
+def seleccionar_k_esimo(valores, k, inicio=0, fin=None):
+    """
+    Req 2: Introselect; reacomoda valores in-place y regresa el elemento
+    que ocuparia la posicion k si estuviera ordenado. Al terminar todo
+    valores[inicio:k] es <= valores[k] y todo valores[k + 1:fin] es >=.
+    Req 6: O(n) promedio con quickselect; si la recursion se alarga pasa a
+    mediana de medianas para garantizar O(n) en el peor caso.
+    """
+    if fin is None:
+        fin = len(valores)
+
+    limite_profundidad = 2 * (fin - inicio).bit_length()
+    profundidad = 0
+
+    while True:
+        if fin - inicio <= 16:
+            ordenar_por_insercion(valores, inicio, fin)
+            return valores[k]
+
+        if profundidad < limite_profundidad:
+            pivote = mediana_de_tres(valores, inicio, fin)
+        else:
+            pivote = mediana_de_medianas(valores, inicio, fin)
+        profundidad += 1
+
+        menor, mayor = particionar_tres_vias(valores, inicio, fin, pivote)
+        if k < menor:
+            fin = menor
+        elif k >= mayor:
+            inicio = mayor
+        else:
+            return pivote
+
+
+def calcular_mediana(numeros):
+    """
+    Req 2: Calcula la mediana por seleccion (introselect), sin ordenar.
+    Req 6: O(n) con una sola copia de trabajo compacta (array('d'))
+    manipulada a traves de un memoryview; no modifica la entrada.
+    """
+    num = len(numeros)
+    if num == 0:
+        return None
+
+    trabajo = memoryview(array("d", numeros))
+    mitad = num // 2
+    superior = seleccionar_k_esimo(trabajo, mitad)
+    if num % 2 == 1:
+        return superior
+
+    # Tras la seleccion, trabajo[:mitad] tiene los valores <= superior;
+    # el mayor de ellos es el otro elemento central.
+    inferior = trabajo[0]
+    for i in range(1, mitad):
+        if trabajo[i] > inferior:
+            inferior = trabajo[i]
+
+    return (inferior + superior) / 2.0
+
+
+def calcular_moda(numeros):
+    """
+    Req 2: Calcula moda con conteo manual (diccionario) sin librerias.
+    Req 6: Conteo O(n) para cientos/miles de elementos.
+    Req 3: No falla si la lista esta vacia; devuelve lista vacia.
+    """
+    num = len(numeros)
+    if num == 0:
+        return []
+
+    conteos = {}
+    for valor in como_vista(numeros):
+        if valor in conteos:
+            conteos[valor] += 1
+        else:
+            conteos[valor] = 1
+
+    return calcular_moda_desde_conteos(conteos)
+
+
+def calcular_moda_desde_conteos(conteos):
+    """
+    Req 2: Obtiene la(s) moda(s) a partir de una tabla de frecuencias
+    {valor: frecuencia}; lista vacia si ningun valor se repite.
+    """
+    max_frecuencia = 0
+    for _, frecuencia in conteos.items():
+        if frecuencia > max_frecuencia:
+            max_frecuencia = frecuencia
+
+    if max_frecuencia <= 1:
+        return []
+
+    modas = []
+    for valor, frecuencia in conteos.items():
+        if frecuencia == max_frecuencia:
+            modas.append(valor)
+
+    # Req 2: Salida consistente; se ordena con el mismo algoritmo basico.
+    return ordenar_lista(modas)
+
+
+def calcular_mediana_desde_conteos(conteos):
+    """
+    Req 2: Mediana exacta a partir de una tabla de frecuencias; recorre los
+    valores distintos en orden acumulando frecuencias.
+    """
+    num = 0
+    for frecuencia in conteos.values():
+        num += frecuencia
+    if num == 0:
+        return None
+
+    posicion_inferior = (num - 1) // 2
+    posicion_superior = num // 2
+    inferior = None
+    acumulado = 0
+
+    for valor in sorted(conteos):
+        acumulado += conteos[valor]
+        if inferior is None and acumulado > posicion_inferior:
+            inferior = valor
+        if acumulado > posicion_superior:
+            return (inferior + valor) / 2.0 if inferior != valor else valor
+
+    return inferior
+
+
+def calcular_varianza(numeros, media):
+    """
+    Req 2: Calcula varianza con algoritmo basico:
+        sum((xi - media)^2) / n
+    (Varianza poblacional; el requisito no especifica muestral.)
+    Req 6: O(n) para soportar muchos elementos.
+    """
+    n = len(numeros)
+    if n == 0:
+        return None
+
+    suma_cuadrados = 0.0
+    for valor in como_vista(numeros):
+        diferencia = valor - media
+        suma_cuadrados += diferencia * diferencia
+
+    return suma_cuadrados / n
+
+
+def calcular_raiz_cuadrada(valor):
+    """
+    Req 2: Calcula raiz cuadrada sin usar math.sqrt (algoritmo basico),
+    mediante Newton-Raphson, para obtener desviacion estandar.
+    Req 6: Iteraciones fijas (constante) eficiente para muchos datos.
+    """
+    if valor is None:
+        return None
+    if valor < 0:
+        return None
+    if valor == 0:
+        return 0.0
+
+    estimacion = valor if valor >= 1.0 else 1.0
+
+    # Req 2: Metodo iterativo basico; sin funciones de libreria.
+    for _ in range(30):
+        estimacion = 0.5 * (estimacion + (valor / estimacion))
+
+    return estimacion
+
+
+def posiciones_cuantil(num, probabilidad):
+    """
+    Req 2: Cuantil con interpolacion lineal entre las posiciones que lo
+    rodean (el metodo por defecto de NumPy y de R, tipo 7). Regresa
+    (posicion_inferior, posicion_superior, fraccion).
+    """
+    posicion = (num - 1) * probabilidad
+    inferior = int(posicion)
+    superior = min(inferior + 1, num - 1)
+    return inferior, superior, posicion - inferior
+
+
+def interpolar(inferior, superior, fraccion):
+    """Req 2: inferior + fraccion * (superior - inferior)."""
+    if fraccion == 0:
+        return inferior
+    return inferior + fraccion * (superior - inferior)
+
+
+def calcular_cuantiles_en_memoria(numeros, probabilidades):
+    """
+    Req 2: Cuantiles exactos por seleccion sobre el mismo arreglo, sin
+    copiarlo ni ordenarlo completo: cada posicion pedida se selecciona en
+    el tramo que quedo a la derecha de la anterior. Reacomoda `numeros`.
+    """
+    num = len(numeros)
+    if num == 0:
+        return [None for _ in probabilidades]
+
+    posiciones = set()
+    for probabilidad in probabilidades:
+        inferior, superior, _ = posiciones_cuantil(num, probabilidad)
+        posiciones.update((inferior, superior))
+
+    vista = como_vista(numeros)
+    seleccionados = {}
+    inicio = 0
+    for posicion in sorted(posiciones):
+        seleccionados[posicion] = seleccionar_k_esimo(
+            vista, posicion, inicio, num
+        )
+        inicio = posicion + 1
+
+    resultado = []
+    for probabilidad in probabilidades:
+        inferior, superior, fraccion = posiciones_cuantil(num, probabilidad)
+        resultado.append(
+            interpolar(
+                seleccionados[inferior], seleccionados[superior], fraccion
+            )
+        )
+    return resultado
+
+
+def calcular_cuantiles_desde_conteos(conteos, probabilidades):
+    """
+    Req 2: Cuantiles exactos a partir de una tabla de frecuencias, con la
+    misma interpolacion que calcular_cuantiles_en_memoria.
+    """
+    num = 0
+    for frecuencia in conteos.values():
+        num += frecuencia
+    if num == 0:
+        return [None for _ in probabilidades]
+
+    valores = sorted(conteos)
+    acumulados = list(
+        itertools.accumulate(conteos[valor] for valor in valores)
+    )
+
+    def valor_en(posicion):
+        return valores[bisect.bisect_right(acumulados, posicion)]
+
+    resultado = []
+    for probabilidad in probabilidades:
+        inferior, superior, fraccion = posiciones_cuantil(num, probabilidad)
+        resultado.append(
+            interpolar(valor_en(inferior), valor_en(superior), fraccion)
+        )
+    return resultado
+
+
+def calcular_histograma_fijo(pares, minimo, maximo, intervalos):
+    """
+    Req 2: Histograma de `intervalos` de igual ancho entre minimo y maximo
+    (el ultimo incluye al maximo). pares: (valor, frecuencia).
+    """
+    ancho = (maximo - minimo) / intervalos
+    conteos = [0] * intervalos
+    ultimo = intervalos - 1
+
+    for valor, frecuencia in pares:
+        indice = int((valor - minimo) / ancho) if ancho > 0 else 0
+        conteos[min(indice, ultimo)] += frecuencia
+
+    limites = [minimo + i * ancho for i in range(intervalos)] + [maximo]
+    return {"limites": limites, "conteos": conteos}
+
+
+def resumir_extendidas(minimo, maximo, cuantiles, extendidas):
+    """
+    Req 2: Diccionario base de stats["extendidas"]; los histogramas se
+    agregan despues segun la fuente de los datos.
+    """
+    return {
+        "minimo": minimo,
+        "maximo": maximo,
+        "rango": None if minimo is None else maximo - minimo,
+        "cuantiles": list(zip(extendidas["cuantiles"], cuantiles)),
+        "cuantiles_aproximados": False,
+        "histograma": None,
+        "histograma_log": None,
+    }
+
+
+def calcular_extendidas_en_memoria(numeros, extendidas):
+    """
+    Req 2: Minimo, maximo, rango, cuantiles e histogramas de los valores
+    ya cargados para las demas estadisticas (sin releer el archivo ni
+    copiar el arreglo). Reacomoda `numeros`.
+    extendidas: dict con cuantiles, intervalos y divisiones_log.
+    """
+    minimo = min(numeros) if len(numeros) > 0 else None
+    maximo = max(numeros) if len(numeros) > 0 else None
+    resultado = resumir_extendidas(
+        minimo,
+        maximo,
+        calcular_cuantiles_en_memoria(numeros, extendidas["cuantiles"]),
+        extendidas,
+    )
+
+    if extendidas["intervalos"] is not None and minimo is not None:
+        resultado["histograma"] = calcular_histograma_fijo(
+            zip(numeros, itertools.repeat(1)),
+            minimo,
+            maximo,
+            extendidas["intervalos"],
+        )
+    if extendidas["divisiones_log"] is not None:
+        histograma = HistogramaLog(extendidas["divisiones_log"])
+        for valor in numeros:
+            histograma.agregar(valor)
+        resultado["histograma_log"] = histograma.intervalos()
+    return resultado
+
+
+def calcular_extendidas_desde_estado(estado, extendidas):
+    """
+    Req 2 y Req 6: Estadisticas extendidas de un EstadoEstadistico.
+    Minimo y maximo salen del acumulador; cuantiles e histograma fijo son
+    exactos con la tabla de frecuencias, los cuantiles son aproximados con
+    el sketch KLL y, sin ninguno de los dos, quedan como N/A. El
+    histograma logaritmico se acumula en la misma pasada en todos los
+    modos.
+    """
+    acumulador = estado.acumulador
+    probabilidades = extendidas["cuantiles"]
+    aproximados = False
+
+    if estado.conteos is not None:
+        cuantiles = calcular_cuantiles_desde_conteos(
+            estado.conteos, probabilidades
+        )
+    elif estado.sketch is not None:
+        cuantiles = estado.sketch.cuantiles(probabilidades)
+        aproximados = True
+    else:
+        cuantiles = [None for _ in probabilidades]
+
+    resultado = resumir_extendidas(
+        acumulador.minimo, acumulador.maximo, cuantiles, extendidas
+    )
+    resultado["cuantiles_aproximados"] = aproximados
+
+    if extendidas["intervalos"] is not None and acumulador.conteo > 0:
+        if estado.conteos is None:
+            resultado["histograma_no_disponible"] = True
+        else:
+            resultado["histograma"] = calcular_histograma_fijo(
+                estado.conteos.items(),
+                acumulador.minimo,
+                acumulador.maximo,
+                extendidas["intervalos"],
+            )
+    if estado.histograma_log is not None:
+        resultado["histograma_log"] = estado.histograma_log.intervalos()
+    return resultado
+
+
+def calcular_rangos_alineados(ruta_archivo, partes):
+    """
+    Req 6: Divide el archivo en hasta `partes` rangos de bytes [inicio, fin)
+    que terminan justo despues de un salto de linea (ninguna linea queda
+    partida entre dos rangos).
+    """
+    with open(ruta_archivo, "rb") as archivo:
+        archivo.seek(0, 2)
+        tamano = archivo.tell()
+
+        cortes = [0]
+        for parte in range(1, partes):
+            posicion = tamano * parte // partes
+            if posicion <= cortes[-1]:
+                continue
+            archivo.seek(posicion)
+            archivo.readline()
+            posicion = archivo.tell()
+            if cortes[-1] < posicion < tamano:
+                cortes.append(posicion)
+        cortes.append(tamano)
+
+    rangos = []
+    for i in range(len(cortes) - 1):
+        if cortes[i] < cortes[i + 1]:
+            rangos.append((cortes[i], cortes[i + 1]))
+    return rangos
+
+
+class ErroresEnDisco:
+    """
+    Req 3 y Req 6: Destino de los errores de un proceso de --workers:
+    escribe cada mensaje (una linea) en un archivo temporal que crea con
+    el primero, para no regresarlos en memoria. De la interfaz de lista
+    solo ofrece append, que es lo que usan los lectores.
+    """
+
+    def __init__(self, pila):
+        self.pila = pila
+        self.ruta = None
+        self.archivo = None
+
+    def append(self, mensaje):
+        """Escribe un mensaje en el archivo temporal."""
+        if self.archivo is None:
+            descriptor, self.ruta = tempfile.mkstemp(
+                prefix="errores_rango_", suffix=".txt"
+            )
+            self.archivo = self.pila.enter_context(
+                os.fdopen(descriptor, "w", encoding="utf-8")
+            )
+        self.archivo.write(mensaje + "\n")
+
+    def descartar(self):
+        """Borra el archivo temporal (ya cerrado) si se llego a crear."""
+        if self.ruta is not None:
+            os.remove(self.ruta)
+            self.ruta = None
+
+
+def procesar_rango_archivo(tarea):
+    """
+    Req 6: Trabajo de cada proceso en --workers. tarea = (ruta, inicio,
+    fin, configuracion, medir). Convierte el rango de bytes con
+    iterar_arreglos_en_rango y regresa un EstadoEstadistico parcial
+    combinable o, con configuracion None (modo exacto), los valores en un
+    array('d') compacto. Tambien regresa el numero de lineas y de tokens
+    del rango y la ruta del archivo temporal con sus errores (linea
+    relativa al rango) o None; el proceso principal les ajusta la linea.
+    Req 3: Si el rango no es UTF-8 valido regresa solo error_lectura, con
+    el mismo mensaje que el lector en serie.
+    Req 7: Con medir, regresa en "fases" los segundos por fase medidos en
+    el proceso (si no, None).
+    """
+    ruta_archivo, inicio, fin, configuracion, medir = tarea
+    medidor = MedidorFases() if medir else None
+    conteo = {"total_valores": 0, "lineas": 0}
+    parcial = {"estado": None, "valores": None, "error_lectura": None}
+
+    with contextlib.ExitStack() as pila:
+        errores = ErroresEnDisco(pila)
+        try:
+            bloques = iterar_arreglos_en_rango(
+                ruta_archivo, (inicio, fin), errores, conteo, medidor
+            )
+            if configuracion is None:
+                parcial["valores"] = array("d")
+                for bloque in bloques:
+                    parcial["valores"].extend(bloque)
+            else:
+                parcial["estado"] = EstadoEstadistico(**configuracion)
+                for bloque in bloques:
+                    with medir_fase(medidor, FASE_ESTADISTICAS):
+                        parcial["estado"].agregar_bloque(bloque)
+                parcial["estado"].total_valores = conteo["total_valores"]
+        except UnicodeDecodeError as exc:
+            parcial = {
+                "estado": None,
+                "valores": None,
+                "error_lectura": (
+                    f"Error al leer el archivo '{ruta_archivo}': {exc}"
+                ),
+            }
+
+    if parcial["error_lectura"] is not None:
+        errores.descartar()
+    parcial["errores"] = errores.ruta
+    parcial["lineas"] = conteo["lineas"]
+    parcial["total_valores"] = conteo["total_valores"]
+    parcial["fases"] = None if medidor is None else medidor.segundos
+    return parcial
+
+
+def desplazar_linea_error(mensaje, lineas_previas):
+    """
+    Req 3: Mensaje de formatear_error_token con la linea relativa a un
+    rango convertida en linea del archivo completo.
+    """
+    if not mensaje.startswith(PREFIJO_ERROR_LINEA):
+        return mensaje
+    numero_linea, resto = mensaje[len(PREFIJO_ERROR_LINEA):].split(":", 1)
+    return f"{PREFIJO_ERROR_LINEA}{lineas_previas + int(numero_linea)}:{resto}"
+
+
+def agregar_errores_de_rango(errores, ruta_errores, lineas_previas):
+    """
+    Req 3 y Req 6: Pasa al colector los errores que un proceso de
+    --workers dejo en disco, con la linea ajustada al archivo completo, y
+    borra el archivo temporal.
+    """
+    try:
+        with open(
+            ruta_errores, "r", encoding="utf-8", newline="\n"
+        ) as archivo:
+            for renglon in archivo:
+                errores.append(
+                    desplazar_linea_error(
+                        renglon.rstrip("\n"), lineas_previas
+                    )
+                )
+    finally:
+        os.remove(ruta_errores)
+
+
+def iterar_resultados_medidos(resultados, medidor):
+    """
+    Req 7: Entrega los parciales de procesar_rango_archivo. Con medidor,
+    al terminar reparte el tiempo que se espero al pool entre las fases
+    en proporcion a los segundos que midieron los procesos (sumados), asi
+    el resumen no cuenta dos veces el trabajo hecho en paralelo.
+    """
+    if medidor is None:
+        yield from resultados
+        return
+
+    espera = 0.0
+    fases = {}
+    while True:
+        inicio = time.perf_counter()
+        parcial = next(resultados, None)
+        espera += time.perf_counter() - inicio
+        if parcial is None:
+            break
+        for nombre, segundos in parcial["fases"].items():
+            fases[nombre] = fases.get(nombre, 0.0) + segundos
+        yield parcial
+    medidor.repartir(espera, fases)
+
+
+def iterar_parciales_en_paralelo(
+    ruta_archivo, workers, configuracion, errores, medidor=None
+):
+    """
+    Req 6: Reparte el archivo en rangos alineados a lineas entre un pool
+    de `workers` procesos (procesar_rango_archivo con `configuracion`) y
+    entrega sus resultados parciales en el orden del archivo, con los
+    errores de cada rango ya pasados a `errores` con su linea en el
+    archivo completo.
+    Req 3: Un error al abrir el archivo se reporta; como el lector en
+    serie, la lectura se detiene en el primer rango ilegible y los
+    rangos siguientes se descartan.
+    Req 7: Con medidor, los procesos miden sus fases (ver
+    iterar_resultados_medidos); lo que el consumidor hace con cada
+    parcial lo mide el consumidor.
+    """
+    try:
+        rangos = calcular_rangos_alineados(ruta_archivo, workers)
+    except FileNotFoundError:
+        errores.append(f"No se encontro el archivo: {ruta_archivo}")
+        return
+    except PermissionError:
+        errores.append(f"Sin permisos para leer el archivo: {ruta_archivo}")
+        return
+    except OSError as exc:
+        errores.append(f"Error al leer el archivo '{ruta_archivo}': {exc}")
+        return
+
+    tareas = [
+        (ruta_archivo, inicio, fin, configuracion, medidor is not None)
+        for inicio, fin in rangos
+    ]
+    lineas_previas = 0
+    error_lectura = None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for parcial in iterar_resultados_medidos(
+            pool.map(procesar_rango_archivo, tareas), medidor
+        ):
+            if error_lectura is None:
+                error_lectura = parcial["error_lectura"]
+            if error_lectura is not None:
+                if parcial["errores"] is not None:
+                    os.remove(parcial["errores"])
+                continue
+            if parcial["errores"] is not None:
+                agregar_errores_de_rango(
+                    errores, parcial["errores"], lineas_previas
+                )
+            lineas_previas += parcial["lineas"]
+            yield parcial
+
+    if error_lectura is not None:
+        errores.append(error_lectura)
+
+
+def acumular_en_paralelo(
+    ruta_archivo, workers, configuracion, errores=None, medidor=None
+):
+    """
+    Req 6: Modo --workers con estado (--streaming, --approx,
+    --moda-aproximada o --guardar-estado): combina los estados parciales
+    de iterar_parciales_en_paralelo en el orden del archivo.
+    Req 7: Combinar cada parcial cuenta como estadisticas.
+    """
+    total = EstadoEstadistico(**configuracion)
+    total.fuentes.append(ruta_archivo)
+    if errores is not None:
+        total.errores = errores
+
+    for parcial in iterar_parciales_en_paralelo(
+        ruta_archivo, workers, configuracion, total.errores, medidor
+    ):
+        with medir_fase(medidor, FASE_ESTADISTICAS):
+            total.combinar(parcial["estado"])
+    return total
+
+
+def leer_numeros_en_paralelo(
+    ruta_archivo, workers, errores=None, medidor=None
+):
+    """
+    Req 6: leer_numeros_desde_archivo para --workers en el modo exacto:
+    cada proceso regresa los valores de su rango en un array('d') (8
+    bytes por valor al pasar entre procesos) y aqui se juntan en orden.
+    Regresa (numeros, errores, total_valores).
+    """
+    if errores is None:
+        errores = ColectorErrores()
+    numeros = array("d")
+    total_valores = 0
+
+    for parcial in iterar_parciales_en_paralelo(
+        ruta_archivo, workers, None, errores, medidor
+    ):
+        numeros.extend(parcial["valores"])
+        total_valores += parcial["total_valores"]
+    return numeros, errores, total_valores
+
+
+def buscar_fin_ultima_linea(archivo, tamano):
+    """
+    Req 6: Posicion justo despues del ultimo "\n" del archivo binario
+    (0 si no hay ninguno); lee hacia atras por bloques.
+    """
+    fin = tamano
+    while fin > 0:
+        inicio = max(0, fin - TAMANO_BLOQUE_LECTURA)
+        archivo.seek(inicio)
+        bloque = archivo.read(fin - inicio)
+        posicion = bloque.rfind(b"\n")
+        if posicion >= 0:
+            return inicio + posicion + 1
+        fin = inicio
+    return 0
+
+
+def calcular_huella(archivo, desplazamiento):
+    """
+    Req 6: Huella de los primeros `desplazamiento` bytes: sha256 del bloque
+    inicial y del bloque que termina en el desplazamiento. Detecta si el
+    archivo se reescribio en lugar de solo crecer.
+    """
+    tamano_muestra = min(TAMANO_MUESTRA_HUELLA, desplazamiento)
+
+    archivo.seek(0)
+    inicial = hashlib.sha256(archivo.read(tamano_muestra)).hexdigest()
+    archivo.seek(desplazamiento - tamano_muestra)
+    final = hashlib.sha256(archivo.read(tamano_muestra)).hexdigest()
+
+    return {"desplazamiento": desplazamiento, "inicio": inicial, "final": final}
+
+
+def cargar_cache_incremental(ruta_cache, archivo, tamano, modo):
+    """
+    Req 6: Carga el cache de la corrida anterior si sigue siendo valido:
+    mismo modo de calculo, el archivo no se acorto y la huella coincide.
+    Regresa None si hay que recalcular desde el inicio.
+    """
+    try:
+        with open(ruta_cache, "r", encoding="utf-8") as entrada:
+            cache = json.load(entrada)
+        if cache["version"] != VERSION_ESTADO or cache["modo"] != modo:
+            return None
+        desplazamiento = int(cache["huella"]["desplazamiento"])
+        if desplazamiento > tamano:
+            return None
+        if calcular_huella(archivo, desplazamiento) != cache["huella"]:
+            return None
+        cache["estado"] = EstadoEstadistico.desde_diccionario(cache["estado"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return cache
+
+
+def acumular_rango_en_estado(
+    estado, ruta_archivo, rango, linea_base, medidor=None
+):
+    """
+    Req 6: Agrega al estado los valores del rango de bytes (inicio, fin),
+    convertidos por bloques con iterar_arreglos_en_rango; los errores usan
+    numeros de linea absolutos (linea_base + relativa). Regresa el numero
+    de lineas del rango.
+    Req 7: Con medidor, el lector mide sus fases y agregar cada bloque
+    cuenta como estadisticas.
+    """
+    conteo = {"total_valores": 0, "lineas": linea_base}
+    for bloque in iterar_arreglos_en_rango(
+        ruta_archivo, rango, estado.errores, conteo, medidor
+    ):
+        with medir_fase(medidor, FASE_ESTADISTICAS):
+            estado.agregar_bloque(bloque)
+
+    estado.total_valores += conteo["total_valores"]
+    return conteo["lineas"] - linea_base
+
+
+def acumular_incremental(
+    ruta_archivo, ruta_cache, configuracion, errores=None, medidor=None
+):
+    """
+    Req 6: Modo --incremental para archivos que solo crecen. Reutiliza el
+    estado guardado hasta el ultimo salto de linea procesado y solo lee lo
+    agregado despues; luego actualiza el cache. La ultima linea sin "\n"
+    se suma al resultado pero no al cache, porque aun puede crecer.
+    Req 3: Un error de lectura (incluido texto que no es UTF-8 valido) se
+    reporta y el cache no se actualiza.
+    Req 7: Con medidor, buscar el fin y cargar y validar el cache cuentan
+    como lectura; los rangos se miden como en acumular_rango_en_estado.
+    """
+    estado = EstadoEstadistico(**configuracion)
+    estado.fuentes.append(ruta_archivo)
+
+    try:
+        with open(ruta_archivo, "rb") as archivo:
+            with medir_fase(medidor, FASE_LECTURA):
+                archivo.seek(0, 2)
+                tamano = archivo.tell()
+                fin_completo = buscar_fin_ultima_linea(archivo, tamano)
+                cache = cargar_cache_incremental(
+                    ruta_cache, archivo, tamano, configuracion
+                )
+            if cache is not None:
+                estado = cache["estado"]
+                desplazamiento = cache["huella"]["desplazamiento"]
+                lineas = cache["lineas"]
+            else:
+                desplazamiento = 0
+                lineas = 0
+            if errores is not None:
+                # Los errores del cache ya se escribieron en su corrida.
+                errores.combinar(estado.errores)
+                estado.errores = errores
+
+            lineas += acumular_rango_en_estado(
+                estado,
+                ruta_archivo,
+                (desplazamiento, fin_completo),
+                lineas,
+                medidor,
+            )
+            with medir_fase(medidor, FASE_LECTURA):
+                huella = calcular_huella(archivo, fin_completo)
+            nuevo_cache = {
+                "version": VERSION_ESTADO,
+                "modo": configuracion,
+                "huella": huella,
+                "lineas": lineas,
+                "estado": estado.a_diccionario(),
+            }
+            acumular_rango_en_estado(
+                estado, ruta_archivo, (fin_completo, tamano), lineas, medidor
+            )
+    except FileNotFoundError:
+        estado.errores.append(f"No se encontro el archivo: {ruta_archivo}")
+        return estado
+    except PermissionError:
+        estado.errores.append(
+            f"Sin permisos para leer el archivo: {ruta_archivo}"
+        )
+        return estado
+    except (OSError, UnicodeDecodeError) as exc:
+        estado.errores.append(
+            f"Error al leer el archivo '{ruta_archivo}': {exc}"
+        )
+        return estado
+
+    guardar_cache_incremental(ruta_cache, nuevo_cache)
+    return estado
+
+
+def guardar_cache_incremental(ruta_cache, cache):
+    """
+    Req 3 y Req 6: Escribe el cache de --incremental; un error solo se
+    avisa porque el resultado ya se calculo.
+    """
+    try:
+        with open(ruta_cache, "w", encoding="utf-8") as salida:
+            json.dump(cache, salida)
+    except OSError as exc:
+        print(f"Error al guardar el cache incremental '{ruta_cache}': {exc}")
+
+
+def escribir_corrida(valores, directorio):
+    """
+    Req 6: Ordena una corrida que cabe en memoria y la guarda como
+    float64 binario en un archivo temporal de `directorio`.
+    """
+    ordenados = array("d", sorted(valores))
+    descriptor, ruta = tempfile.mkstemp(
+        prefix="corrida_", suffix=".bin", dir=directorio
+    )
+    with os.fdopen(descriptor, "wb") as archivo:
+        ordenados.tofile(archivo)
+    return ruta
+
+
+def iterar_corrida(ruta_corrida, valores_por_lectura):
+    """
+    Req 6: Recorre una corrida binaria leyendo `valores_por_lectura`
+    valores a la vez, para que la fusion use memoria acotada.
+    """
+    with open(ruta_corrida, "rb") as archivo:
+        while True:
+            bloque = array("d")
+            try:
+                bloque.fromfile(archivo, valores_por_lectura)
+            except EOFError:
+                # fromfile deja en `bloque` los valores que si alcanzo a leer.
+                yield from bloque
+                return
+            yield from bloque
+
+
+def escribir_valores_ordenados(valores, archivo, formato):
+    """
+    Req 2: Escribe los valores en `archivo` (abierto en binario): float64
+    nativo con FORMATO_BINARIO o uno por linea, con repr exacto, con
+    FORMATO_TEXTO. Regresa cuantos valores escribio.
+    """
+    total = 0
+    pendientes = array("d")
+
+    def vaciar():
+        if formato == FORMATO_BINARIO:
+            pendientes.tofile(archivo)
+        else:
+            texto = "\n".join(map(repr, pendientes))
+            archivo.write(texto.encode("ascii") + b"\n")
+        del pendientes[:]
+
+    for valor in valores:
+        pendientes.append(valor)
+        if len(pendientes) >= VALORES_POR_ESCRITURA:
+            total += len(pendientes)
+            vaciar()
+
+    if pendientes:
+        total += len(pendientes)
+        vaciar()
+    return total
+
+
+def fusionar_corridas(rutas_corridas, valores_por_lectura):
+    """
+    Req 6: Fusion de k vias con heap (heapq.merge) de corridas ordenadas.
+    """
+    return heapq.merge(
+        *(iterar_corrida(ruta, valores_por_lectura) for ruta in rutas_corridas)
+    )
+
+
+def reducir_corridas(rutas_corridas, directorio, valores_por_lectura):
+    """
+    Req 6: Mientras haya mas de FAN_IN_MAXIMO corridas, fusiona grupos de
+    FAN_IN_MAXIMO en corridas mas grandes para no abrir demasiados
+    archivos a la vez en la fusion final.
+    """
+    while len(rutas_corridas) > FAN_IN_MAXIMO:
+        siguientes = []
+        for inicio in range(0, len(rutas_corridas), FAN_IN_MAXIMO):
+            grupo = rutas_corridas[inicio:inicio + FAN_IN_MAXIMO]
+            descriptor, ruta = tempfile.mkstemp(
+                prefix="corrida_", suffix=".bin", dir=directorio
+            )
+            with os.fdopen(descriptor, "wb") as archivo:
+                escribir_valores_ordenados(
+                    fusionar_corridas(grupo, valores_por_lectura),
+                    archivo,
+                    FORMATO_BINARIO,
+                )
+            for ruta_grupo in grupo:
+                os.remove(ruta_grupo)
+            siguientes.append(ruta)
+        rutas_corridas = siguientes
+    return rutas_corridas
+
+
+def ordenar_externo(valores, ruta_salida, memoria_bytes, formato):
+    """
+    Req 6: Ordenamiento externo (merge sort) con memoria acotada.
+    Junta corridas de hasta memoria_bytes // BYTES_POR_VALOR_CORRIDA
+    valores, las ordena y las guarda en archivos temporales junto a
+    `ruta_salida`; despues las fusiona con un heap y escribe el resultado.
+    Si todo cabe en una corrida no usa archivos temporales.
+    Regresa el numero de valores escritos.
+    """
+    valores_corrida = max(
+        MINIMO_VALORES_CORRIDA, memoria_bytes // BYTES_POR_VALOR_CORRIDA
+    )
+    directorio_salida = os.path.dirname(os.path.abspath(ruta_salida))
+
+    with tempfile.TemporaryDirectory(
+        prefix="ordenamiento_", dir=directorio_salida
+    ) as directorio:
+        rutas_corridas = []
+        corrida = array("d")
+        for valor in valores:
+            corrida.append(valor)
+            if len(corrida) >= valores_corrida:
+                rutas_corridas.append(escribir_corrida(corrida, directorio))
+                corrida = array("d")
+
+        with open(ruta_salida, "wb") as archivo:
+            if not rutas_corridas:
+                return escribir_valores_ordenados(
+                    sorted(corrida), archivo, formato
+                )
+
+            if corrida:
+                rutas_corridas.append(escribir_corrida(corrida, directorio))
+            del corrida
+
+            # Cada corrida abierta en la fusion lee por bloques; entre todas
+            # ocupan a lo mas el tope de memoria.
+            valores_por_lectura = max(
+                MINIMO_VALORES_CORRIDA,
+                memoria_bytes // (8 * (FAN_IN_MAXIMO + 1)),
+            )
+            rutas_corridas = reducir_corridas(
+                rutas_corridas, directorio, valores_por_lectura
+            )
+            return escribir_valores_ordenados(
+                fusionar_corridas(rutas_corridas, valores_por_lectura),
+                archivo,
+                formato,
+            )
+
+
+def ordenar_archivo_externo(ruta_archivo, ruta_salida, opciones):
+    """
+    Req 6: Escribe en `ruta_salida` todos los valores validos del archivo
+    ordenados de menor a mayor, sin cargarlos todos en memoria.
+    opciones: dict con memoria_bytes, formato, lector y en_hilo. Los
+    errores del archivo ya se reportan en la pasada principal, aqui solo
+    se cuentan.
+    """
+    errores = ColectorErrores(0)
+    conteo = {"total_valores": 0}
+    return ordenar_externo(
+        iterar_numeros_desde_archivo(
+            ruta_archivo,
+            errores,
+            conteo,
+            opciones["lector"],
+            en_hilo=opciones["en_hilo"],
+        ),
+        ruta_salida,
+        opciones["memoria_bytes"],
+        opciones["formato"],
+    )
+
+
+class MedianaDosMonticulos:
+    """
+    Req 6: Mediana de un multiconjunto que acepta altas y bajas en
+    O(log N): `bajos` (max-heap, guardado con signo negativo) tiene la
+    mitad menor y `altos` (min-heap) la mayor. Las bajas son perezosas:
+    se anotan en `pendientes` y se sacan cuando llegan a la cima.
+    """
+
+    def __init__(self):
+        self.bajos = []
+        self.altos = []
+        self.pendientes = {}
+        self.tamano_bajos = 0
+        self.tamano_altos = 0
+
+    def __len__(self):
+        return self.tamano_bajos + self.tamano_altos
+
+    def agregar(self, valor):
+        """Agrega un valor."""
+        if not self.bajos or valor <= -self.bajos[0]:
+            heapq.heappush(self.bajos, -valor)
+            self.tamano_bajos += 1
+        else:
+            heapq.heappush(self.altos, valor)
+            self.tamano_altos += 1
+        self.balancear()
+
+    def quitar(self, valor):
+        """Quita un valor que se agrego antes."""
+        self.pendientes[valor] = self.pendientes.get(valor, 0) + 1
+        if valor <= -self.bajos[0]:
+            self.tamano_bajos -= 1
+            self.podar(self.bajos, -1)
+        else:
+            self.tamano_altos -= 1
+            self.podar(self.altos, 1)
+        self.balancear()
+
+        if (
+            len(self.bajos) + len(self.altos)
+            > 2 * len(self) + MINIMO_COMPACTAR_MONTICULOS
+        ):
+            self.compactar()
+
+    def mediana(self):
+        """Mediana actual o None si esta vacio."""
+        if len(self) == 0:
+            return None
+        if self.tamano_bajos > self.tamano_altos:
+            return -self.bajos[0]
+        return (-self.bajos[0] + self.altos[0]) / 2
+
+    def podar(self, monticulo, signo):
+        """Saca de la cima las entradas con baja pendiente."""
+        while monticulo:
+            valor = signo * monticulo[0]
+            pendientes = self.pendientes.get(valor, 0)
+            if pendientes == 0:
+                return
+            if pendientes == 1:
+                del self.pendientes[valor]
+            else:
+                self.pendientes[valor] = pendientes - 1
+            heapq.heappop(monticulo)
+
+    def balancear(self):
+        """Deja en `bajos` tantos valores como en `altos`, o uno mas."""
+        if self.tamano_bajos > self.tamano_altos + 1:
+            heapq.heappush(self.altos, -heapq.heappop(self.bajos))
+            self.tamano_bajos -= 1
+            self.tamano_altos += 1
+            self.podar(self.bajos, -1)
+        elif self.tamano_bajos < self.tamano_altos:
+            heapq.heappush(self.bajos, -heapq.heappop(self.altos))
+            self.tamano_altos -= 1
+            self.tamano_bajos += 1
+            self.podar(self.altos, 1)
+
+    def compactar(self):
+        """
+        Reconstruye ambos monticulos solo con los valores vigentes. Se
+        reparten de nuevo desde cero porque una baja pendiente de un valor
+        repetido en la frontera puede haberse aplicado en el otro monticulo.
+        """
+        valores = [-valor for valor in self.bajos] + self.altos
+        vigentes = []
+        for valor in sorted(valores):
+            pendientes = self.pendientes.get(valor, 0)
+            if pendientes:
+                self.pendientes[valor] = pendientes - 1
+            else:
+                vigentes.append(valor)
+
+        mitad = (len(vigentes) + 1) // 2
+        self.bajos = [-valor for valor in vigentes[:mitad]]
+        self.altos = vigentes[mitad:]
+        heapq.heapify(self.bajos)
+        self.pendientes = {}
+        self.tamano_bajos = len(self.bajos)
+        self.tamano_altos = len(self.altos)
+
+
+class EstadisticaVentana:
+    """
+    Req 6: Media, varianza y mediana de una ventana con altas y bajas en
+    O(log N). Media y M2 se actualizan con Welford en ambos sentidos
+    (la baja invierte la formula de la alta).
+    """
+
+    def __init__(self):
+        self.valores = collections.deque()
+        self.medianas = MedianaDosMonticulos()
+        self.media = 0.0
+        self.m2 = 0.0
+
+    def agregar(self, valor):
+        """Agrega un valor al final de la ventana."""
+        self.valores.append(valor)
+        self.medianas.agregar(valor)
+        delta = valor - self.media
+        self.media += delta / len(self.valores)
+        self.m2 += delta * (valor - self.media)
+
+    def quitar_primero(self):
+        """Quita el valor mas antiguo de la ventana."""
+        valor = self.valores.popleft()
+        self.medianas.quitar(valor)
+        if not self.valores:
+            self.media = 0.0
+            self.m2 = 0.0
+            return
+        delta = valor - self.media
+        self.media -= delta / len(self.valores)
+        # El redondeo puede dejar M2 ligeramente negativo.
+        self.m2 = max(0.0, self.m2 - delta * (valor - self.media))
+
+    def resultado(self, numero_ventana, fin):
+        """
+        Estadisticas de la ventana actual; `fin` es la posicion (base 1)
+        del ultimo valor valido incluido.
+        """
+        conteo = len(self.valores)
+        varianza = self.m2 / conteo
+        return {
+            "ventana": numero_ventana,
+            "inicio": fin - conteo + 1,
+            "fin": fin,
+            "conteo": conteo,
+            "media": self.media,
+            "varianza": varianza,
+            "desviacion_estandar": calcular_raiz_cuadrada(varianza),
+            "mediana": self.medianas.mediana(),
+        }
+
+
+def iterar_estadisticas_ventana(
+    valores, tamano, tipo=VENTANA_DESLIZANTE, paso=1
+):
+    """
+    Req 6: Entrega un diccionario de estadisticas por ventana.
+    VENTANA_DESLIZANTE: ultimos `tamano` valores, un resultado cada `paso`
+    valores una vez que la ventana esta llena. VENTANA_FIJA: bloques
+    consecutivos de `tamano` valores; el ultimo puede quedar incompleto.
+    Cada valor cuesta O(log tamano) en lugar de recalcular la ventana.
+    """
+    ventana = EstadisticaVentana()
+    numero_ventana = 0
+    posicion = 0
+
+    for posicion, valor in enumerate(valores, start=1):
+        ventana.agregar(valor)
+        if tipo == VENTANA_FIJA:
+            if len(ventana.valores) == tamano:
+                numero_ventana += 1
+                yield ventana.resultado(numero_ventana, posicion)
+                ventana = EstadisticaVentana()
+            continue
+
+        if len(ventana.valores) > tamano:
+            ventana.quitar_primero()
+        if len(ventana.valores) == tamano and (posicion - tamano) % paso == 0:
+            numero_ventana += 1
+            yield ventana.resultado(numero_ventana, posicion)
+
+    if tipo == VENTANA_FIJA and ventana.valores:
+        yield ventana.resultado(numero_ventana + 1, posicion)
+
+
+def escribir_ventanas(resultados, ruta_salida):
+    """
+    Req 2: Escribe un renglon CSV por ventana (valores con repr exacto).
+    Regresa el numero de ventanas escritas.
+    """
+    columnas = (
+        "ventana",
+        "inicio",
+        "fin",
+        "conteo",
+        "media",
+        "varianza",
+        "desviacion_estandar",
+        "mediana",
+    )
+    total = 0
+    with open(ruta_salida, "w", encoding="utf-8") as archivo:
+        archivo.write(",".join(columnas) + "\n")
+        for resultado in resultados:
+            archivo.write(
+                ",".join(repr(resultado[columna]) for columna in columnas)
+                + "\n"
+            )
+            total += 1
+    return total
+
+
+def convertir_bloque_numpy(traducido, tokens, linea_base, errores, conteo):
+    """
+    Req 3 y Req 6: convertir_bloque_lineas para el backend NumPy: el
+    bloque se convierte con una sola llamada vectorizada; si algun token
+    es invalido (o NaN/Inf) el bloque se repite token por token para
+    reportar los mismos errores por linea.
+    """
+    try:
+        valores = np.array(tokens, dtype=np.float64)
+    except ValueError:
+        valores = None
+    if valores is not None and np.isfinite(valores).all():
+        conteo["total_valores"] += len(tokens)
+        return valores, contar_lineas(traducido)
+
+    lineas = separar_lineas(traducido)
+    valores = np.fromiter(
+        iterar_numeros_en_lineas(lineas, linea_base, errores, conteo),
+        dtype=np.float64,
+    )
+    return valores, len(lineas)
+
+
+def leer_numeros_numpy(
+    ruta_archivo, errores=None, lector=None, medidor=None, *, en_hilo=False
+):
+    """
+    Req 1 y Req 3: Igual que leer_numeros_desde_archivo pero regresa un
+    arreglo de NumPy: lee por bloques con el mismo `lector` (mmap por
+    defecto, texto o entrada comprimida) y cada bloque de lineas pasa por
+    convertir_bloque_numpy, sin tener el archivo completo en memoria.
+    medidor y en_hilo: ver iterar_arreglos_desde_archivo.
+    """
+    if errores is None:
+        errores = ColectorErrores()
+    conteo = {"total_valores": 0}
+    partes = list(
+        iterar_arreglos_desde_archivo(
+            ruta_archivo,
+            errores,
+            conteo,
+            lector,
+            medidor,
+            en_hilo=en_hilo,
+            convertir=convertir_bloque_numpy,
+        )
+    )
+
+    with medir_fase(medidor, FASE_CONVERSION):
+        if partes:
+            numeros = np.concatenate(partes)
+        else:
+            numeros = np.empty(0, dtype=np.float64)
+    return numeros, errores, conteo["total_valores"]
+
+
+def sumar_secuencial_numpy(valores, media=None):
+    """
+    Req 2: Suma de valores (o de (x - media)^2 si se da media) en el mismo
+    orden que los ciclos de calcular_media y calcular_varianza, para que
+    el resultado sea identico al del backend de Python; np.sum suma por
+    pares y math.fsum redondea una sola vez, y ambos pueden diferir en el
+    ultimo bit. Cada bloque de VALORES_POR_BLOQUE_SUMA se acumula con
+    np.cumsum en un bufer fijo, con la suma anterior agregada a su primer
+    elemento, asi la memoria extra no crece con n.
+    """
+    bufer = np.empty(min(valores.size, VALORES_POR_BLOQUE_SUMA))
+    suma = 0.0
+    for inicio in range(0, valores.size, VALORES_POR_BLOQUE_SUMA):
+        bloque = valores[inicio:inicio + VALORES_POR_BLOQUE_SUMA]
+        parcial = bufer[:bloque.size]
+        if media is None:
+            np.copyto(parcial, bloque)
+        else:
+            np.subtract(bloque, media, out=parcial)
+            np.multiply(parcial, parcial, out=parcial)
+        parcial[0] += suma
+        np.cumsum(parcial, out=parcial)
+        suma = float(parcial[-1])
+    return suma
+
+
+def calcular_estadisticas_numpy(numeros, medidor=None):
+    """
+    Req 2: Media, mediana, moda y varianza con llamadas vectorizadas.
+    Las sumas usan sumar_secuencial_numpy (acumulacion secuencial, igual
+    que los ciclos de calcular_media y calcular_varianza) en lugar de
+    np.sum (por pares) para que el reporte sea identico al del backend de
+    Python.
+    Req 7: Con medidor, la seleccion de la mediana (np.partition) cuenta
+    como ordenamiento y lo demas como estadisticas, igual que en
+    calcular_estadisticas_en_memoria.
+    """
+    num = numeros.size
+    stats = {"media": None, "mediana": None, "modas": [], "varianza": None}
+    if num == 0:
+        return stats
+
+    mitad = num // 2
+    with medir_fase(medidor, FASE_ORDENAMIENTO):
+        if num % 2 == 1:
+            stats["mediana"] = float(np.partition(numeros, mitad)[mitad])
+        else:
+            particion = np.partition(numeros, (mitad - 1, mitad))
+            stats["mediana"] = (
+                float(particion[mitad - 1]) + float(particion[mitad])
+            ) / 2.0
+
+    with medir_fase(medidor, FASE_ESTADISTICAS):
+        media = sumar_secuencial_numpy(numeros) / num
+        stats["media"] = media
+        stats["varianza"] = sumar_secuencial_numpy(numeros, media) / num
+
+        valores, frecuencias = np.unique(numeros, return_counts=True)
+        if frecuencias.max() > 1:
+            stats["modas"] = valores[
+                frecuencias == frecuencias.max()
+            ].tolist()
+
+    return stats
+
+
+def calcular_cuantiles_numpy(numeros, probabilidades):
+    """
+    Req 2: calcular_cuantiles_en_memoria con np.partition in-place sobre
+    todas las posiciones a la vez.
+    """
+    num = numeros.size
+    posiciones = set()
+    for probabilidad in probabilidades:
+        inferior, superior, _ = posiciones_cuantil(num, probabilidad)
+        posiciones.update((inferior, superior))
+    numeros.partition(sorted(posiciones))
+
+    cuantiles = []
+    for probabilidad in probabilidades:
+        inferior, superior, fraccion = posiciones_cuantil(num, probabilidad)
+        cuantiles.append(
+            interpolar(
+                float(numeros[inferior]), float(numeros[superior]), fraccion
+            )
+        )
+    return cuantiles
+
+
+def calcular_histograma_fijo_numpy(numeros, minimo, maximo, intervalos):
+    """
+    Req 2: calcular_histograma_fijo vectorizado (misma formula de indice).
+    """
+    ancho = (maximo - minimo) / intervalos
+    if ancho > 0:
+        indices = ((numeros - minimo) / ancho).astype(np.int64)
+        np.minimum(indices, intervalos - 1, out=indices)
+    else:
+        indices = np.zeros(numeros.size, dtype=np.int64)
+    return {
+        "limites": [minimo + i * ancho for i in range(intervalos)] + [maximo],
+        "conteos": np.bincount(indices, minlength=intervalos).tolist(),
+    }
+
+
+def calcular_extendidas_numpy(numeros, extendidas):
+    """
+    Req 2: Version vectorizada de calcular_extendidas_en_memoria. Usa las
+    mismas posiciones, interpolacion y formula de intervalo para que el
+    reporte sea identico al del backend de Python. Reacomoda `numeros`.
+    """
+    num = numeros.size
+    if num == 0:
+        return calcular_extendidas_en_memoria(array("d"), extendidas)
+
+    minimo = float(numeros.min())
+    maximo = float(numeros.max())
+
+    resultado = resumir_extendidas(
+        minimo,
+        maximo,
+        calcular_cuantiles_numpy(numeros, extendidas["cuantiles"]),
+        extendidas,
+    )
+
+    if extendidas["intervalos"] is not None:
+        resultado["histograma"] = calcular_histograma_fijo_numpy(
+            numeros, minimo, maximo, extendidas["intervalos"]
+        )
+    if extendidas["divisiones_log"] is not None:
+        # math.log10 por valor (no np.log10) para asignar los mismos
+        # intervalos que el backend de Python en los limites.
+        histograma = HistogramaLog(extendidas["divisiones_log"])
+        for valor in numeros.tolist():
+            histograma.agregar(valor)
+        resultado["histograma_log"] = histograma.intervalos()
+    return resultado
+
+
+def formatear_numero(valor):
+    """
+    Req 2: Presenta resultados en un formato legible en pantalla/archivo.
+    Req 3: Si un calculo no aplica (None), muestra N/A en lugar de fallar.
+    """
+    if valor is None:
+        return "N/A"
+    if valor == int(valor):
+        return str(int(valor))
+    return f"{valor:.6f}"
+
+
+def agregar_seccion_cuantiles(lineas, stats):
+    """
+    Req 2: Agrega al reporte los cuantiles aproximados del modo --approx.
+    """
+    cuantiles = stats.get("cuantiles")
+    if cuantiles is None:
+        return
+
+    lineas.append("")
+    lineas.append(
+        "=== Cuantiles aproximados (error de rango "
+        f"+/- {stats['error_rango']:g}) ==="
+    )
+    for etiqueta, valor in cuantiles:
+        lineas.append(f"{etiqueta}: {formatear_numero(valor)}")
+
+
+def etiqueta_cuantil(probabilidad):
+    """Req 2: Etiqueta pNN de una probabilidad (0.25 -> p25)."""
+    return f"p{probabilidad * 100:g}"
+
+
+def agregar_seccion_extendidas(lineas, stats):
+    """
+    Req 2: Agrega minimo, maximo, rango, cuantiles e histogramas de
+    --extendidas, --cuantiles, --histograma y --histograma-log.
+    """
+    extendidas = stats.get("extendidas")
+    if extendidas is None:
+        return
+
+    lineas.append("")
+    lineas.append("=== Estadisticas extendidas ===")
+    lineas.append(f"Min (minimo): {formatear_numero(extendidas['minimo'])}")
+    lineas.append(f"Max (maximo): {formatear_numero(extendidas['maximo'])}")
+    lineas.append(f"Range (rango): {formatear_numero(extendidas['rango'])}")
+    marca = " (aproximado)" if extendidas["cuantiles_aproximados"] else ""
+    for probabilidad, valor in extendidas["cuantiles"]:
+        lineas.append(
+            f"{etiqueta_cuantil(probabilidad)}: "
+            f"{formatear_numero(valor)}"
+            f"{marca if valor is not None else ''}"
+        )
+
+    histograma = extendidas["histograma"]
+    if extendidas.get("histograma_no_disponible"):
+        lineas.append("")
+        lineas.append(
+            "Histograma: N/A (requiere la tabla exacta de frecuencias; "
+            "use --histograma-log en este modo)"
+        )
+    if histograma is not None:
+        lineas.append("")
+        lineas.append(
+            f"=== Histograma ({len(histograma['conteos'])} intervalos) ==="
+        )
+        limites = histograma["limites"]
+        for i, conteo in enumerate(histograma["conteos"]):
+            cierre = "]" if i == len(histograma["conteos"]) - 1 else ")"
+            lineas.append(
+                f"[{formatear_numero(limites[i])}, "
+                f"{formatear_numero(limites[i + 1])}{cierre}: {conteo}"
+            )
+
+    if extendidas["histograma_log"] is not None:
+        lineas.append("")
+        lineas.append("=== Histograma logaritmico (base 10) ===")
+        for inferior, superior, conteo in extendidas["histograma_log"]:
+            if inferior == superior:
+                lineas.append(f"0: {conteo}")
+            else:
+                lineas.append(
+                    f"[{inferior:g}, {superior:g}): {conteo}"
+                )
+
+
+def agregar_seccion_bootstrap(lineas, stats):
+    """
+    Req 2: Agrega los intervalos de --bootstrap: estimacion del archivo,
+    intervalo por percentiles y error estandar de las remuestras.
+    """
+    bootstrap = stats.get("bootstrap")
+    if bootstrap is None:
+        return
+
+    lineas.append("")
+    lineas.append(
+        f"=== Intervalos bootstrap ({bootstrap['remuestras']} remuestras, "
+        f"confianza {bootstrap['confianza'] * 100:g}%, "
+        f"semilla {bootstrap['semilla']}) ==="
+    )
+    for nombre, etiqueta in ESTADISTICAS_BOOTSTRAP:
+        intervalo = bootstrap["intervalos"][nombre]
+        if intervalo is None:
+            lineas.append(f"{etiqueta}: N/A (no hay datos)")
+            continue
+        lineas.append(
+            f"{etiqueta}: {formatear_numero(stats[nombre])} "
+            f"[{formatear_numero(intervalo['inferior'])}, "
+            f"{formatear_numero(intervalo['superior'])}] "
+            "(error estandar "
+            f"{formatear_numero(intervalo['error_estandar'])})"
+        )
+
+
+def agregar_seccion_frecuentes(lineas, stats):
+    """
+    Req 2: Agrega al reporte los candidatos a moda de --moda-aproximada con
+    sus cotas de frecuencia.
+    """
+    frecuentes = stats.get("frecuentes")
+    if frecuentes is None:
+        return
+
+    lineas.append("")
+    if stats["moda_confirmada"]:
+        lineas.append(
+            "=== Valores mas frecuentes (Space-Saving, k="
+            f"{stats['capacidad_frecuentes']}, conteo exacto confirmado) ==="
+        )
+    else:
+        lineas.append(
+            "=== Valores mas frecuentes (Space-Saving, k="
+            f"{stats['capacidad_frecuentes']}, error maximo "
+            f"{stats['error_frecuentes']}) ==="
+        )
+    for valor, minimo, maximo in frecuentes:
+        if minimo == maximo:
+            lineas.append(f"{formatear_numero(valor)}: {maximo}")
+        else:
+            lineas.append(f"{formatear_numero(valor)}: {minimo} a {maximo}")
+
+
+def agregar_seccion_metricas(lineas, stats):
+    """
+    Req 7: Agrega al reporte el desglose por fase de --metricas y el pico
+    de memoria de --tracemalloc.
+    """
+    metricas = stats.get("metricas")
+    if metricas is None:
+        return
+
+    lineas.append("")
+    lineas.append("=== Metricas de ejecucion ===")
+    for fase, segundos in metricas.get("fases", {}).items():
+        lineas.append(f"Fase {fase} (segundos): {segundos:.6f}")
+    if metricas.get("tokens_por_segundo") is not None:
+        lineas.append(
+            f"Tokens por segundo: {metricas['tokens_por_segundo']:.0f}"
+        )
+        lineas.append(
+            f"Errores por segundo: {metricas['errores_por_segundo']:.0f}"
+        )
+    if "tracemalloc" in metricas:
+        lineas.append(
+            "Memoria pico trazada (KB): "
+            f"{metricas['tracemalloc']['pico_kb']:.1f}"
+        )
+
+
+def agregar_resumen_errores(lineas, errores, stats):
+    """
+    Req 3: Si el reporte no muestra todos los errores (o se escribieron
+    en --archivo-errores), agrega cuantos faltan y el conteo por tipo.
+    """
+    if not isinstance(errores, ColectorErrores):
+        return
+    archivo_errores = stats.get("archivo_errores")
+    if errores.omitidos() == 0 and archivo_errores is None:
+        return
+
+    if errores.omitidos() > 0:
+        lineas.append(
+            f"... {errores.omitidos()} errores mas no se muestran "
+            f"(muestra de {len(errores.muestra)})"
+        )
+    if archivo_errores is not None:
+        lineas.append(f"Lista completa de errores en: {archivo_errores}")
+
+    lineas.append("")
+    lineas.append("=== Errores por tipo ===")
+    for tipo, conteo in sorted(
+        errores.por_tipo.items(), key=lambda par: (-par[1], par[0])
+    ):
+        lineas.append(f"{tipo}: {conteo}")
+
+
+def construir_reporte(
+    ruta_entrada,
+    total_validos,
+    total_valores,
+    errores,
+    stats,
+):
+    """
+    Req 2: Construye texto para imprimir estadisticas en pantalla y archivo.
+    Req 3: Incluye lista de errores detectados sin detener ejecucion.
+    Req 7: Incluye tiempo transcurrido en el reporte.
+    """
+    if "pares" in stats:
+        return construir_reporte_pares(
+            ruta_entrada, total_valores, errores, stats
+        )
+
+    media = stats["media"]
+    mediana = stats["mediana"]
+    modas = stats["modas"]
+    varianza = stats["varianza"]
+    desviacion_estandar = stats["desviacion_estandar"]
+
+    lineas = []
+    lineas.append("=== Statistics Results ===")
+    lineas.append(f"{PREFIJO_ARCHIVO_ENTRADA}{ruta_entrada}")
+    lineas.append(f"Valores leidos totales(validos + invalidos): {total_valores}")
+    lineas.append(f"Numeros validos: {total_validos}")
+    lineas.append(f"Valores invalidos: {len(errores)}")
+    lineas.append("")
+
+    lineas.append("=== Descriptive Statistics ===")
+    lineas.append(f"Mean (media): {formatear_numero(media)}")
+    if stats.get("cuantiles") is not None:
+        lineas.append(
+            f"Median (mediana): {formatear_numero(mediana)} (aproximada)"
+        )
+    else:
+        lineas.append(f"Median (mediana): {formatear_numero(mediana)}")
+
+    if modas is None:
+        lineas.append("Mode (moda): N/A (no calculada en este modo)")
+    elif len(modas) == 0:
+        lineas.append("Mode (moda): N/A (no hay moda)")
+    else:
+        modas_texto = ", ".join(formatear_numero(x) for x in modas)
+        if stats.get("moda_confirmada") is False:
+            modas_texto += " (aproximada)"
+        lineas.append(f"Mode (moda): {modas_texto}")
+
+    lineas.append(f"Variance (varianza): {formatear_numero(varianza)}")
+    lineas.append(
+        "Standard deviation (desviacion estandar): "
+        f"{formatear_numero(desviacion_estandar)}"
+    )
+    agregar_seccion_cuantiles(lineas, stats)
+    agregar_seccion_frecuentes(lineas, stats)
+    agregar_seccion_extendidas(lineas, stats)
+    agregar_seccion_bootstrap(lineas, stats)
+
+    return cerrar_reporte(lineas, errores, stats)
+
+
+def cerrar_reporte(lineas, errores, stats):
+    """
+    Req 3 y Req 7: Agrega tiempo, metricas y errores al final del reporte
+    y regresa el texto completo.
+    """
+    lineas.append("")
+    lineas.append(f"{PREFIJO_TIEMPO}{stats['tiempo_segundos']:.6f}")
+    agregar_seccion_metricas(lineas, stats)
+
+    if len(errores) > 0:
+        lineas.append("")
+        lineas.append("=== Errores detectados (se continuo la ejecucion) ===")
+        for mensaje in errores:
+            lineas.append(mensaje)
+        agregar_resumen_errores(lineas, errores, stats)
+
+    lineas.append("")
+    return "\n".join(lineas)
+
+
+def construir_reporte_pares(ruta_entrada, total_valores, errores, stats):
+    """
+    Req 2: Reporte del modo --pares: media, varianza y desviacion de cada
+    columna mas covarianza, correlacion y recta de minimos cuadrados.
+    """
+    pares = stats["pares"]
+    lineas = [
+        "=== Statistics Results (pares x, y) ===",
+        f"{PREFIJO_ARCHIVO_ENTRADA}{ruta_entrada}",
+        f"Pares leidos totales(validos + invalidos): {total_valores}",
+        f"Pares validos: {pares['conteo']}",
+        f"Pares invalidos: {total_valores - pares['conteo']}",
+    ]
+
+    for nombre in ("x", "y"):
+        lineas.append("")
+        lineas.append(f"=== Columna {nombre} ===")
+        lineas.append(
+            f"Mean (media): {formatear_numero(pares[f'media_{nombre}'])}"
+        )
+        lineas.append(
+            "Variance (varianza): "
+            f"{formatear_numero(pares[f'varianza_{nombre}'])}"
+        )
+        lineas.append(
+            "Standard deviation (desviacion estandar): "
+            f"{formatear_numero(pares[f'desviacion_{nombre}'])}"
+        )
+        lineas.append(
+            f"Min (minimo): {formatear_numero(pares[f'minimo_{nombre}'])}"
+        )
+        lineas.append(
+            f"Max (maximo): {formatear_numero(pares[f'maximo_{nombre}'])}"
+        )
+
+    lineas.append("")
+    lineas.append("=== Relacion entre x e y ===")
+    lineas.append(
+        f"Covariance (covarianza): {formatear_numero(pares['covarianza'])}"
+    )
+    lineas.append(
+        "Pearson correlation (correlacion): "
+        f"{formatear_numero(pares['correlacion'])}"
+    )
+    if pares["pendiente"] is None:
+        motivo = " (x es constante)" if pares["conteo"] > 0 else ""
+        lineas.append(f"Least squares (minimos cuadrados): N/A{motivo}")
+    else:
+        lineas.append(
+            "Least squares (minimos cuadrados): "
+            f"y = {formatear_numero(pares['intercepto'])} + "
+            f"{formatear_numero(pares['pendiente'])} * x"
+        )
+    lineas.append(
+        f"R^2 (coeficiente de determinacion): "
+        f"{formatear_numero(pares['r_cuadrada'])}"
+    )
+
+    return cerrar_reporte(lineas, errores, stats)
+
+
+def escribir_archivo_salida(nombre_archivo, contenido):
+    """
+    Req 2: Escribe resultados en un archivo llamado StatisticsResults.txt.
+    """
+    with open(nombre_archivo, "w", encoding="utf-8") as archivo:
+        archivo.write(contenido)
+
+
+def imprimir_uso():
+    """
+    Req 5: Muestra el formato minimo para invocar el programa.
+    """
+    print("Uso:")
+    print("  python computeStatistics.py fileWithData.txt")
+    print("  python computeStatistics.py fileWithData.txt --streaming")
+    print("  python computeStatistics.py fileWithData.txt --approx")
+    print("  python computeStatistics.py fileWithData.txt --workers 4")
+    print("  python computeStatistics.py datos.txt --moda-aproximada 1000")
+    print("  python computeStatistics.py shard1.txt --guardar-estado s1.json")
+    print("  python computeStatistics.py --combinar-estados s1.json s2.json")
+    print("  python computeStatistics.py datos.txt --incremental cache.json")
+
+
+def leer_entero_positivo(texto):
+    """
+    Req 5: Valida argumentos que deben ser enteros mayores que cero.
+    """
+    try:
+        valor = int(texto)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"'{texto}' no es un entero") from exc
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"'{texto}' debe ser mayor que 0")
+    return valor
+
+
+def leer_lista_probabilidades(texto):
+    """
+    Req 5: Valida una lista de probabilidades en [0, 1] separadas por coma
+    (ej. 0.1,0.5,0.9).
+    """
+    probabilidades = []
+    for parte in texto.split(","):
+        try:
+            valor = float(parte)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(
+                f"'{parte}' no es un numero"
+            ) from exc
+        if not 0.0 <= valor <= 1.0:
+            raise argparse.ArgumentTypeError(
+                f"'{parte}' debe estar entre 0 y 1"
+            )
+        probabilidades.append(valor)
+    return tuple(probabilidades)
+
+
+def leer_entero_no_negativo(texto):
+    """
+    Req 5: Valida argumentos que deben ser enteros mayores o iguales a 0.
+    """
+    try:
+        valor = int(texto)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"'{texto}' no es un entero") from exc
+    if valor < 0:
+        raise argparse.ArgumentTypeError(f"'{texto}' no puede ser negativo")
+    return valor
+
+
+def leer_fraccion_abierta(texto):
+    """
+    Req 5: Valida argumentos que deben ser una fraccion en (0, 1).
+    """
+    try:
+        valor = float(texto)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"'{texto}' no es un numero") from exc
+    if not 0.0 < valor < 1.0:
+        raise argparse.ArgumentTypeError(f"'{texto}' debe estar entre 0 y 1")
+    return valor
+
+
+def construir_parser_argumentos():
+    """
+    Req 5: Define los argumentos aceptados por la linea de comandos.
+    """
+    parser = argparse.ArgumentParser(
+        prog="computeStatistics.py",
+        description="Calcula estadisticas descriptivas de un archivo.",
+    )
+    parser.add_argument(
+        "archivo", nargs="?", help="archivo con los datos numericos"
+    )
+    parser.add_argument(
+        "--pares",
+        action="store_true",
+        help=(
+            "cada linea es un par x,y: media y varianza por columna, "
+            "covarianza, correlacion y minimos cuadrados en una pasada"
+        ),
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help=(
+            "una sola pasada con memoria O(1): conteo, media y varianza "
+            "(mediana y moda no se calculan)"
+        ),
+    )
+    parser.add_argument(
+        "--lector",
+        choices=(LECTOR_MMAP, LECTOR_TEXTO) + LECTORES_BINARIOS,
+        default=LECTOR_MMAP,
+        help=(
+            "mmap: analiza bytes crudos sin decodificar (por defecto); "
+            "texto: lectura decodificada por bloques; binario: float64 "
+            "little-endian crudo; npy: arreglo float64 de NumPy (.npy)"
+        ),
+    )
+    parser.add_argument(
+        "--descomprimir-en-hilo",
+        action="store_true",
+        help=(
+            "con una entrada gzip/bzip2/xz (se detecta sola) descomprime en "
+            "un hilo en segundo plano, en paralelo con el analisis"
+        ),
+    )
+    parser.add_argument(
+        "--backend",
+        choices=(BACKEND_AUTO, BACKEND_PYTHON, BACKEND_NUMPY),
+        default=BACKEND_AUTO,
+        help=(
+            "calculo exacto en memoria: numpy (vectorizado), python o auto "
+            "(numpy si esta instalado); ambos generan el mismo reporte"
+        ),
+    )
+    parser.add_argument(
+        "--approx",
+        action="store_true",
+        help=(
+            "memoria acotada: agrega mediana y cuantiles p90/p99/p99.9 "
+            "aproximados con un sketch KLL"
+        ),
+    )
+    parser.add_argument(
+        "--error-rango",
+        type=leer_fraccion_abierta,
+        default=DEFAULT_ERROR_RANGO,
+        help=(
+            "error de rango permitido en --approx como fraccion de n "
+            f"(por defecto {DEFAULT_ERROR_RANGO})"
+        ),
+    )
+    parser.add_argument(
+        "--moda-aproximada",
+        metavar="K",
+        type=leer_entero_positivo,
+        default=None,
+        help=(
+            "moda con memoria acotada: resumen Space-Saving de K contadores "
+            "con cotas de error en lugar de la tabla exacta de frecuencias"
+        ),
+    )
+    parser.add_argument(
+        "--confirmar-moda",
+        action="store_true",
+        help=(
+            "con --moda-aproximada, segunda pasada que cuenta de forma "
+            "exacta los candidatos a moda"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=leer_entero_positivo,
+        default=None,
+        help=(
+            "procesa rangos del archivo en N procesos y combina los "
+            "estados parciales"
+        ),
+    )
+    parser.add_argument(
+        "--extendidas",
+        action="store_true",
+        help=(
+            "agrega minimo, maximo, rango y cuantiles (--cuantiles) "
+            "calculados en la misma pasada"
+        ),
+    )
+    parser.add_argument(
+        "--cuantiles",
+        metavar="P1,P2,...",
+        type=leer_lista_probabilidades,
+        default=None,
+        help=(
+            "probabilidades de los cuantiles extendidos "
+            f"(por defecto {','.join(map(str, DEFAULT_CUANTILES))})"
+        ),
+    )
+    parser.add_argument(
+        "--histograma",
+        metavar="N",
+        type=leer_entero_positivo,
+        default=None,
+        help="histograma de N intervalos iguales entre minimo y maximo",
+    )
+    parser.add_argument(
+        "--histograma-log",
+        metavar="D",
+        type=leer_entero_positivo,
+        nargs="?",
+        const=1,
+        default=None,
+        help=(
+            "histograma logaritmico base 10 con D intervalos por decada "
+            "(por defecto 1); funciona en todos los modos"
+        ),
+    )
+    parser.add_argument(
+        "--bootstrap",
+        metavar="B",
+        type=leer_entero_positivo,
+        default=None,
+        help=(
+            "intervalos de confianza de media, mediana y desviacion "
+            "estandar con B remuestras repartidas en un pool de procesos"
+        ),
+    )
+    parser.add_argument(
+        "--confianza",
+        metavar="C",
+        type=leer_fraccion_abierta,
+        default=DEFAULT_CONFIANZA,
+        help=(
+            "nivel de confianza de --bootstrap "
+            f"(por defecto {DEFAULT_CONFIANZA})"
+        ),
+    )
+    parser.add_argument(
+        "--semilla-bootstrap",
+        metavar="S",
+        type=leer_entero_no_negativo,
+        default=SEMILLA_BOOTSTRAP,
+        help=(
+            "semilla de --bootstrap; la misma semilla da el mismo "
+            f"resultado (por defecto {SEMILLA_BOOTSTRAP})"
+        ),
+    )
+    parser.add_argument(
+        "--procesos-bootstrap",
+        metavar="N",
+        type=leer_entero_positivo,
+        default=None,
+        help="procesos de --bootstrap (por defecto uno por CPU)",
+    )
+    parser.add_argument(
+        "--ordenar-salida",
+        metavar="RUTA",
+        default=None,
+        help=(
+            "escribe en RUTA todos los valores validos ordenados, con "
+            "ordenamiento externo (sirve para archivos mas grandes que la RAM)"
+        ),
+    )
+    parser.add_argument(
+        "--formato-ordenado",
+        choices=(FORMATO_TEXTO, FORMATO_BINARIO),
+        default=FORMATO_TEXTO,
+        help=(
+            "formato de --ordenar-salida: texto (un valor por linea) o "
+            "binario (float64 en el orden de bytes de la maquina)"
+        ),
+    )
+    parser.add_argument(
+        "--memoria-ordenamiento",
+        metavar="MB",
+        type=leer_entero_positivo,
+        default=DEFAULT_MEMORIA_ORDENAMIENTO_MB,
+        help=(
+            "tope de memoria en MB para cada corrida de --ordenar-salida "
+            f"(por defecto {DEFAULT_MEMORIA_ORDENAMIENTO_MB})"
+        ),
+    )
+    parser.add_argument(
+        "--ventana",
+        metavar="N",
+        type=leer_entero_positivo,
+        default=None,
+        help=(
+            "ademas del reporte, escribe media, varianza y mediana por "
+            "ventana de N valores en --salida-ventanas (CSV)"
+        ),
+    )
+    parser.add_argument(
+        "--tipo-ventana",
+        choices=(VENTANA_DESLIZANTE, VENTANA_FIJA),
+        default=VENTANA_DESLIZANTE,
+        help=(
+            "deslizante: ultimos N valores; fija: bloques consecutivos de "
+            "N valores sin traslape"
+        ),
+    )
+    parser.add_argument(
+        "--paso-ventana",
+        metavar="K",
+        type=leer_entero_positivo,
+        default=1,
+        help="con ventana deslizante, un resultado cada K valores",
+    )
+    parser.add_argument(
+        "--salida-ventanas",
+        metavar="RUTA",
+        default=DEFAULT_SALIDA_VENTANAS,
+        help=f"CSV de --ventana (por defecto {DEFAULT_SALIDA_VENTANAS})",
+    )
+    parser.add_argument(
+        "--archivo-errores",
+        metavar="RUTA",
+        default=None,
+        help=(
+            "escribe cada mensaje de error en RUTA en cuanto ocurre (el "
+            "reporte solo incluye una muestra)"
+        ),
+    )
+    parser.add_argument(
+        "--muestra-errores",
+        metavar="N",
+        type=leer_entero_no_negativo,
+        default=LIMITE_MUESTRA_ERRORES,
+        help=(
+            "mensajes de error incluidos en el reporte "
+            f"(por defecto {LIMITE_MUESTRA_ERRORES})"
+        ),
+    )
+    parser.add_argument(
+        "--metricas",
+        action="store_true",
+        help=(
+            "agrega al reporte el tiempo por fase (lectura, tokenizacion, "
+            "conversion, ordenamiento, estadisticas) y tokens/errores por "
+            "segundo"
+        ),
+    )
+    parser.add_argument(
+        "--metricas-json",
+        metavar="RUTA",
+        default=None,
+        help="guarda las metricas por fase (incluido el reporte) en JSON",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="RUTA",
+        default=None,
+        help="ejecuta el calculo con cProfile y guarda el perfil (pstats)",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="mide el pico de memoria con tracemalloc (mas lento)",
+    )
+    parser.add_argument(
+        "--lote",
+        metavar="ENTRADA",
+        nargs="+",
+        default=None,
+        help=(
+            "procesa varios archivos (directorios o patrones glob) en un "
+            "pool de --workers procesos; un resultado por archivo y un "
+            "resumen"
+        ),
+    )
+    parser.add_argument(
+        "--directorio-lote",
+        metavar="DIR",
+        default=DEFAULT_DIRECTORIO_LOTE,
+        help=(
+            "directorio de los resultados de --lote "
+            f"(por defecto {DEFAULT_DIRECTORIO_LOTE})"
+        ),
+    )
+    parser.add_argument(
+        "--guardar-estado",
+        metavar="RUTA",
+        default=None,
+        help="guarda el estado combinable (JSON) de esta ejecucion",
+    )
+    parser.add_argument(
+        "--incremental",
+        metavar="CACHE",
+        default=None,
+        help=(
+            "archivo que solo crece: reutiliza el estado guardado en CACHE "
+            "y procesa solo lo agregado desde la corrida anterior"
+        ),
+    )
+    parser.add_argument(
+        "--combinar-estados",
+        metavar="ESTADO",
+        nargs="+",
+        default=None,
+        help="combina estados guardados en lugar de leer un archivo",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        default=None,
+        help=(
+            "guarda el reporte en DIR con llave sha256(contenido + opciones) "
+            "y lo reutiliza si el mismo archivo se analiza de nuevo"
+        ),
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        metavar="MB",
+        type=leer_entero_positivo,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=(
+            "tamano maximo del cache; se borran las entradas usadas hace mas "
+            f"tiempo (por defecto {DEFAULT_CACHE_MAX_MB})"
+        ),
+    )
+    parser.add_argument(
+        "--sin-cache",
+        action="store_true",
+        help="recalcula sin leer el cache (la entrada se actualiza)",
+    )
+    return parser
+
+
+def iniciar_proceso_bootstrap(valores):
+    """
+    Req 6: Inicializador de cada proceso de --bootstrap: recibe los
+    valores compactos una sola vez por proceso y no con cada tarea.
+    """
+    VALORES_BOOTSTRAP["valores"] = valores
+
+
+def estadisticas_remuestra(muestra):
+    """
+    Req 2: (media, mediana, desviacion estandar) de una remuestra
+    array('d'), con las mismas funciones del reporte.
+    """
+    media = calcular_media(muestra)
+    return (
+        media,
+        calcular_mediana(muestra),
+        calcular_raiz_cuadrada(calcular_varianza(muestra, media)),
+    )
+
+
+def estadisticas_remuestra_numpy(muestra):
+    """
+    Req 2: estadisticas_remuestra con NumPy. Las sumas usan
+    sumar_secuencial_numpy (como calcular_estadisticas_numpy) y la raiz es
+    la misma, asi los valores son identicos a los del backend de Python.
+    La mediana se selecciona con partition in-place sobre la remuestra
+    (es una copia).
+    """
+    num = muestra.size
+    mitad = num // 2
+    media = sumar_secuencial_numpy(muestra) / num
+    desviacion = calcular_raiz_cuadrada(
+        sumar_secuencial_numpy(muestra, media) / num
+    )
+    if num % 2 == 1:
+        muestra.partition(mitad)
+        mediana = float(muestra[mitad])
+    else:
+        muestra.partition((mitad - 1, mitad))
+        mediana = (float(muestra[mitad - 1]) + float(muestra[mitad])) / 2.0
+    return media, mediana, desviacion
+
+
+def generar_posiciones(aleatorio, num):
+    """
+    Req 6: Bytes con `num` enteros u de 32 bits (orden nativo) de una sola
+    llamada a getrandbits; la posicion de cada uno es (u * num) >> 32,
+    siempre menor que num (hasta 2**32 valores).
+    """
+    return aleatorio.getrandbits(32 * num).to_bytes(4 * num, sys.byteorder)
+
+
+def iterar_remuestras(valores, remuestras, semilla):
+    """
+    Req 6: Regresa las estadisticas de `remuestras` remuestras con
+    reemplazo del mismo tamano que `valores`. Las posiciones salen del
+    mismo random.Random en los dos backends, asi el reporte no depende
+    del backend: con un arreglo de NumPy se aplican con np.take y con un
+    array('d') cada remuestra se llena directo en otro array('d') con
+    iteradores en C, sin una lista intermedia de floats.
+    """
+    num = len(valores)
+    es_numpy = np is not None and isinstance(valores, np.ndarray)
+    aleatorio = random.Random(str(semilla))
+    for _ in range(remuestras):
+        crudos = generar_posiciones(aleatorio, num)
+        if es_numpy:
+            posiciones = (
+                np.frombuffer(crudos, dtype=np.uint32).astype(np.uint64) * num
+            ) >> 32
+            yield estadisticas_remuestra_numpy(np.take(valores, posiciones))
+            continue
+
+        posiciones = map(
+            operator.rshift,
+            map(
+                operator.mul,
+                memoryview(crudos).cast("I"),
+                itertools.repeat(num),
+            ),
+            itertools.repeat(32),
+        )
+        yield estadisticas_remuestra(
+            array("d", map(valores.__getitem__, posiciones))
+        )
+
+
+def remuestrear_tarea(tarea):
+    """
+    Req 6: Trabajo de cada proceso de --bootstrap. tarea = (indice,
+    remuestras, semilla); el generador se siembra con [semilla, indice],
+    asi cada tarea tiene su propio flujo reproducible. Regresa un
+    array('d') por estadistica con un valor por remuestra.
+    """
+    indice, remuestras, semilla = tarea
+    resultados = tuple(array("d") for _ in ESTADISTICAS_BOOTSTRAP)
+    for estimaciones in iterar_remuestras(
+        VALORES_BOOTSTRAP["valores"], remuestras, [semilla, indice]
+    ):
+        for resultado, valor in zip(resultados, estimaciones):
+            resultado.append(valor)
+    return resultados
+
+
+def resumir_remuestras(estimaciones, probabilidades):
+    """
+    Req 2: Error estandar (desviacion muestral de las estimaciones) e
+    intervalo por percentiles. Reacomoda `estimaciones`.
+    """
+    num = len(estimaciones)
+    error_estandar = None
+    if num > 1:
+        media = calcular_media(estimaciones)
+        error_estandar = calcular_raiz_cuadrada(
+            calcular_varianza(estimaciones, media) * num / (num - 1)
+        )
+    inferior, superior = calcular_cuantiles_en_memoria(
+        estimaciones, probabilidades
+    )
+    return {
+        "error_estandar": error_estandar,
+        "inferior": inferior,
+        "superior": superior,
+    }
+
+
+def calcular_bootstrap(
+    numeros,
+    remuestras,
+    confianza=DEFAULT_CONFIANZA,
+    semilla=SEMILLA_BOOTSTRAP,
+    procesos=None,
+):
+    """
+    Req 2 y Req 6: Intervalos de confianza por percentiles para la media,
+    la mediana y la desviacion estandar a partir de `remuestras`
+    remuestras con reemplazo de `numeros` (array('d') o arreglo de
+    NumPy, nunca una lista). Las remuestras se reparten en tareas de
+    REMUESTRAS_POR_TAREA en un pool de `procesos` (por defecto uno por
+    CPU; con 1 se calcula en este proceso) y el resultado es el mismo con
+    cualquier numero de procesos.
+    """
+    resultado = {
+        "remuestras": remuestras,
+        "confianza": confianza,
+        "semilla": semilla,
+        "intervalos": {nombre: None for nombre, _ in ESTADISTICAS_BOOTSTRAP},
+    }
+    if len(numeros) == 0:
+        return resultado
+
+    tareas = [
+        (indice, min(REMUESTRAS_POR_TAREA, remuestras - inicio), semilla)
+        for indice, inicio in enumerate(
+            range(0, remuestras, REMUESTRAS_POR_TAREA)
+        )
+    ]
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+    if procesos == 1:
+        iniciar_proceso_bootstrap(numeros)
+        try:
+            parciales = [remuestrear_tarea(tarea) for tarea in tareas]
+        finally:
+            VALORES_BOOTSTRAP.clear()
+    else:
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=iniciar_proceso_bootstrap,
+            initargs=(numeros,),
+        ) as pool:
+            parciales = list(pool.map(remuestrear_tarea, tareas))
+
+    probabilidades = ((1.0 - confianza) / 2.0, (1.0 + confianza) / 2.0)
+    for posicion, (nombre, _) in enumerate(ESTADISTICAS_BOOTSTRAP):
+        estimaciones = array("d")
+        for parcial in parciales:
+            estimaciones.extend(parcial[posicion])
+        resultado["intervalos"][nombre] = resumir_remuestras(
+            estimaciones, probabilidades
+        )
+    return resultado
+
+
+def calcular_estadisticas_exactas(  # pylint: disable=too-many-arguments
+    ruta_entrada,
+    lector=None,
+    backend=None,
+    medidor=None,
+    extendidas=None,
+    *,
+    errores=None,
+    en_hilo=False,
+    bootstrap=None,
+    workers=None,
+):
+    """
+    Req 2: Calcula todas las estadisticas guardando los valores en memoria.
+    Con backend BACKEND_NUMPY la carga y los calculos son vectorizados.
+    extendidas: opciones de construir_extendidas o None.
+    errores: ColectorErrores a usar (uno nuevo si es None).
+    en_hilo: descomprime una entrada comprimida en segundo plano.
+    bootstrap: opciones de construir_bootstrap o None; remuestrea los
+    mismos valores ya cargados, antes de las estadisticas extendidas
+    (su seleccion reacomoda el arreglo y las remuestras dependen del
+    orden).
+    workers: lee el archivo con leer_numeros_en_paralelo en ese numero
+    de procesos; los calculos son los mismos.
+    """
+    if workers is not None:
+        numeros, errores, total_valores = leer_numeros_en_paralelo(
+            ruta_entrada, workers, errores, medidor
+        )
+        if backend == BACKEND_NUMPY:
+            numeros = np.frombuffer(numeros, dtype=np.float64)
+    elif backend == BACKEND_NUMPY:
+        if lector in LECTORES_BINARIOS:
+            compacto, errores, total_valores = leer_numeros_desde_archivo(
+                ruta_entrada, lector, medidor, errores, en_hilo=en_hilo
+            )
+            numeros = np.frombuffer(compacto, dtype=np.float64)
+        else:
+            numeros, errores, total_valores = leer_numeros_numpy(
+                ruta_entrada, errores, lector, medidor, en_hilo=en_hilo
+            )
+    else:
+        numeros, errores, total_valores = leer_numeros_desde_archivo(
+            ruta_entrada, lector, medidor, errores, en_hilo=en_hilo
+        )
+
+    intervalos = None
+    if bootstrap is not None:
+        with medir_fase(medidor, FASE_BOOTSTRAP):
+            intervalos = calcular_bootstrap(numeros, **bootstrap)
+
+    if backend == BACKEND_NUMPY:
+        stats = calcular_estadisticas_numpy(numeros, medidor)
+        with medir_fase(medidor, FASE_ESTADISTICAS):
+            if extendidas is not None:
+                stats["extendidas"] = calcular_extendidas_numpy(
+                    numeros, extendidas
+                )
+    else:
+        stats = calcular_estadisticas_en_memoria(numeros, medidor, extendidas)
+
+    if intervalos is not None:
+        stats["bootstrap"] = intervalos
+    return stats, len(numeros), errores, total_valores
+
+
+def calcular_estadisticas_en_memoria(numeros, medidor=None, extendidas=None):
+    """
+    Req 2: Media, mediana, moda y varianza de valores ya cargados en un
+    array('d'). Con `extendidas` agrega minimo, maximo, cuantiles e
+    histogramas al final (esa seleccion reacomoda `numeros`).
+    """
+    stats = {}
+    with medir_fase(medidor, FASE_ORDENAMIENTO):
+        stats["mediana"] = calcular_mediana(numeros)
+
+    with medir_fase(medidor, FASE_ESTADISTICAS):
+        stats["media"] = calcular_media(numeros)
+        stats["modas"] = calcular_moda(numeros)
+        if stats["media"] is not None:
+            stats["varianza"] = calcular_varianza(numeros, stats["media"])
+        else:
+            stats["varianza"] = None
+
+        if extendidas is not None:
+            stats["extendidas"] = calcular_extendidas_en_memoria(
+                numeros, extendidas
+            )
+
+    return stats
+
+
+def iterar_numeros_desde_iterable(valores, errores, conteo):
+    """
+    Req 3 y Req 6: Valida cada elemento de un iterable (numeros, str o
+    bytes) con el mismo criterio que un token del archivo; los invalidos
+    se registran con su posicion (base 1) y se continua. Es un generador:
+    no guarda los valores.
+    """
+    for posicion, valor in enumerate(valores, start=1):
+        conteo["total_valores"] += 1
+        try:
+            yield convertir_a_float_seguro(valor)
+        except (TypeError, ValueError) as exc:
+            errores.append(
+                f"Error en posicion {posicion}: valor '{valor}' "
+                f"invalido ({exc})"
+            )
+
+
+def calcular_estadisticas(
+    fuente,
+    modo=MODO_EXACTO,
+    lector=None,
+    error_rango=DEFAULT_ERROR_RANGO,
+    capacidad_frecuentes=None,
+):
+    """
+    Req 2 y Req 6: API para usar el programa como libreria, sin imprimir
+    ni escribir StatisticsResults.txt.
+
+    fuente: ruta de archivo (str u os.PathLike, leida con `lector`) o
+    cualquier iterable/generador de numeros; el iterable se consume una
+    sola vez y nunca se convierte en lista.
+    modo: MODO_EXACTO guarda los valores en un array('d') compacto;
+    MODO_STREAMING (media y varianza) y MODO_APROXIMADO (mas mediana y
+    cuantiles del sketch KLL con `error_rango`) usan memoria acotada.
+    capacidad_frecuentes: en los modos acotados agrega la moda
+    aproximada con un resumen Space-Saving de ese tamano.
+
+    Regresa un diccionario con las llaves del reporte (media, mediana,
+    modas, varianza, desviacion_estandar y las opcionales de cada modo)
+    mas total_valores, total_validos, errores (los primeros
+    LIMITE_MUESTRA_ERRORES mensajes), total_errores y errores_por_tipo.
+    """
+    if modo not in MODOS_API:
+        raise ValueError(
+            f"modo '{modo}' invalido; opciones: {', '.join(MODOS_API)}"
+        )
+
+    es_ruta = isinstance(fuente, (str, os.PathLike))
+    errores = ColectorErrores()
+    conteo = {"total_valores": 0}
+
+    if modo == MODO_EXACTO:
+        if es_ruta:
+            stats, total_validos, errores, total_valores = (
+                calcular_estadisticas_exactas(
+                    os.fspath(fuente), lector, elegir_backend(BACKEND_AUTO)
+                )
+            )
+        else:
+            numeros = array(
+                "d", iterar_numeros_desde_iterable(fuente, errores, conteo)
+            )
+            stats = calcular_estadisticas_en_memoria(numeros)
+            total_validos = len(numeros)
+            total_valores = conteo["total_valores"]
+    else:
+        configuracion = {
+            "con_moda": False,
+            "error_rango": error_rango if modo == MODO_APROXIMADO else None,
+            "capacidad_frecuentes": capacidad_frecuentes,
+        }
+        if es_ruta:
+            estado = acumular_estado_desde_archivo(
+                os.fspath(fuente), configuracion, lector
+            )
+        else:
+            estado = EstadoEstadistico(**configuracion)
+            for valor in iterar_numeros_desde_iterable(
+                fuente, estado.errores, conteo
+            ):
+                estado.agregar(valor)
+            estado.total_valores = conteo["total_valores"]
+        stats = estado.calcular_stats()
+        total_validos = estado.acumulador.conteo
+        total_valores = estado.total_valores
+        errores = estado.errores
+
+    stats["desviacion_estandar"] = calcular_raiz_cuadrada(stats["varianza"])
+    stats["total_valores"] = total_valores
+    stats["total_validos"] = total_validos
+    stats["errores"] = list(errores)
+    stats["total_errores"] = len(errores)
+    stats["errores_por_tipo"] = dict(errores.por_tipo)
+    return stats
+
+
+def calcular_estadisticas_pares(fuente):
+    """
+    Req 2 y Req 6: API del modo --pares. fuente: ruta de archivo con un
+    par "x,y" por linea o iterable de pares (tuplas, listas o lineas
+    "x,y"), consumido una sola vez con memoria O(1).
+
+    Regresa el diccionario de AcumuladorBivariado.calcular_resultados
+    (media_x, varianza_y, covarianza, correlacion, pendiente, intercepto,
+    r_cuadrada, ...) mas total_valores, errores, total_errores y
+    errores_por_tipo como calcular_estadisticas.
+    """
+    errores = ColectorErrores()
+    conteo = {"total_valores": 0}
+    if isinstance(fuente, (str, os.PathLike)):
+        pares = iterar_pares_desde_archivo(os.fspath(fuente), errores, conteo)
+    else:
+        pares = iterar_pares_desde_iterable(fuente, errores, conteo)
+
+    acumulador = AcumuladorBivariado()
+    for valor_x, valor_y in pares:
+        acumulador.agregar(valor_x, valor_y)
+
+    resultados = acumulador.calcular_resultados()
+    resultados["total_valores"] = conteo["total_valores"]
+    resultados["errores"] = list(errores)
+    resultados["total_errores"] = len(errores)
+    resultados["errores_por_tipo"] = dict(errores.por_tipo)
+    return resultados
+
+
+def asignar_cuantiles_aproximados(stats, sketch, error_rango):
+    """
+    Req 2: Guarda en stats la mediana y los cuantiles del sketch KLL.
+    """
+    probabilidades = [p for _, p in CUANTILES_APROXIMADOS]
+    valores = sketch.cuantiles(probabilidades)
+
+    stats["mediana"] = valores[0]
+    stats["error_rango"] = error_rango
+    stats["cuantiles"] = [
+        (etiqueta, valor)
+        for (etiqueta, _), valor in zip(CUANTILES_APROXIMADOS, valores)
+    ]
+
+
+def construir_configuracion(argumentos):
+    """
+    Req 6: Componentes del EstadoEstadistico segun las opciones elegidas.
+    La tabla exacta de frecuencias solo se usa si ningun modo de memoria
+    acotada la sustituye.
+    """
+    return {
+        "con_moda": not (
+            argumentos.streaming
+            or argumentos.approx
+            or argumentos.moda_aproximada is not None
+        ),
+        "error_rango": argumentos.error_rango if argumentos.approx else None,
+        "capacidad_frecuentes": argumentos.moda_aproximada,
+        "divisiones_log": argumentos.histograma_log,
+    }
+
+
+def construir_extendidas(argumentos):
+    """
+    Req 2: Opciones de las estadisticas extendidas, o None si no se pidio
+    ninguna (el reporte queda igual que antes).
+    """
+    if not (
+        argumentos.extendidas
+        or argumentos.cuantiles is not None
+        or argumentos.histograma is not None
+        or argumentos.histograma_log is not None
+    ):
+        return None
+    return {
+        "cuantiles": argumentos.cuantiles or DEFAULT_CUANTILES,
+        "intervalos": argumentos.histograma,
+        "divisiones_log": argumentos.histograma_log,
+    }
+
+
+def construir_bootstrap(argumentos):
+    """
+    Req 2: Opciones de calcular_bootstrap, o None si no se pidio
+    --bootstrap.
+    """
+    if argumentos.bootstrap is None:
+        return None
+    return {
+        "remuestras": argumentos.bootstrap,
+        "confianza": argumentos.confianza,
+        "semilla": argumentos.semilla_bootstrap,
+        "procesos": argumentos.procesos_bootstrap,
+    }
+
+
+def asignar_modas_frecuentes(stats, frecuentes, conteos_confirmados):
+    """
+    Req 2: Guarda en stats la moda del resumen Space-Saving. Sin
+    confirmacion la moda es aproximada (candidatos con mayor conteo); con
+    conteos_confirmados (segunda pasada) la moda es exacta entre los
+    candidatos.
+    """
+    candidatos = frecuentes.candidatos()
+    stats["capacidad_frecuentes"] = frecuentes.capacidad
+    stats["error_frecuentes"] = frecuentes.conteo // frecuentes.capacidad
+    stats["frecuentes"] = candidatos
+    stats["moda_confirmada"] = conteos_confirmados is not None
+
+    if conteos_confirmados is not None:
+        stats["modas"] = calcular_moda_desde_conteos(conteos_confirmados)
+        stats["frecuentes"] = [
+            (valor, conteos_confirmados[valor], conteos_confirmados[valor])
+            for valor, _, _ in candidatos
+        ]
+    elif candidatos and candidatos[0][2] > 1:
+        maximo = candidatos[0][2]
+        stats["modas"] = ordenar_lista(
+            [valor for valor, _, superior in candidatos if superior == maximo]
+        )
+    else:
+        stats["modas"] = []
+
+
+def elegir_backend(backend):
+    """
+    Req 6: Resuelve --backend; "auto" usa NumPy solo si esta instalado.
+    """
+    if backend == BACKEND_AUTO:
+        return BACKEND_NUMPY if np is not None else BACKEND_PYTHON
+    return backend
+
+
+def obtener_estado(argumentos, medidor=None, errores=None):
+    """
+    Req 6: Construye el EstadoEstadistico segun el modo elegido, o None si
+    se usa el calculo exacto con todos los valores en memoria (tambien con
+    --workers, que en ese modo solo reparte la lectura).
+    Req 7: Cada lector mide sus propias fases con `medidor`; solo cargar
+    estados guardados, que no tiene fases propias, cuenta como lectura.
+    """
+    configuracion = construir_configuracion(argumentos)
+
+    if argumentos.combinar_estados:
+        with medir_fase(medidor, FASE_LECTURA):
+            return combinar_estados_guardados(argumentos.combinar_estados)
+    if argumentos.incremental is not None:
+        return acumular_incremental(
+            argumentos.archivo,
+            argumentos.incremental,
+            configuracion,
+            errores,
+            medidor,
+        )
+    if argumentos.workers is not None and (
+        not configuracion["con_moda"] or argumentos.guardar_estado is not None
+    ):
+        return acumular_en_paralelo(
+            argumentos.archivo,
+            argumentos.workers,
+            configuracion,
+            errores,
+            medidor,
+        )
+    if (
+        argumentos.streaming
+        or argumentos.approx
+        or argumentos.moda_aproximada is not None
+        or argumentos.guardar_estado is not None
+    ):
+        return acumular_estado_desde_archivo(
+            argumentos.archivo,
+            configuracion,
+            argumentos.lector,
+            medidor,
+            errores,
+            en_hilo=argumentos.descomprimir_en_hilo,
+        )
+    return None
+
+
+def escribir_salida_ventanas(argumentos):
+    """
+    Req 6: Atiende --ventana con una pasada adicional por el archivo; un
+    error de escritura se reporta sin detener la ejecucion.
+    """
+    errores = ColectorErrores(0)
+    conteo = {"total_valores": 0}
+    resultados = iterar_estadisticas_ventana(
+        iterar_numeros_desde_archivo(
+            argumentos.archivo,
+            errores,
+            conteo,
+            argumentos.lector,
+            en_hilo=argumentos.descomprimir_en_hilo,
+        ),
+        argumentos.ventana,
+        argumentos.tipo_ventana,
+        argumentos.paso_ventana,
+    )
+    try:
+        escribir_ventanas(resultados, argumentos.salida_ventanas)
+    except OSError as exc:
+        print(
+            "Error al escribir las ventanas "
+            f"'{argumentos.salida_ventanas}': {exc}"
+        )
+
+
+def escribir_salida_ordenada(argumentos):
+    """
+    Req 6: Atiende --ordenar-salida; un error de escritura se reporta sin
+    detener la ejecucion.
+    """
+    opciones = {
+        "memoria_bytes": argumentos.memoria_ordenamiento * 1024 * 1024,
+        "formato": argumentos.formato_ordenado,
+        "lector": argumentos.lector,
+        "en_hilo": argumentos.descomprimir_en_hilo,
+    }
+    try:
+        ordenar_archivo_externo(
+            argumentos.archivo, argumentos.ordenar_salida, opciones
+        )
+    except OSError as exc:
+        print(
+            "Error al escribir los valores ordenados "
+            f"'{argumentos.ordenar_salida}': {exc}"
+        )
+
+
+def abrir_archivo_errores(ruta):
+    """
+    Req 3: Abre --archivo-errores, o un contexto vacio (None) si no se
+    pidio o no se pudo crear; en ese caso avisa y continua.
+    """
+    if ruta is None:
+        return contextlib.nullcontext()
+    try:
+        return open(ruta, "w", encoding="utf-8")
+    except OSError as exc:
+        print(f"Error al crear el archivo de errores '{ruta}': {exc}")
+        return contextlib.nullcontext()
+
+
+def ejecutar_calculo(argumentos, medidor=None):
+    """
+    Req 2: Ejecuta el modo elegido y regresa
+    (ruta_entrada, stats, total_validos, errores, total_valores).
+    Req 3: Los errores se juntan en un ColectorErrores que escribe cada
+    mensaje en --archivo-errores mientras se calcula.
+    """
+    with abrir_archivo_errores(argumentos.archivo_errores) as destino:
+        errores = ColectorErrores(argumentos.muestra_errores, destino)
+        return calcular_modo(argumentos, medidor, errores)
+
+
+def calcular_modo(argumentos, medidor, errores):
+    """
+    Req 2: Cuerpo de ejecutar_calculo con el colector de errores ya
+    creado.
+    """
+    if argumentos.pares:
+        return calcular_modo_pares(argumentos, medidor, errores)
+
+    estado = obtener_estado(argumentos, medidor, errores)
+
+    if estado is None:
+        ruta_entrada = argumentos.archivo
+        stats, total_validos, errores, total_valores = (
+            calcular_estadisticas_exactas(
+                ruta_entrada,
+                argumentos.lector,
+                elegir_backend(argumentos.backend),
+                medidor,
+                construir_extendidas(argumentos),
+                errores=errores,
+                en_hilo=argumentos.descomprimir_en_hilo,
+                bootstrap=construir_bootstrap(argumentos),
+                workers=argumentos.workers,
+            )
+        )
+    else:
+        ruta_entrada = ", ".join(estado.fuentes)
+        with medir_fase(medidor, FASE_ESTADISTICAS):
+            stats = estado.calcular_stats()
+            if argumentos.confirmar_moda and estado.frecuentes is not None:
+                candidatos = [valor for valor, _, _ in stats["frecuentes"]]
+                asignar_modas_frecuentes(
+                    stats,
+                    estado.frecuentes,
+                    contar_candidatos_en_archivo(
+                        argumentos.archivo,
+                        candidatos,
+                        argumentos.lector,
+                        argumentos.descomprimir_en_hilo,
+                    ),
+                )
+            extendidas = construir_extendidas(argumentos)
+            if extendidas is not None:
+                stats["extendidas"] = calcular_extendidas_desde_estado(
+                    estado, extendidas
+                )
+        total_validos = estado.acumulador.conteo
+        errores = estado.errores
+        total_valores = estado.total_valores
+
+        if argumentos.guardar_estado is not None:
+            try:
+                guardar_estado(argumentos.guardar_estado, estado)
+            except OSError as exc:
+                print(
+                    "Error al guardar el estado "
+                    f"'{argumentos.guardar_estado}': {exc}"
+                )
+
+    stats["desviacion_estandar"] = calcular_raiz_cuadrada(stats["varianza"])
+    if errores.destino is not None:
+        stats["archivo_errores"] = argumentos.archivo_errores
+
+    if argumentos.ordenar_salida is not None:
+        with medir_fase(medidor, FASE_ORDENAMIENTO):
+            escribir_salida_ordenada(argumentos)
+    if argumentos.ventana is not None:
+        with medir_fase(medidor, FASE_ESTADISTICAS):
+            escribir_salida_ventanas(argumentos)
+
+    return ruta_entrada, stats, total_validos, errores, total_valores
+
+
+def calcular_modo_pares(argumentos, medidor, errores):
+    """
+    Req 2 y Req 6: Modo --pares; una sola pasada por el archivo con
+    memoria O(1). total_validos es el numero de pares validos.
+    """
+    acumulador = AcumuladorBivariado()
+    conteo = {"total_valores": 0}
+    for pares in iterar_bloques_pares(
+        argumentos.archivo,
+        errores,
+        conteo,
+        argumentos.descomprimir_en_hilo,
+        medidor,
+    ):
+        with medir_fase(medidor, FASE_ESTADISTICAS):
+            for valor_x, valor_y in pares:
+                acumulador.agregar(valor_x, valor_y)
+
+    with medir_fase(medidor, FASE_ESTADISTICAS):
+        stats = {"pares": acumulador.calcular_resultados()}
+    if errores.destino is not None:
+        stats["archivo_errores"] = argumentos.archivo_errores
+    return (
+        argumentos.archivo,
+        stats,
+        acumulador.x.conteo,
+        errores,
+        conteo["total_valores"],
+    )
+
+
+def expandir_entradas_lote(entradas):
+    """
+    Req 1: Convierte las entradas de --lote (directorios o patrones glob)
+    en la lista de archivos a procesar, sin repetidos y en orden. Regresa
+    (rutas, avisos) con un aviso por entrada que no encontro archivos.
+    """
+    rutas = []
+    vistas = set()
+    avisos = []
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = sorted(
+                elemento.path
+                for elemento in os.scandir(entrada)
+                if elemento.is_file()
+            )
+        else:
+            candidatos = sorted(
+                ruta
+                for ruta in glob.glob(entrada, recursive=True)
+                if os.path.isfile(ruta)
+            )
+
+        if not candidatos:
+            avisos.append(f"Ningun archivo coincide con: {entrada}")
+        for ruta in candidatos:
+            clave = os.path.abspath(ruta)
+            if clave not in vistas:
+                vistas.add(clave)
+                rutas.append(ruta)
+
+    return rutas, avisos
+
+
+def asignar_nombres_resultados(rutas, directorio):
+    """
+    Req 2: Nombre del resultado de cada archivo del lote
+    (StatisticsResults_<archivo>.txt); si dos archivos de distintos
+    directorios se llaman igual, agrega un sufijo numerico.
+    """
+    usados = set()
+    nombres = []
+    for ruta in rutas:
+        base = os.path.splitext(os.path.basename(ruta))[0]
+        nombre = f"StatisticsResults_{base}.txt"
+        sufijo = 1
+        while nombre in usados:
+            sufijo += 1
+            nombre = f"StatisticsResults_{base}_{sufijo}.txt"
+        usados.add(nombre)
+        nombres.append(os.path.join(directorio, nombre))
+    return nombres
+
+
+def calcular_reporte_lote(argumentos, tiempo_inicio):
+    """
+    Req 2: Calcula un archivo del lote y regresa (reporte, resumen para el
+    resumen del lote, segundos transcurridos).
+    """
+    ruta_entrada, stats, total_validos, errores, total_valores = (
+        ejecutar_calculo(argumentos)
+    )
+    stats["tiempo_segundos"] = time.perf_counter() - tiempo_inicio
+    reporte = construir_reporte(
+        ruta_entrada=ruta_entrada,
+        total_validos=total_validos,
+        total_valores=total_valores,
+        errores=errores,
+        stats=stats,
+    )
+    resumen = resumir_para_cache(stats, total_validos, total_valores, errores)
+    return reporte, resumen, stats["tiempo_segundos"]
+
+
+def procesar_archivo_lote(tarea):
+    """
+    Req 2 y Req 7: Trabajo de un proceso del pool en modo --lote: calcula
+    las estadisticas de un archivo, escribe su reporte y regresa una fila
+    del resumen. tarea = (argumentos del archivo, ruta del resultado).
+    """
+    argumentos, ruta_resultado = tarea
+    tiempo_inicio = time.perf_counter()
+
+    llave_cache, entrada_cache = consultar_cache(argumentos)
+    if entrada_cache is not None:
+        tiempo_segundos = time.perf_counter() - tiempo_inicio
+        reporte = actualizar_reporte_cache(
+            entrada_cache["reporte"], argumentos.archivo, tiempo_segundos
+        )
+        resumen = entrada_cache["resumen"]
+    else:
+        reporte, resumen, tiempo_segundos = calcular_reporte_lote(
+            argumentos, tiempo_inicio
+        )
+        if llave_cache is not None:
+            guardar_reporte_cache(argumentos, llave_cache, reporte, resumen)
+
+    fila = dict(
+        resumen,
+        archivo=argumentos.archivo,
+        resultado=ruta_resultado,
+        tiempo_segundos=tiempo_segundos,
+        error_escritura=None,
+    )
+    try:
+        escribir_archivo_salida(ruta_resultado, reporte)
+    except OSError as exc:
+        fila["error_escritura"] = (
+            f"Error al escribir el archivo de salida '{ruta_resultado}': {exc}"
+        )
+    return fila
 
-    if actual:
-        valores.append(actual)
 
-    return valores
+def construir_resumen_lote(filas, avisos, tiempo_segundos):
+    """
+    Req 2: Resumen del lote: una linea por archivo y totales. La media
+    combinada pondera la media de cada archivo por sus valores validos.
+    """
+    lineas = ["=== Resumen del lote ===", f"Archivos procesados: {len(filas)}"]
+    lineas.extend(avisos)
+    lineas.append("")
+    lineas.append(
+        "Archivo | Validos | Invalidos | Media | Mediana | Desv. est."
+    )
 
+    suma_ponderada = 0.0
+    total_validos = 0
+    total_valores = 0
+    for fila in filas:
+        lineas.append(
+            f"{fila['archivo']} | {fila['validos']} | {fila['errores']} | "
+            f"{formatear_numero(fila['media'])} | "
+            f"{formatear_numero(fila['mediana'])} | "
+            f"{formatear_numero(fila['desviacion_estandar'])}"
+        )
+        if fila["error_escritura"] is not None:
+            lineas.append(fila["error_escritura"])
+        if fila["media"] is not None:
+            suma_ponderada += fila["media"] * fila["validos"]
+        total_validos += fila["validos"]
+        total_valores += fila["valores"]
 
-def convertir_a_float_seguro(valor_str):
-    """Convierte a float y rechaza NaN e Inf."""
-    valor = float(valor_str)
+    media_combinada = None
+    if total_validos > 0:
+        media_combinada = suma_ponderada / total_validos
 
-    # NaN check (NaN != NaN siempre es True)
-    #Como me diste lata con el pylint
-    if math.isnan(valor):
-        raise ValueError("NaN no permitido")
+    lineas.append("")
+    lineas.append(f"Valores totales: {total_valores}")
+    lineas.append(f"Valores validos: {total_validos}")
+    lineas.append(f"Media combinada: {formatear_numero(media_combinada)}")
+    lineas.append(f"Tiempo transcurrido (segundos): {tiempo_segundos:.6f}")
+    return "\n".join(lineas) + "\n"
 
-    if math.isinf(valor):
-        raise ValueError("Inf no permitido")
 
-    return valor
+def preparar_tareas_lote(argumentos, rutas, directorio):
+    """
+    Req 1: Una tarea por archivo: copia de los argumentos con el archivo
+    asignado (sin --workers ni --lote, cada archivo va en un solo proceso)
+    y la ruta de su resultado.
+    """
+    tareas = []
+    for ruta, ruta_resultado in zip(
+        rutas, asignar_nombres_resultados(rutas, directorio)
+    ):
+        por_archivo = argparse.Namespace(**vars(argumentos))
+        por_archivo.archivo = ruta
+        por_archivo.workers = None
+        por_archivo.lote = None
+        # El pool del lote ya ocupa los CPUs: --bootstrap no abre otro.
+        por_archivo.procesos_bootstrap = 1
+        tareas.append((por_archivo, ruta_resultado))
+    return tareas
 
 
-def leer_numeros_desde_archivo(ruta_archivo):
+def ejecutar_lote(argumentos, tiempo_inicio):
     """
-    Req 1: Lee el archivo recibido como parametro.
-    Req 3: Detecta tokens invalidos, reporta errores y continua.
-    Req 6: Lee muchos elementos de forma secuencial (streaming por lineas).
+    Req 1 y Req 6: Modo --lote. Reparte los archivos en un solo pool de
+    procesos (--workers, por defecto uno por CPU) que se reutiliza para
+    todo el lote, asi el arranque del interprete se paga una vez por
+    proceso y no por archivo. Escribe un resultado por archivo en
+    --directorio-lote y el resumen en NOMBRE_RESUMEN_LOTE.
     """
-    numeros = []
-    errores = []
-    total_valores = 0
-
+    rutas, avisos = expandir_entradas_lote(argumentos.lote)
+    directorio = argumentos.directorio_lote
     try:
-        with open(ruta_archivo, "r", encoding="utf-8") as archivo:
-            for numero_linea, linea in enumerate(archivo, start=1):
-                linea_limpia = linea.strip()
-                if not linea_limpia:
-                    continue
-
-                tokens = separar_tokens(linea_limpia)
-
-                for valor_str in tokens:
-                    total_valores += 1
-                    try:
-                        numeros.append(convertir_a_float_seguro(valor_str))
-                    except ValueError as exc:
-                        errores.append(
-                            f"Error en linea {numero_linea}: valor "
-                            f"'{valor_str}' invalido ({exc})"
-                        )
-
-    except FileNotFoundError:
-        errores.append(f"No se encontro el archivo: {ruta_archivo}")
-    except PermissionError:
-        errores.append(f"Sin permisos para leer el archivo: {ruta_archivo}")
+        os.makedirs(directorio, exist_ok=True)
     except OSError as exc:
-        errores.append(f"Error al leer el archivo '{ruta_archivo}': {exc}")
+        print(f"Error al crear el directorio '{directorio}': {exc}")
+        return
 
-    return numeros, errores, total_valores
+    tareas = preparar_tareas_lote(argumentos, rutas, directorio)
+    workers = argumentos.workers or os.cpu_count() or 1
+    # Lotes de varias tareas por envio: menos comunicacion entre procesos
+    # cuando hay miles de archivos pequenos.
+    tamano_envio = max(1, len(tareas) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        filas = list(
+            pool.map(procesar_archivo_lote, tareas, chunksize=tamano_envio)
+        )
 
+    resumen = construir_resumen_lote(
+        filas, avisos, time.perf_counter() - tiempo_inicio
+    )
+    print(resumen)
+    ruta_resumen = os.path.join(directorio, NOMBRE_RESUMEN_LOTE)
+    try:
+        escribir_archivo_salida(ruta_resumen, resumen)
+    except OSError as exc:
+        print(f"Error al escribir el resumen '{ruta_resumen}': {exc}")
 
-def ordenar_lista(numeros):
+
+def ejecutar_con_perfilador(argumentos, medidor):
     """
-    Req 2: Ordenamiento necesario para mediana (algoritmo basico).
-    Req 6: Merge sort O(n log n) adecuado para cientos/miles de elementos.
+    Req 7: Ejecuta el calculo; con --cprofile lo envuelve en cProfile y
+    guarda las estadisticas (pstats) en la ruta indicada.
     """
-    n = len(numeros)
-    if n <= 1:
-        return numeros[:]
-
-    mitad = n // 2
-    izquierda = ordenar_lista(numeros[:mitad])
-    derecha = ordenar_lista(numeros[mitad:])
+    if argumentos.cprofile is None:
+        return ejecutar_calculo(argumentos, medidor)
 
-    return fusionar_listas(izquierda, derecha)
+    perfilador = cProfile.Profile()
+    resultado = perfilador.runcall(ejecutar_calculo, argumentos, medidor)
+    try:
+        perfilador.dump_stats(argumentos.cprofile)
+    except OSError as exc:
+        print(f"Error al guardar el perfil '{argumentos.cprofile}': {exc}")
+    return resultado
 
 
-def fusionar_listas(izquierda, derecha):
+def resumir_tracemalloc():
     """
-    Req 2: Parte del algoritmo basico merge sort (sin librerias).
-    Req 6: Fusion lineal O(n) para mantener eficiencia.
+    Req 7: Pico de memoria trazada y los sitios que mas memoria ocupan.
     """
-    resultado = []
-    i = 0
-    j = 0
+    actual, pico = tracemalloc.get_traced_memory()
+    instantanea = tracemalloc.take_snapshot()
+    sitios = []
+    for estadistica in instantanea.statistics("lineno")[:TOP_TRACEMALLOC]:
+        marco = estadistica.traceback[0]
+        sitios.append(
+            {
+                "sitio": f"{marco.filename}:{marco.lineno}",
+                "kb": estadistica.size / 1024,
+                "bloques": estadistica.count,
+            }
+        )
+    tracemalloc.stop()
+    return {
+        "actual_kb": actual / 1024,
+        "pico_kb": pico / 1024,
+        "sitios": sitios,
+    }
 
-    while i < len(izquierda) and j < len(derecha):
-        if izquierda[i] <= derecha[j]:
-            resultado.append(izquierda[i])
-            i += 1
-        else:
-            resultado.append(derecha[j])
-            j += 1
 
-    while i < len(izquierda):
-        resultado.append(izquierda[i])
-        i += 1
+def escribir_metricas_json(ruta, metricas):
+    """
+    Req 7: Guarda las metricas por fase en un archivo JSON aparte.
+    """
+    try:
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(metricas, archivo, indent=2)
+    except OSError as exc:
+        print(f"Error al escribir las metricas '{ruta}': {exc}")
 
-    while j < len(derecha):
-        resultado.append(derecha[j])
-        j += 1
 
-    return resultado
+def usar_cache(argumentos):
+    """
+    Req 7: El cache aplica con --cache y un archivo, salvo con opciones que
+    escriben otros archivos o miden la corrida (OPCIONES_SIN_CACHE).
+    """
+    if argumentos.cache is None or argumentos.archivo is None:
+        return False
+    return not any(
+        getattr(argumentos, nombre) for nombre in OPCIONES_SIN_CACHE
+    )
 
 
-def calcular_media(numeros):
+def calcular_llave_cache(argumentos):
     """
-    Req 2: Calcula la media con algoritmo basico (suma / n), sin librerias.
-    Req 6: O(n) para soportar muchos elementos.
+    Req 7: sha256 del contenido del archivo (leido por bloques) y de las
+    opciones de OPCIONES_LLAVE_CACHE. La ruta no forma parte de la llave:
+    el mismo contenido en otra ruta reutiliza la entrada. Regresa None si
+    el archivo no se puede leer o no es regular (el error se reporta al
+    calcular).
     """
-    num = len(numeros)
-    if num == 0:
+    contenido = hashlib.sha256()
+    try:
+        with open(argumentos.archivo, "rb") as archivo:
+            if not stat.S_ISREG(os.fstat(archivo.fileno()).st_mode):
+                return None
+            while True:
+                bloque = archivo.read(TAMANO_BLOQUE_LECTURA)
+                if not bloque:
+                    break
+                contenido.update(bloque)
+    except OSError:
         return None
 
-    suma = 0.0
-    for valor in numeros:
-        suma += valor
-    return suma / num
+    llave = {
+        "version": VERSION_CACHE,
+        "contenido": contenido.hexdigest(),
+        "opciones": {
+            nombre: getattr(argumentos, nombre)
+            for nombre in OPCIONES_LLAVE_CACHE
+        },
+    }
+    return hashlib.sha256(
+        json.dumps(llave, sort_keys=True).encode("utf-8")
+    ).hexdigest()
 
 
-def calcular_mediana(numeros_ordenados):
+def leer_cache(directorio, llave):
     """
-    Req 2: Calcula la mediana usando el listado ordenado (algoritmo basico).
-    Req 6: Acceso O(1) al/los elementos centrales tras ordenar.
+    Req 7: Entrada guardada para la llave o None. Un acierto actualiza el
+    mtime del archivo, que es el orden de uso para el desalojo LRU.
     """
-    num = len(numeros_ordenados)
-    if num == 0:
+    ruta = os.path.join(directorio, llave + EXTENSION_CACHE)
+    try:
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            entrada = json.load(archivo)
+        if entrada["version"] != VERSION_CACHE:
+            return None
+        os.utime(ruta)
+    except (OSError, ValueError, KeyError, TypeError):
         return None
+    return entrada
 
-    mitad = num // 2
-    if num % 2 == 1:
-        return numeros_ordenados[mitad]
-
-    return (numeros_ordenados[mitad - 1] + numeros_ordenados[mitad]) / 2.0
 
-
-def calcular_moda(numeros):
+def guardar_cache(directorio, llave, entrada, limite_mb):
     """
-    Req 2: Calcula moda con conteo manual (diccionario) sin librerias.
-    Req 6: Conteo O(n) para cientos/miles de elementos.
-    Req 3: No falla si la lista esta vacia; devuelve lista vacia.
+    Req 7: Escribe la entrada de forma atomica (archivo temporal y
+    os.replace, para corridas concurrentes sobre el mismo directorio) y
+    poda el cache. Un error solo se avisa; el resultado ya se calculo.
     """
-    num = len(numeros)
-    if num == 0:
-        return []
-
-    conteos = {}
-    for valor in numeros:
-        if valor in conteos:
-            conteos[valor] += 1
-        else:
-            conteos[valor] = 1
-
-    max_frecuencia = 0
-    for _, frecuencia in conteos.items():
-        if frecuencia > max_frecuencia:
-            max_frecuencia = frecuencia
+    entrada = dict(entrada, version=VERSION_CACHE)
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(
+            dir=directorio, prefix=".escribiendo_", suffix=".tmp"
+        )
+        with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+            json.dump(entrada, archivo)
+        os.replace(temporal, os.path.join(directorio, llave + EXTENSION_CACHE))
+        podar_cache(directorio, limite_mb * 1024 * 1024)
+    except OSError as exc:
+        print(f"Error al escribir el cache '{directorio}': {exc}")
 
-    if max_frecuencia <= 1:
-        return []
 
-    modas = []
-    for valor, frecuencia in conteos.items():
-        if frecuencia == max_frecuencia:
-            modas.append(valor)
+def podar_cache(directorio, limite_bytes):
+    """
+    Req 7: Desalojo LRU: borra las entradas con mtime mas antiguo hasta
+    que el total de EXTENSION_CACHE quepa en limite_bytes.
+    """
+    entradas = []
+    for elemento in os.scandir(directorio):
+        if not elemento.name.endswith(EXTENSION_CACHE):
+            continue
+        try:
+            informacion = elemento.stat()
+        except FileNotFoundError:
+            continue
+        entradas.append(
+            (informacion.st_mtime, informacion.st_size, elemento.path)
+        )
 
-    # Req 2: Salida consistente; se ordena con el mismo algoritmo basico.
-    return ordenar_lista(modas)
+    total = sum(tamano for _, tamano, _ in entradas)
+    for _, tamano, ruta in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total -= tamano
 
 
-def calcular_varianza(numeros, media):
+def resumir_para_cache(stats, total_validos, total_valores, errores):
     """
-    Req 2: Calcula varianza con algoritmo basico:
-        sum((xi - media)^2) / n
-    (Varianza poblacional; el requisito no especifica muestral.)
-    Req 6: O(n) para soportar muchos elementos.
+    Req 7: Datos de la corrida que el modo --lote necesita para su resumen
+    cuando el reporte sale del cache.
     """
-    n = len(numeros)
-    if n == 0:
-        return None
-
-    suma_cuadrados = 0.0
-    for valor in numeros:
-        diferencia = valor - media
-        suma_cuadrados += diferencia * diferencia
-
-    return suma_cuadrados / n
+    return {
+        "validos": total_validos,
+        "valores": total_valores,
+        "errores": len(errores),
+        "media": stats.get("media"),
+        "mediana": stats.get("mediana"),
+        "desviacion_estandar": stats.get("desviacion_estandar"),
+    }
 
 
-def calcular_raiz_cuadrada(valor):
+def preparar_reporte_cache(reporte, ruta_entrada):
     """
-    Req 2: Calcula raiz cuadrada sin usar math.sqrt (algoritmo basico),
-    mediante Newton-Raphson, para obtener desviacion estandar.
-    Req 6: Iteraciones fijas (constante) eficiente para muchos datos.
+    Req 7: Reporte para guardar en el cache (la llave no incluye la ruta):
+    en los errores de PREFIJOS_ERROR_CON_RUTA la ruta se cambia por
+    MARCA_RUTA_CACHE. Regresa None si la ruta sigue en alguno de esos
+    mensajes (dentro del texto de la excepcion); ese reporte no se guarda.
     """
-    if valor is None:
-        return None
-    if valor < 0:
-        return None
-    if valor == 0:
-        return 0.0
-
-    estimacion = valor if valor >= 1.0 else 1.0
+    lineas = reporte.split("\n")
+    for indice, linea in enumerate(lineas):
+        for prefijo in PREFIJOS_ERROR_CON_RUTA:
+            if linea.startswith(prefijo + ruta_entrada):
+                resto = linea[len(prefijo) + len(ruta_entrada):]
+                if ruta_entrada in resto:
+                    return None
+                lineas[indice] = prefijo + MARCA_RUTA_CACHE + resto
+                break
+    return "\n".join(lineas)
 
-    # Req 2: Metodo iterativo basico; sin funciones de libreria.
-    for _ in range(30):
-        estimacion = 0.5 * (estimacion + (valor / estimacion))
 
-    return estimacion
+def guardar_reporte_cache(argumentos, llave, reporte, resumen):
+    """
+    Req 7: Guarda el reporte de la corrida (sin su ruta, ver
+    preparar_reporte_cache) y el resumen del lote bajo la llave.
+    """
+    reporte_cache = preparar_reporte_cache(reporte, argumentos.archivo)
+    if reporte_cache is not None:
+        guardar_cache(
+            argumentos.cache,
+            llave,
+            {"reporte": reporte_cache, "resumen": resumen},
+            argumentos.cache_max_mb,
+        )
 
 
-def formatear_numero(valor):
+def actualizar_reporte_cache(reporte, ruta_entrada, tiempo_segundos):
     """
-    Req 2: Presenta resultados en un formato legible en pantalla/archivo.
-    Req 3: Si un calculo no aplica (None), muestra N/A en lugar de fallar.
+    Req 7: Reporte guardado con la ruta y el tiempo de esta corrida; la
+    ruta tambien reemplaza MARCA_RUTA_CACHE en los errores.
     """
-    if valor is None:
-        return "N/A"
-    if valor == int(valor):
-        return str(int(valor))
-    return f"{valor:.6f}"
+    lineas = reporte.split("\n")
+    for indice, linea in enumerate(lineas):
+        if linea.startswith(PREFIJO_ARCHIVO_ENTRADA):
+            lineas[indice] = f"{PREFIJO_ARCHIVO_ENTRADA}{ruta_entrada}"
+        elif linea.startswith(PREFIJO_TIEMPO):
+            lineas[indice] = f"{PREFIJO_TIEMPO}{tiempo_segundos:.6f}"
+        elif MARCA_RUTA_CACHE in linea:
+            lineas[indice] = linea.replace(MARCA_RUTA_CACHE, ruta_entrada)
+    return "\n".join(lineas)
 
 
-def construir_reporte(
-    ruta_entrada,
-    numeros_validos,
-    total_valores,
-    errores,
-    stats,
-):
+def consultar_cache(argumentos):
     """
-    Req 2: Construye texto para imprimir estadisticas en pantalla y archivo.
-    Req 3: Incluye lista de errores detectados sin detener ejecucion.
-    Req 7: Incluye tiempo transcurrido en el reporte.
+    Req 7: Regresa (llave, entrada): llave None si el cache no aplica y
+    entrada None si no hay acierto o se pidio --sin-cache.
     """
-    media = stats["media"]
-    mediana = stats["mediana"]
-    modas = stats["modas"]
-    varianza = stats["varianza"]
-    desviacion_estandar = stats["desviacion_estandar"]
-    tiempo_segundos = stats["tiempo_segundos"]
+    if not usar_cache(argumentos):
+        return None, None
+    llave = calcular_llave_cache(argumentos)
+    if llave is None or argumentos.sin_cache:
+        return llave, None
+    return llave, leer_cache(argumentos.cache, llave)
 
-    lineas = []
-    lineas.append("=== Statistics Results ===")
-    lineas.append(f"Archivo de entrada: {ruta_entrada}")
-    lineas.append(f"Valores leidos totales(validos + invalidos): {total_valores}")
-    lineas.append(f"Numeros validos: {len(numeros_validos)}")
-    lineas.append(f"Valores invalidos: {len(errores)}")
-    lineas.append("")
 
-    lineas.append("=== Descriptive Statistics ===")
-    lineas.append(f"Mean (media): {formatear_numero(media)}")
-    lineas.append(f"Median (mediana): {formatear_numero(mediana)}")
+def validar_argumentos(parser, argumentos):
+    """
+    Req 5: Combinaciones de opciones que no tienen sentido; parser.error
+    muestra el uso y termina con codigo 2.
+    """
+    if argumentos.backend == BACKEND_NUMPY and np is None:
+        parser.error("--backend numpy requiere tener NumPy instalado")
+    if argumentos.sin_cache and argumentos.cache is None:
+        parser.error("--sin-cache requiere --cache DIR")
+    if argumentos.bootstrap is not None:
+        validar_bootstrap(parser, argumentos)
+    if argumentos.lote:
+        validar_lote(parser, argumentos)
+        return
+    if argumentos.archivo is None and not argumentos.combinar_estados:
+        parser.error("se requiere el archivo, --lote o --combinar-estados")
+    if argumentos.ordenar_salida is not None and argumentos.archivo is None:
+        parser.error("--ordenar-salida requiere el archivo de datos")
+    if argumentos.ventana is not None and argumentos.archivo is None:
+        parser.error("--ventana requiere el archivo de datos")
+    if argumentos.pares:
+        validar_pares(parser, argumentos)
+    if argumentos.archivo is None or (
+        argumentos.workers is None and argumentos.incremental is None
+    ):
+        return
+    if argumentos.lector in LECTORES_BINARIOS:
+        parser.error(
+            "--workers e --incremental solo aceptan archivos de texto"
+        )
+    try:
+        compresion = detectar_compresion(argumentos.archivo)
+    except OSError:
+        # El error de lectura se reporta despues, al procesar el archivo.
+        compresion = None
+    if compresion is not None:
+        parser.error(
+            "--workers e --incremental usan posiciones de bytes y no "
+            f"aceptan archivos comprimidos ({compresion})"
+        )
 
-    if len(modas) == 0:
-        lineas.append("Mode (moda): N/A (no hay moda)")
-    else:
-        modas_texto = ", ".join(formatear_numero(x) for x in modas)
-        lineas.append(f"Mode (moda): {modas_texto}")
 
-    lineas.append(f"Variance (varianza): {formatear_numero(varianza)}")
-    lineas.append(
-        "Standard deviation (desviacion estandar): "
-        f"{formatear_numero(desviacion_estandar)}"
+def validar_lote(parser, argumentos):
+    """
+    Req 5: --lote toma los archivos de sus patrones y escribe un resultado
+    por archivo; no se combina con opciones de un solo archivo.
+    """
+    if argumentos.pares:
+        parser.error("--lote no se combina con --pares")
+    incompatibles = (
+        argumentos.archivo,
+        argumentos.combinar_estados,
+        argumentos.incremental,
+        argumentos.guardar_estado,
+        argumentos.ordenar_salida,
+        argumentos.cprofile,
+        argumentos.metricas_json,
+        argumentos.archivo_errores,
     )
-    lineas.append("")
-    lineas.append(f"Tiempo transcurrido (segundos): {tiempo_segundos:.6f}")
-
-    if len(errores) > 0:
-        lineas.append("")
-        lineas.append("=== Errores detectados (se continuo la ejecucion) ===")
-        for mensaje in errores:
-            lineas.append(mensaje)
-
-    lineas.append("")
-    return "\n".join(lineas)
+    if any(opcion is not None for opcion in incompatibles):
+        parser.error(
+            "--lote no se combina con un archivo, --combinar-estados, "
+            "--incremental, --guardar-estado, --ordenar-salida, "
+            "--cprofile, --metricas-json ni --archivo-errores"
+        )
 
 
-def escribir_archivo_salida(nombre_archivo, contenido):
+def validar_pares(parser, argumentos):
     """
-    Req 2: Escribe resultados en un archivo llamado StatisticsResults.txt.
+    Req 5: --pares calcula sus propias estadisticas en una pasada y no se
+    combina con opciones del modo de una columna.
     """
-    with open(nombre_archivo, "w", encoding="utf-8") as archivo:
-        archivo.write(contenido)
+    if argumentos.archivo is None:
+        parser.error("--pares requiere el archivo de datos")
+    opciones = {
+        "--streaming": argumentos.streaming,
+        "--approx": argumentos.approx,
+        "--moda-aproximada": argumentos.moda_aproximada is not None,
+        "--workers": argumentos.workers is not None,
+        "--incremental": argumentos.incremental is not None,
+        "--guardar-estado": argumentos.guardar_estado is not None,
+        "--extendidas": construir_extendidas(argumentos) is not None,
+        "--ordenar-salida": argumentos.ordenar_salida is not None,
+        "--ventana": argumentos.ventana is not None,
+        "--lector binario/npy": argumentos.lector in LECTORES_BINARIOS,
+    }
+    usadas = [nombre for nombre, activa in opciones.items() if activa]
+    if usadas:
+        parser.error(f"--pares no se combina con {', '.join(usadas)}")
 
 
-def imprimir_uso():
+def validar_bootstrap(parser, argumentos):
     """
-    Req 5: Muestra el formato minimo para invocar el programa.
+    Req 5: --bootstrap remuestrea los valores en memoria, asi que solo
+    funciona en el modo exacto (en --lote, --workers es el tamano del
+    pool y si se acepta).
     """
-    print("Uso:")
-    print("  python computeStatistics.py fileWithData.txt")
+    opciones = {
+        "--pares": argumentos.pares,
+        "--streaming": argumentos.streaming,
+        "--approx": argumentos.approx,
+        "--moda-aproximada": argumentos.moda_aproximada is not None,
+        "--workers": argumentos.workers is not None and not argumentos.lote,
+        "--incremental": argumentos.incremental is not None,
+        "--guardar-estado": argumentos.guardar_estado is not None,
+        "--combinar-estados": bool(argumentos.combinar_estados),
+    }
+    usadas = [nombre for nombre, activa in opciones.items() if activa]
+    if usadas:
+        parser.error(f"--bootstrap no se combina con {', '.join(usadas)}")
+
+
+def mostrar_y_guardar_reporte(reporte):
+    """Req 2: Imprime el reporte y lo escribe en StatisticsResults.txt."""
+    print(reporte)
+
+    try:
+        escribir_archivo_salida(NOMBRE_ARCHIVO_SALIDA, reporte)
+    except OSError as exc:
+        print(
+            "Error al escribir el archivo de salida "
+            f"'{NOMBRE_ARCHIVO_SALIDA}': {exc}"
+        )
 
 
 def main():
@@ -336,44 +5642,74 @@ def main():
         imprimir_uso()
         sys.exit(1)
 
-    ruta_entrada = sys.argv[1]
-
-    numeros, errores, total_valores = leer_numeros_desde_archivo(ruta_entrada)
+    parser = construir_parser_argumentos()
+    argumentos = parser.parse_args()
+    validar_argumentos(parser, argumentos)
 
-    numeros_ordenados = ordenar_lista(numeros) if len(numeros) > 0 else []
+    if argumentos.lote:
+        ejecutar_lote(argumentos, tiempo_inicio)
+        return
 
-    stats = {}
-    stats["media"] = calcular_media(numeros)
-    stats["mediana"] = calcular_mediana(numeros_ordenados)
-    stats["modas"] = calcular_moda(numeros)
+    llave_cache, entrada_cache = consultar_cache(argumentos)
+    if entrada_cache is not None:
+        mostrar_y_guardar_reporte(
+            actualizar_reporte_cache(
+                entrada_cache["reporte"],
+                argumentos.archivo,
+                time.perf_counter() - tiempo_inicio,
+            )
+        )
+        return
 
-    if stats["media"] is not None:
-        stats["varianza"] = calcular_varianza(numeros, stats["media"])
-    else:
-        stats["varianza"] = None
+    medidor = None
+    if argumentos.metricas or argumentos.metricas_json is not None:
+        medidor = MedidorFases()
+    if argumentos.tracemalloc:
+        tracemalloc.start()
 
-    stats["desviacion_estandar"] = calcular_raiz_cuadrada(stats["varianza"])
+    ruta_entrada, stats, total_validos, errores, total_valores = (
+        ejecutar_con_perfilador(argumentos, medidor)
+    )
 
     tiempo_fin = time.perf_counter()
     stats["tiempo_segundos"] = tiempo_fin - tiempo_inicio
 
-    reporte = construir_reporte(
-        ruta_entrada=ruta_entrada,
-        numeros_validos=numeros,
-        total_valores=total_valores,
-        errores=errores,
-        stats=stats,
-    )
+    if argumentos.tracemalloc:
+        stats.setdefault("metricas", {})["tracemalloc"] = resumir_tracemalloc()
 
-    print(reporte)
+    datos_reporte = {
+        "ruta_entrada": ruta_entrada,
+        "total_validos": total_validos,
+        "total_valores": total_valores,
+        "errores": errores,
+        "stats": stats,
+    }
+    with medir_fase(medidor, FASE_REPORTE):
+        reporte = construir_reporte(**datos_reporte)
+    if medidor is not None:
+        # Req 7: El resumen ya incluye la fase de reporte; el texto (corto:
+        # a lo mas la muestra de errores) se arma de nuevo con las metricas.
+        stats.setdefault("metricas", {}).update(
+            medidor.resumen(total_valores, len(errores))
+        )
+        reporte = construir_reporte(**datos_reporte)
+    with medir_fase(medidor, FASE_REPORTE):
+        mostrar_y_guardar_reporte(reporte)
 
-    try:
-        escribir_archivo_salida(NOMBRE_ARCHIVO_SALIDA, reporte)
-    except OSError as exc:
-        print(
-            f"Error al escribir el archivo de salida '{NOMBRE_ARCHIVO_SALIDA}': {exc}"
+    if llave_cache is not None:
+        guardar_reporte_cache(
+            argumentos,
+            llave_cache,
+            reporte,
+            resumir_para_cache(stats, total_validos, total_valores, errores),
         )
 
+    if argumentos.metricas_json is not None:
+        metricas = stats.get("metricas", {})
+        if medidor is not None:
+            metricas.update(medidor.resumen(total_valores, len(errores)))
+        escribir_metricas_json(argumentos.metricas_json, metricas)
+
 
 # Req 1 y Req 4: Ejecucion directa desde CLI del archivo computeStatistics.py.
 if __name__ == "__main__":
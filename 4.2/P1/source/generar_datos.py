@@ -0,0 +1,95 @@
+"""
+generar_datos.py
+
+Genera archivos de datos reproducibles para medir computeStatistics.py.
+
+P1 - TC4017 - Pruebas de software y aseguramiento de la calidad
+Carlos Isaac Sagrero Campos - A01796826
+
+Uso:
+  python generar_datos.py DISTRIBUCION N archivo_salida [semilla]
+
+Distribuciones: uniforme, sesgada, duplicados, invalidos
+"""
+import random
+import sys
+
+
+SEMILLA = 4017
+VALORES_POR_LINEA = 10
+LINEAS_POR_ESCRITURA = 10_000
+
+# Tokens que computeStatistics.py debe rechazar y reportar.
+TOKENS_INVALIDOS = ("abc", "--", "nan", "inf", "-Infinity", "1.2.3", "12x")
+PROPORCION_INVALIDOS = 0.3
+
+
+def valor_uniforme(aleatorio):
+    """Flotante uniforme en [-1e6, 1e6] con seis decimales."""
+    return f"{aleatorio.uniform(-1e6, 1e6):.6f}"
+
+
+def valor_sesgado(aleatorio):
+    """Flotante con cola larga a la derecha (lognormal)."""
+    return f"{aleatorio.lognormvariate(0.0, 1.5):.6f}"
+
+
+def valor_duplicado(aleatorio):
+    """Entero entre 0 y 100: muy pocos valores distintos."""
+    return str(aleatorio.randint(0, 100))
+
+
+def valor_con_invalidos(aleatorio):
+    """Mezcla de enteros validos y tokens invalidos."""
+    if aleatorio.random() < PROPORCION_INVALIDOS:
+        return aleatorio.choice(TOKENS_INVALIDOS)
+    return str(aleatorio.randint(-1000, 1000))
+
+
+DISTRIBUCIONES = {
+    "uniforme": valor_uniforme,
+    "sesgada": valor_sesgado,
+    "duplicados": valor_duplicado,
+    "invalidos": valor_con_invalidos,
+}
+
+
+def generar_archivo(distribucion, total, ruta_salida, semilla=SEMILLA):
+    """
+    Escribe `total` valores de la distribucion en lineas de
+    VALORES_POR_LINEA separados por comas y espacios. Escribe por lotes
+    para no guardar todo el archivo en memoria.
+    """
+    generador = DISTRIBUCIONES[distribucion]
+    aleatorio = random.Random(semilla)
+    restantes = total
+
+    with open(ruta_salida, "w", encoding="utf-8") as archivo:
+        while restantes > 0:
+            lineas = []
+            while restantes > 0 and len(lineas) < LINEAS_POR_ESCRITURA:
+                cantidad = min(VALORES_POR_LINEA, restantes)
+                valores = [generador(aleatorio) for _ in range(cantidad)]
+                linea = ", ".join(valores[:5])
+                if len(valores) > 5:
+                    linea += " " + " ".join(valores[5:])
+                lineas.append(linea)
+                restantes -= cantidad
+            archivo.write("\n".join(lineas) + "\n")
+
+
+def main():
+    """Punto de entrada por linea de comandos."""
+    if len(sys.argv) < 4 or sys.argv[1] not in DISTRIBUCIONES:
+        print("Uso:")
+        print("  python generar_datos.py DISTRIBUCION N archivo_salida [semilla]")
+        print(f"Distribuciones: {', '.join(DISTRIBUCIONES)}")
+        sys.exit(1)
+
+    semilla = int(sys.argv[4]) if len(sys.argv) > 4 else SEMILLA
+    generar_archivo(sys.argv[1], int(sys.argv[2]), sys.argv[3], semilla)
+    print(f"Archivo generado: {sys.argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+test_computeStatistics.py
+
+Pruebas de computeStatistics.py: paridad entre backends, combinacion de
+estados, cota de error del sketch KLL, mediana por ventana, --workers y
+cache.
+
+P1 - TC4017 - Pruebas de software y aseguramiento de la calidad
+Carlos Isaac Sagrero Campos - A01796826
+
+Uso:
+  python -m pytest -q
+"""
+# pylint: disable=invalid-name
+import random
+import statistics
+
+import pytest
+
+import computeStatistics as cs
+
+
+SEMILLA_DATOS = 4017
+TOTAL_VALORES = 20000
+TOKENS_INVALIDOS = ("abc", "nan", "1.2.3", "inf")
+
+requiere_numpy = pytest.mark.skipif(
+    cs.np is None, reason="NumPy no esta instalado"
+)
+
+
+def generar_valores(total, semilla=SEMILLA_DATOS):
+    """Valores con magnitudes mezcladas y duplicados (hay moda)."""
+    aleatorio = random.Random(semilla)
+    valores = []
+    for _ in range(total):
+        tipo = aleatorio.random()
+        if tipo < 0.2:
+            valores.append(float(aleatorio.randint(-5, 5)))
+        elif tipo < 0.6:
+            valores.append(aleatorio.gauss(100.0, 15.0))
+        else:
+            valores.append(aleatorio.uniform(-1e6, 1e6))
+    return valores
+
+
+@pytest.fixture(name="archivo_datos")
+def fixture_archivo_datos(tmp_path):
+    """Archivo de texto con un valor por linea y algunos tokens invalidos."""
+    lineas = [repr(valor) for valor in generar_valores(TOTAL_VALORES)]
+    for indice, token in enumerate(TOKENS_INVALIDOS):
+        lineas.insert(indice * 997 + 13, token)
+    ruta = tmp_path / "datos.txt"
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    return str(ruta)
+
+
+def calcular_exactas(ruta, backend, **opciones):
+    """calcular_estadisticas_exactas con el lector por defecto."""
+    return cs.calcular_estadisticas_exactas(
+        ruta, cs.LECTOR_MMAP, backend, **opciones
+    )
+
+
+@requiere_numpy
+def test_backends_dan_las_mismas_estadisticas(archivo_datos):
+    """
+    Los dos backends dan el mismo reporte: sumas en el mismo orden, misma
+    mediana, mismas modas y mismos errores.
+    """
+    resultados = [
+        calcular_exactas(archivo_datos, backend)
+        for backend in (cs.BACKEND_PYTHON, cs.BACKEND_NUMPY)
+    ]
+    (stats_python, validos_python, errores_python, total_python) = (
+        resultados[0]
+    )
+    (stats_numpy, validos_numpy, errores_numpy, total_numpy) = resultados[1]
+
+    assert validos_python == validos_numpy == TOTAL_VALORES
+    assert total_python == total_numpy == TOTAL_VALORES + 4
+    assert list(errores_python) == list(errores_numpy)
+    for nombre in ("media", "mediana", "modas", "varianza"):
+        assert stats_python[nombre] == stats_numpy[nombre]
+
+
+@requiere_numpy
+def test_backends_dan_el_mismo_bootstrap(archivo_datos):
+    """
+    Las remuestras del bootstrap y sus estadisticas son identicas con los
+    dos backends para la misma semilla.
+    """
+    opciones = {"remuestras": 20, "semilla": 7, "procesos": 1}
+    intervalos = [
+        calcular_exactas(archivo_datos, backend, bootstrap=opciones)[0][
+            "bootstrap"
+        ]
+        for backend in (cs.BACKEND_PYTHON, cs.BACKEND_NUMPY)
+    ]
+
+    assert intervalos[0] == intervalos[1]
+
+
+@requiere_numpy
+@pytest.mark.parametrize(
+    "total",
+    [
+        1,
+        cs.VALORES_POR_BLOQUE_SUMA - 1,
+        cs.VALORES_POR_BLOQUE_SUMA,
+        cs.VALORES_POR_BLOQUE_SUMA + 1,
+    ],
+)
+def test_suma_por_bloques_igual_a_python(total):
+    """
+    La suma por bloques del backend NumPy es identica a los ciclos de
+    Python en los bordes de VALORES_POR_BLOQUE_SUMA.
+    """
+    valores = generar_valores(total)
+    arreglo = cs.np.array(valores)
+    media = cs.calcular_media(valores)
+
+    assert cs.sumar_secuencial_numpy(arreglo) / total == media
+    assert (
+        cs.sumar_secuencial_numpy(arreglo, media) / total
+        == cs.calcular_varianza(valores, media)
+    )
+
+
+def test_combinar_estados_igual_a_una_corrida():
+    """
+    Combinar los estados de varias partes equivale a una sola corrida con
+    todos los valores.
+    """
+    valores = generar_valores(TOTAL_VALORES)
+    configuracion = {"con_moda": True, "error_rango": 0.01}
+
+    completo = cs.EstadoEstadistico(**configuracion)
+    completo.agregar_bloque(valores)
+
+    combinado = cs.EstadoEstadistico(**configuracion)
+    for inicio in range(0, len(valores), 7000):
+        parte = cs.EstadoEstadistico(**configuracion)
+        parte.agregar_bloque(valores[inicio:inicio + 7000])
+        combinado.combinar(parte)
+
+    esperado = completo.calcular_stats()
+    obtenido = combinado.calcular_stats()
+    assert combinado.acumulador.conteo == completo.acumulador.conteo
+    assert combinado.acumulador.minimo == completo.acumulador.minimo
+    assert combinado.acumulador.maximo == completo.acumulador.maximo
+    assert obtenido["mediana"] == esperado["mediana"]
+    assert obtenido["modas"] == esperado["modas"]
+    assert obtenido["media"] == pytest.approx(esperado["media"], rel=1e-12)
+    assert obtenido["varianza"] == pytest.approx(
+        esperado["varianza"], rel=1e-12
+    )
+    assert combinado.sketch.conteo == completo.sketch.conteo
+
+
+def test_estado_sobrevive_a_json():
+    """Combinar un estado guardado y cargado de JSON da el mismo resultado."""
+    estado = cs.EstadoEstadistico(con_moda=True, error_rango=0.01)
+    estado.agregar_bloque(generar_valores(1000))
+
+    copia = cs.EstadoEstadistico.desde_diccionario(estado.a_diccionario())
+
+    assert copia.calcular_stats() == estado.calcular_stats()
+
+
+@pytest.mark.parametrize("partes", [1, 4])
+def test_error_de_rango_kll_dentro_de_la_cota(partes):
+    """
+    Cada cuantil del sketch KLL cae a lo mas error_rango * n posiciones del
+    rango pedido, tambien despues de combinar sketches.
+    """
+    error_rango = 0.01
+    valores = list(range(100000))
+    random.Random(SEMILLA_DATOS).shuffle(valores)
+    tamano_parte = len(valores) // partes
+
+    sketch = cs.SketchKLL(k=cs.k_para_error_rango(error_rango))
+    for inicio in range(0, len(valores), tamano_parte):
+        parte = cs.SketchKLL(k=cs.k_para_error_rango(error_rango))
+        for valor in valores[inicio:inicio + tamano_parte]:
+            parte.agregar(valor)
+        sketch.combinar(parte)
+
+    probabilidades = [indice / 100 for indice in range(1, 100)]
+    for probabilidad, valor in zip(
+        probabilidades, sketch.cuantiles(probabilidades)
+    ):
+        # Los valores son 0..n-1: el rango de `valor` es el valor mismo.
+        assert abs(valor / len(valores) - probabilidad) <= error_rango
+
+
+@pytest.mark.parametrize("tamano, paso", [(1, 1), (4, 1), (25, 3)])
+def test_mediana_de_ventana_igual_a_fuerza_bruta(tamano, paso):
+    """
+    La mediana de cada ventana deslizante coincide con recalcularla desde
+    cero, incluso con valores repetidos que entran y salen.
+    """
+    aleatorio = random.Random(SEMILLA_DATOS)
+    valores = [float(aleatorio.randint(0, 20)) for _ in range(500)]
+
+    resultados = list(
+        cs.iterar_estadisticas_ventana(
+            valores, tamano, cs.VENTANA_DESLIZANTE, paso
+        )
+    )
+
+    assert len(resultados) == (len(valores) - tamano) // paso + 1
+    for resultado in resultados:
+        ventana = valores[resultado["inicio"] - 1:resultado["fin"]]
+        assert len(ventana) == tamano
+        assert resultado["mediana"] == statistics.median(ventana)
+        assert resultado["media"] == pytest.approx(statistics.fmean(ventana))
+
+
+def test_mediana_de_ventana_fija_igual_a_fuerza_bruta():
+    """
+    Las ventanas fijas cubren todos los valores; la ultima puede quedar
+    incompleta.
+    """
+    valores = generar_valores(103)
+
+    resultados = list(
+        cs.iterar_estadisticas_ventana(valores, 10, cs.VENTANA_FIJA)
+    )
+
+    assert [r["conteo"] for r in resultados] == [10] * 10 + [3]
+    for resultado in resultados:
+        ventana = valores[resultado["inicio"] - 1:resultado["fin"]]
+        assert resultado["mediana"] == statistics.median(ventana)
+
+
+def test_workers_igual_a_un_proceso(archivo_datos):
+    """
+    --workers lee los mismos valores y errores (numerados por linea del
+    archivo completo) que la lectura en un solo proceso.
+    """
+    serial = calcular_exactas(archivo_datos, cs.BACKEND_PYTHON)
+    paralelo = calcular_exactas(archivo_datos, cs.BACKEND_PYTHON, workers=3)
+
+    assert paralelo[0] == serial[0]
+    assert paralelo[1] == serial[1]
+    assert list(paralelo[2]) == list(serial[2])
+    assert len(paralelo[2]) == len(TOKENS_INVALIDOS)
+    assert paralelo[3] == serial[3]
+
+
+def test_reporte_cache_usa_la_ruta_actual():
+    """
+    Un reporte servido del cache muestra la ruta de la corrida actual, no
+    la del archivo con que se guardo.
+    """
+    reporte = "\n".join(
+        [
+            f"{cs.PREFIJO_ARCHIVO_ENTRADA}a/datos.txt",
+            f"{cs.PREFIJO_TIEMPO}1.000000",
+            "Error al leer el archivo 'a/datos.txt': byte invalido",
+        ]
+    )
+
+    guardado = cs.preparar_reporte_cache(reporte, "a/datos.txt")
+    servido = cs.actualizar_reporte_cache(guardado, "b/copia.txt", 0.5)
+
+    assert "a/datos.txt" not in guardado.split("\n")[2]
+    assert servido.split("\n") == [
+        f"{cs.PREFIJO_ARCHIVO_ENTRADA}b/copia.txt",
+        f"{cs.PREFIJO_TIEMPO}0.500000",
+        "Error al leer el archivo 'b/copia.txt': byte invalido",
+    ]
+
+
+def test_reporte_cache_no_guarda_ruta_en_la_excepcion():
+    """
+    Si la ruta tambien aparece en el texto de la excepcion el reporte no se
+    guarda en el cache.
+    """
+    reporte = "Error al leer el archivo 'x.txt': [Errno 5] 'x.txt'"
+
+    assert cs.preparar_reporte_cache(reporte, "x.txt") is None